@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from analyzer.result_cache import ResultCache
+
+# Bump when a prompt template changes so old answers are not served for it
+AI_CACHE_VERSION = "1"
+
+# Define base directory for backend
+base_dir = os.path.dirname(os.path.abspath(__file__))
+
+AI_CACHE_DIR = os.getenv("AI_CACHE_DIR", os.path.join(base_dir, "cache", "ai"))
+AI_CACHE_ENTRIES = int(os.getenv("AI_CACHE_ENTRIES", 512))
+AI_CACHE_DISK_BYTES = int(os.getenv("AI_CACHE_DISK_BYTES", 64 * 1024 * 1024))
+# Seconds an answer is served from the cache (0 disables the cache)
+AI_CACHE_TTL = float(os.getenv("AI_CACHE_TTL", 7 * 24 * 3600))
+
+
+def normalize_code(code: str) -> str:
+    """Line endings, trailing whitespace and surrounding blank lines do not change the answer."""
+    lines = [line.rstrip() for line in code.replace("\r\n", "\n").replace("\r", "\n").split("\n")]
+    return "\n".join(lines).strip("\n")
+
+
+def ai_cache_key(endpoint: str, model: str, code: str, smell_type: str = None) -> str:
+    material = json.dumps(
+        {"version": AI_CACHE_VERSION, "endpoint": endpoint, "model": model,
+         "code": normalize_code(code), "smell": smell_type},
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+# --------------------------------------------------------------------
+# 🔹 TTL cache of AI responses (memory LRU + disk)
+# --------------------------------------------------------------------
+class AIResponseCache:
+    """
+    Stores AI answers in a ResultCache of its own directory; each entry
+    carries its creation time and is ignored once older than `ttl` seconds.
+    """
+
+    def __init__(self, cache_dir=AI_CACHE_DIR, max_entries=AI_CACHE_ENTRIES,
+                 max_disk_bytes=AI_CACHE_DISK_BYTES, ttl=AI_CACHE_TTL):
+        self.ttl = ttl
+        self._store = ResultCache(cache_dir, max_entries, max_disk_bytes)
+
+    def get(self, key: str):
+        if self.ttl <= 0:
+            return None
+        entry = self._store.get(key)
+        if entry is None or time.time() - entry.get("created_at", 0) > self.ttl:
+            return None
+        return entry["text"]
+
+    def put(self, key: str, text: str):
+        if self.ttl > 0:
+            self._store.put(key, {"created_at": time.time(), "text": text})
+
+    def clear(self):
+        self._store.clear()
+
+
+# --------------------------------------------------------------------
+# 🔹 Request coalescing
+# --------------------------------------------------------------------
+class SingleFlight:
+    """
+    Runs at most one call per key at a time. Callers that arrive while a
+    call for the same key is in flight wait for it and share its result
+    (or its exception) instead of starting their own.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+
+        if not leader:
+            return call.result()
+
+        try:
+            value = fn()
+            call.set_result(value)
+            return value
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_ai_cache() -> AIResponseCache:
+    """Returns the process-wide AI response cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AIResponseCache()
+        return _cache
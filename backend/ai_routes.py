@@ -1,52 +1,267 @@
-from flask import Blueprint, request, jsonify
-import google.generativeai as genai
+from flask import Blueprint, Response, request, jsonify
+from werkzeug.utils import secure_filename
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
+import json
+import logging
 import os
+import threading
+import time
+
+from ai_cache import SingleFlight, ai_cache_key, get_ai_cache, normalize_code
+from analyzer.metrics import CACHE_REQUESTS, STAGE_ERRORS, timed
+from result_store import get_result_store
 
 ai_bp = Blueprint("ai", __name__)
 load_dotenv()
+logger = logging.getLogger(__name__)
+
+# "gemini" calls the real API; "fake" answers locally so the endpoints work offline
+AI_BACKEND = os.getenv("AI_BACKEND", "gemini")
+# Simulated upstream latency of the fake backend, in seconds
+AI_FAKE_LATENCY = float(os.getenv("AI_FAKE_LATENCY", 0))
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+# Upstream requests per second of /api/refactor-batch fan-outs, shared across
+# the process (0 = unlimited), and burst size. Interactive calls are not limited.
+AI_RATE_LIMIT = float(os.getenv("AI_RATE_LIMIT", 2))
+AI_RATE_BURST = int(os.getenv("AI_RATE_BURST", 4))
+# Concurrent upstream calls and snippet cap for /api/refactor-batch
+AI_BATCH_CONCURRENCY = int(os.getenv("AI_BATCH_CONCURRENCY", 4))
+AI_BATCH_MAX_SNIPPETS = int(os.getenv("AI_BATCH_MAX_SNIPPETS", 50))
 
 # Set up the Gemini API key
 gemini_api_key = os.getenv("GEMINI_API_KEY")
-if gemini_api_key:
-    genai.configure(api_key=gemini_api_key)
-else:
-    print("Gemini API key not found. Please set the GEMINI_API_KEY environment variable.")
 
-def ask_gemini(prompt, model="gemini-2.5-flash"):
+
+def check_ai_configuration():
+    """Warns at server start-up when the AI endpoints cannot reach Gemini."""
+    if not gemini_api_key and AI_BACKEND != "fake":
+        logger.warning("Gemini API key not found. Please set the GEMINI_API_KEY environment variable.")
+
+
+_genai = None
+_genai_lock = threading.Lock()
+_models = {}
+_inflight = SingleFlight()
+
+
+class TokenBucket:
+    """
+    Blocking rate limiter: `acquire()` waits until a token is available.
+    Tokens refill at `rate` per second up to `burst`; a rate of 0 disables it.
+    """
+
+    def __init__(self, rate=AI_RATE_LIMIT, burst=AI_RATE_BURST):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_rate_limiter = TokenBucket()
+
+
+def get_genai():
+    """
+    Imports and configures the Gemini SDK on first use. The import alone
+    takes about a second, so it is kept out of app start-up.
+    """
+    global _genai
+    with _genai_lock:
+        if _genai is None:
+            import google.generativeai as genai
+            genai.configure(api_key=gemini_api_key)
+            _genai = genai
+        return _genai
+
+
+class FakeGenerativeModel:
     """
-    Sends a prompt to the Gemini API and returns the response.
+    Offline stand-in for genai.GenerativeModel with the same
+    `generate_content(prompt).text` surface. Answers are deterministic and
+    every call is counted, so caching and coalescing can be observed.
     """
-    if not gemini_api_key:
-        return "Error: Gemini API key is not configured."
-    
+
+    class _Response:
+        def __init__(self, text):
+            self.text = text
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, stream=False):
+        with self._lock:
+            self.calls += 1
+        text = f"[{self.model_name}] {len(prompt)} prompt characters received."
+        if not stream:
+            if AI_FAKE_LATENCY:
+                time.sleep(AI_FAKE_LATENCY)
+            return self._Response(text)
+        return self._stream(text.split(" "))
+
+    def _stream(self, words):
+        # The latency is spread over the chunks, like tokens arriving
+        for i, word in enumerate(words):
+            if AI_FAKE_LATENCY:
+                time.sleep(AI_FAKE_LATENCY / len(words))
+            yield self._Response(word if i == 0 else f" {word}")
+
+
+def get_model(model=GEMINI_MODEL):
+    """Returns the shared client for `model`; one instance serves every request."""
+    with _genai_lock:
+        client = _models.get(model)
+    if client is not None:
+        return client
+
+    if AI_BACKEND == "fake":
+        client = FakeGenerativeModel(model)
+    else:
+        client = get_genai().GenerativeModel(model)
+    with _genai_lock:
+        return _models.setdefault(model, client)
+
+
+def _generate(prompt, model, limiter=None):
+    """Calls the model and returns its text, after a `limiter` token if given; raises on any failure."""
+    if AI_BACKEND != "fake" and not gemini_api_key:
+        raise RuntimeError("Gemini API key is not configured.")
+    if limiter is not None:
+        limiter.acquire()
+    with timed("gemini"):
+        response = get_model(model).generate_content(prompt)
+    return response.text.strip()
+
+
+def _generate_stream(prompt, model):
+    """Yields text chunks as the model produces them; raises on any failure."""
+    if AI_BACKEND != "fake" and not gemini_api_key:
+        raise RuntimeError("Gemini API key is not configured.")
+    with timed("gemini"):
+        for chunk in get_model(model).generate_content(prompt, stream=True):
+            if chunk.text:
+                yield chunk.text
+
+
+def ask_cached(endpoint, code, prompt, smell_type=None, model=GEMINI_MODEL, limiter=None):
+    """
+    Answers from the response cache when possible. Otherwise identical
+    requests in flight share one upstream call, and only successful
+    answers are stored. `limiter` (a TokenBucket) paces the upstream call
+    only. Returns (text, served_from_cache).
+    """
+    if AI_BACKEND != "fake" and not gemini_api_key:
+        return "Error: Gemini API key is not configured.", False
+
+    cache = get_ai_cache()
+    key = ai_cache_key(endpoint, model, code, smell_type)
+    cached = cache.get(key)
+    CACHE_REQUESTS.inc(cache="ai", result="miss" if cached is None else "hit")
+    if cached is not None:
+        return cached, True
+
+    def call():
+        # Another request may have filled the cache while this one waited
+        text = cache.get(key)
+        if text is None:
+            text = _generate(prompt, model, limiter)
+            cache.put(key, text)
+        return text
+
     try:
-        gemini = genai.GenerativeModel(model)
-        response = gemini.generate_content(prompt)
-        return response.text.strip()
+        return _inflight.do(key, call), False
     except Exception as e:
         # Log the error for debugging
-        print(f"Gemini API Error: {e}")
+        STAGE_ERRORS.inc(stage="gemini")
+        logger.error("Gemini API Error: %s", e)
         # Provide a user-friendly error message
-        return f"An error occurred while communicating with the AI service: {e}"
+        return f"An error occurred while communicating with the AI service: {e}", False
+
+
+PROMPTS = {
+    "explain": "Explain clearly and concisely what this Python code does, highlighting potential issues or improvements:\n\n```python\n{code}\n```",
+    "optimize": "Please refactor the following Python code to make it more efficient, clean, and Pythonic. Return only the optimized code block without any explanations or comments:\n\n```python\n{code}\n```",
+    "refactor": "The following Python code is identified as having a '{smell}' code smell. Please refactor it to fix the issue while preserving its original functionality. Return only the refactored code block:\n\n```python\n{code}\n```",
+}
+
+
+def build_prompt(endpoint, code, smell=None):
+    return PROMPTS[endpoint].format(code=code, smell=smell)
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def stream_cached(endpoint, code, prompt, smell_type=None, model=GEMINI_MODEL):
+    """
+    Server-sent events for one prompt: `chunk` events as text arrives, then
+    `done` with the full result, or `error`. A cached answer is sent as a
+    single chunk; a streamed answer is cached once it completed.
+    """
+    cache = get_ai_cache()
+    key = ai_cache_key(endpoint, model, code, smell_type)
+    cached = cache.get(key)
+    CACHE_REQUESTS.inc(cache="ai", result="miss" if cached is None else "hit")
+    if cached is not None:
+        yield _sse("chunk", {"text": cached})
+        yield _sse("done", {"type": endpoint, "result": cached, "cached": True})
+        return
+
+    parts = []
+    try:
+        for text in _generate_stream(prompt, model):
+            parts.append(text)
+            yield _sse("chunk", {"text": text})
+    except Exception as e:
+        STAGE_ERRORS.inc(stage="gemini")
+        logger.error("Gemini API Error: %s", e)
+        yield _sse("error", {"error": f"An error occurred while communicating with the AI service: {e}"})
+        return
+
+    result = "".join(parts).strip()
+    cache.put(key, result)
+    yield _sse("done", {"type": endpoint, "result": result, "cached": False})
+
+
+def _stream_response(events):
+    return Response(events, mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 
 @ai_bp.route("/explain", methods=["POST"])
 def explain():
     """
     Explain what the given Python code does.
     """
-    code = request.json.get("code", "")
+    code = normalize_code(request.json.get("code", ""))
     if not code:
         return jsonify({"success": False, "error": "No code provided"}), 400
 
-    prompt = f"Explain clearly and concisely what this Python code does, highlighting potential issues or improvements:\n\n```python\n{code}\n```"
-    
-    explanation = ask_gemini(prompt)
-    
+    explanation, cached = ask_cached("explain", code, build_prompt("explain", code))
+
     return jsonify({
         "success": True,
         "type": "explanation",
-        "result": explanation
+        "result": explanation,
+        "cached": cached
     })
 
 @ai_bp.route("/optimize", methods=["POST"])
@@ -54,18 +269,17 @@ def optimize():
     """
     Optimize the given Python code to be more efficient and Pythonic.
     """
-    code = request.json.get("code", "")
+    code = normalize_code(request.json.get("code", ""))
     if not code:
         return jsonify({"success": False, "error": "No code provided"}), 400
 
-    prompt = f"Please refactor the following Python code to make it more efficient, clean, and Pythonic. Return only the optimized code block without any explanations or comments:\n\n```python\n{code}\n```"
-    
-    optimized_code = ask_gemini(prompt)
-    
+    optimized_code, cached = ask_cached("optimize", code, build_prompt("optimize", code))
+
     return jsonify({
         "success": True,
         "type": "optimization",
-        "result": optimized_code
+        "result": optimized_code,
+        "cached": cached
     })
 
 @ai_bp.route("/refactor", methods=["POST"])
@@ -73,17 +287,110 @@ def refactor():
     """
     Refactor the given Python code to address a specific code smell.
     """
-    code = request.json.get("code", "")
+    code = normalize_code(request.json.get("code", ""))
     smell = request.json.get("smell_type", "a general smell")
     if not code:
         return jsonify({"success": False, "error": "No code provided"}), 400
 
-    prompt = f"The following Python code is identified as having a '{smell}' code smell. Please refactor it to fix the issue while preserving its original functionality. Return only the refactored code block:\n\n```python\n{code}\n```"
-    
-    refactored_code = ask_gemini(prompt)
-    
+    refactored_code, cached = ask_cached("refactor", code, build_prompt("refactor", code, smell), smell_type=smell)
+
     return jsonify({
         "success": True,
         "type": "refactor",
-        "result": refactored_code
+        "result": refactored_code,
+        "cached": cached
     })
+
+
+@ai_bp.route("/<endpoint>/stream", methods=["POST"])
+def stream(endpoint):
+    """
+    Streaming variant of /explain, /optimize and /refactor (server-sent events).
+    """
+    if endpoint not in PROMPTS:
+        return jsonify({"success": False, "error": "Unknown endpoint"}), 404
+    code = normalize_code(request.json.get("code", ""))
+    if not code:
+        return jsonify({"success": False, "error": "No code provided"}), 400
+    if AI_BACKEND != "fake" and not gemini_api_key:
+        return jsonify({"success": False, "error": "Gemini API key is not configured."}), 503
+
+    smell = request.json.get("smell_type", "a general smell") if endpoint == "refactor" else None
+    prompt = build_prompt(endpoint, code, smell)
+    return _stream_response(stream_cached(endpoint, code, prompt, smell_type=smell))
+
+
+def _result_snippets(result_id):
+    """Long-method and large-class snippets of a stored analysis result."""
+    stored = get_result_store().get(secure_filename(result_id))
+    if stored is None:
+        raise FileNotFoundError(result_id)
+    result = stored["result"]
+    snippets = [
+        {"smell_type": "Long Method", "name": item.get("function"), "start": item.get("start"),
+         "code": item.get("code_snippet", "")}
+        for item in result.get("long_methods", [])
+    ]
+    snippets += [
+        {"smell_type": "Large Class", "name": item.get("class"), "start": item.get("start"),
+         "code": item.get("code_snippet", "")}
+        for item in result.get("large_classes", [])
+    ]
+    return snippets
+
+
+@ai_bp.route("/refactor-batch", methods=["POST"])
+def refactor_batch():
+    """
+    Refactors every long-method / large-class snippet of a result (by
+    `result_id`) or an explicit `snippets` list in one fan-out. At most
+    AI_BATCH_CONCURRENCY upstream calls run at once, all of them under the
+    process-wide rate limit, and each fix is streamed back as it completes.
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({"success": False, "error": "Expected a JSON object"}), 400
+
+    if "snippets" in payload:
+        snippets = payload["snippets"]
+        if not isinstance(snippets, list) or not all(
+                isinstance(s, dict) and isinstance(s.get("code"), str) and normalize_code(s["code"])
+                for s in snippets):
+            return jsonify({"success": False, "error": "Every snippet needs an object with non-empty code"}), 400
+    else:
+        try:
+            # Stored results may hold empty snippets; those are skipped
+            snippets = [s for s in _result_snippets(payload.get("result_id", "")) if normalize_code(s["code"])]
+        except FileNotFoundError:
+            return jsonify({"success": False, "error": "Result not found"}), 404
+
+    snippets = snippets[:AI_BATCH_MAX_SNIPPETS]
+    if not snippets:
+        return jsonify({"success": False, "error": "No code provided"}), 400
+    if AI_BACKEND != "fake" and not gemini_api_key:
+        return jsonify({"success": False, "error": "Gemini API key is not configured."}), 503
+
+    def refactor_one(snippet):
+        code = normalize_code(snippet["code"])
+        smell = snippet.get("smell_type") or "a general smell"
+        return ask_cached("refactor", code, build_prompt("refactor", code, smell), smell_type=smell,
+                          limiter=_rate_limiter)
+
+    def events():
+        yield _sse("start", {"count": len(snippets)})
+        with ThreadPoolExecutor(max_workers=max(1, AI_BATCH_CONCURRENCY)) as executor:
+            futures = {executor.submit(refactor_one, snippet): i for i, snippet in enumerate(snippets)}
+            for future in as_completed(futures):
+                i = futures[future]
+                text, cached = future.result()
+                yield _sse("fix", {
+                    "index": i,
+                    "smell_type": snippets[i].get("smell_type"),
+                    "name": snippets[i].get("name"),
+                    "start": snippets[i].get("start"),
+                    "result": text,
+                    "cached": cached,
+                })
+        yield _sse("done", {"count": len(snippets)})
+
+    return _stream_response(events())
@@ -0,0 +1,248 @@
+import multiprocessing
+import os
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from analyzer.duplicates import DUPLICATE_DETECTION, find_duplicates_many, fingerprint_functions
+from analyzer.feature_extractor import extract_metric_record
+from analyzer.ml_detector import detect_ml_smells_many
+from analyzer.parsed_source import ParsedSource
+from analyzer.pylint_pool import warm_worker
+from analyzer.result_cache import get_result_cache, is_cacheable
+from analyzer.rule_engine import RULE_MODE
+from analyzer.smell_detector import analysis_cache_key, assemble_result, cache_payload, localize_smells, run_rule_analysis
+
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", os.cpu_count() or 2))
+# Upper bounds for archive extraction (guards against zip bombs)
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", 50000))
+BATCH_MAX_BYTES = int(os.getenv("BATCH_MAX_BYTES", 512 * 1024 * 1024))
+
+SKIPPED_DIRS = {".git", ".hg", ".svn", "__pycache__", ".venv", "venv", "node_modules", ".tox", ".mypy_cache"}
+
+
+class BatchInputError(ValueError):
+    """Raised for unsupported, unsafe or oversized batch inputs."""
+
+
+# --------------------------------------------------------------------
+# 🔹 Input collection: directory, zip or tarball -> list of .py files
+# --------------------------------------------------------------------
+def _safe_member_path(root: str, name: str) -> str:
+    target = os.path.realpath(os.path.join(root, name))
+    if not target.startswith(os.path.realpath(root) + os.sep):
+        raise BatchInputError(f"Unsafe path in archive: {name}")
+    return target
+
+
+def _extract_members(members, root: str, read_member) -> list:
+    """Extracts only .py members, enforcing the file-count and byte budgets."""
+    files, total = [], 0
+    for name, size in members:
+        if not name.endswith(".py"):
+            continue
+        total += size
+        if len(files) >= BATCH_MAX_FILES or total > BATCH_MAX_BYTES:
+            raise BatchInputError("Archive exceeds the batch size limits")
+        target = _safe_member_path(root, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as f:
+            f.write(read_member(name))
+        files.append((name, target))
+    return files
+
+
+def collect_sources(target: str, workdir: str) -> list:
+    """
+    Returns (display_name, path) for every Python file in a directory, zip or
+    tarball. Archives are extracted into `workdir`, .py members only.
+    """
+    if os.path.isdir(target):
+        files = []
+        for root, dirs, names in os.walk(target):
+            dirs[:] = sorted(d for d in dirs if d not in SKIPPED_DIRS)
+            for name in sorted(names):
+                if name.endswith(".py"):
+                    path = os.path.join(root, name)
+                    files.append((os.path.relpath(path, target), path))
+        if len(files) > BATCH_MAX_FILES:
+            raise BatchInputError("Directory exceeds the batch file limit")
+        return files
+
+    if zipfile.is_zipfile(target):
+        with zipfile.ZipFile(target) as archive:
+            members = [(i.filename, i.file_size) for i in archive.infolist() if not i.is_dir()]
+            return _extract_members(members, workdir, archive.read)
+
+    if tarfile.is_tarfile(target):
+        with tarfile.open(target) as archive:
+            regular = {m.name: m for m in archive.getmembers() if m.isfile()}
+            members = [(name, m.size) for name, m in regular.items()]
+            return _extract_members(members, workdir, lambda name: archive.extractfile(regular[name]).read())
+
+    if os.path.isfile(target) and target.endswith(".py"):
+        return [(os.path.basename(target), target)]
+
+    raise BatchInputError("Expected a directory, a .zip / .tar(.gz) archive or a .py file")
+
+
+# --------------------------------------------------------------------
+# 🔹 Per-file work executed inside the process pool
+# --------------------------------------------------------------------
+def _init_batch_worker(rules: str = "full"):
+    # Analyzer progress output goes to stderr so a JSON report on stdout stays clean
+    sys.stdout = sys.stderr
+    if rules == "full":
+        warm_worker()
+
+
+def _analyze_worker(path: str, rules: str = "full") -> dict:
+    """
+    Runs every stage except file-level ML prediction; the parent stacks the
+    returned float32 metric records and predicts for all files in one call.
+    Per-scope predictions are made here, one call per file, and function
+    fingerprints are taken for the parent to look up in the duplicate index.
+    """
+    parsed = ParsedSource.from_path(path)
+    try:
+        record = extract_metric_record(parsed)
+        feature_error = None
+    except Exception as e:
+        record, feature_error = None, str(e)
+
+    long_methods, large_classes, scope_stats = localize_smells(parsed)
+    return {
+        "record": record,
+        "feature_error": feature_error,
+        "long_methods": long_methods,
+        "large_classes": large_classes,
+        "ml_scopes": scope_stats.get("ml_labels"),
+        # Already inside a worker process, so lint here instead of via the pylint pool
+        "rule_based": run_rule_analysis(parsed, rules, in_process=True),
+        "fragments": fingerprint_functions(parsed) if DUPLICATE_DETECTION else [],
+    }
+
+
+# --------------------------------------------------------------------
+# 🔹 Batch driver and aggregated report
+# --------------------------------------------------------------------
+def _summarize(results: dict, cache_hits: int, elapsed: float) -> dict:
+    statuses = Counter()
+    predictions = Counter()
+    rule_types = Counter()
+    long_methods = large_classes = duplicates = 0
+    for result in results.values():
+        statuses[result["summary"].get("status", "Clean Code")] += 1
+        for model_output in result["ml_result"].get("predictions", {}).values():
+            if isinstance(model_output, dict):
+                predictions[model_output.get("prediction", "Unknown")] += 1
+        long_methods += len(result["long_methods"])
+        large_classes += len(result["large_classes"])
+        duplicates += len(result.get("duplicates", []))
+        for issue in result["rule_based"]:
+            if issue.get("category") not in ("Clean", "No issues found"):
+                rule_types[issue.get("type", "N/A")] += 1
+
+    return {
+        "files_analyzed": len(results),
+        "cache_hits": cache_hits,
+        "elapsed_seconds": round(elapsed, 3),
+        "status_counts": dict(statuses),
+        "ml_predictions": dict(predictions),
+        "long_methods": long_methods,
+        "large_classes": large_classes,
+        "duplicates": duplicates,
+        "rule_based_issues": sum(rule_types.values()),
+        "top_rule_types": dict(rule_types.most_common(10)),
+    }
+
+
+def analyze_sources(files: list, max_workers: int = BATCH_WORKERS, use_cache: bool = True,
+                    namespace: str = None, rules: str = None) -> dict:
+    """
+    Analyzes (display_name, path) pairs in parallel and returns the per-file and per-repo report.
+    `rules` picks the rule-based tier ("fast" or "full", default RULE_MODE).
+    Files are indexed for duplicate detection as "<namespace>/<display_name>"
+    (their absolute path without a namespace), so re-analyzing the same
+    repository replaces its previous revision in the index.
+    """
+    start = time.perf_counter()
+    rules = rules or RULE_MODE
+    cache = get_result_cache() if use_cache else None
+    results, pending, digests, fragments = {}, [], {}, {}
+
+    for name, path in files:
+        parsed = ParsedSource.from_path(path)
+        digests[name] = parsed.digest
+        key = analysis_cache_key(parsed, rules)
+        cached = cache.get(key) if cache else None
+        if cached is not None:
+            results[name] = cached
+        else:
+            pending.append((name, path, key))
+    cache_hits = len(results)
+
+    if pending:
+        paths = [path for _, path, _ in pending]
+        if max_workers > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(
+                max_workers=min(max_workers, len(paths)),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_batch_worker,
+                initargs=(rules,),
+            ) as executor:
+                chunksize = max(1, len(paths) // (max_workers * 8))
+                outputs = list(executor.map(_analyze_worker, paths, [rules] * len(paths), chunksize=chunksize))
+        else:
+            outputs = [_analyze_worker(path, rules) for path in paths]
+
+        # One predict call for every file's feature row
+        ml_results = detect_ml_smells_many([
+            out["record"] if out["feature_error"] is None else ValueError(out["feature_error"])
+            for out in outputs
+        ])
+
+        for (name, _, key), out, ml_result in zip(pending, outputs, ml_results):
+            result = assemble_result(ml_result, out["long_methods"], out["large_classes"], out["rule_based"])
+            result["summary"]["rules"] = rules
+            if out["ml_scopes"]:
+                result["summary"]["ml_scopes"] = out["ml_scopes"]
+            results[name] = result
+            fragments[name] = out["fragments"]
+            if cache and is_cacheable(result):
+                cache.put(key, cache_payload(result))
+
+    # Index every file before querying, so duplicates within this batch are found in both directions.
+    # Cached files are only fingerprinted if the index does not hold their revision yet.
+    documents = [
+        (os.path.join(namespace, name) if namespace else os.path.abspath(path),
+         path, digests[name], fragments.get(name))
+        for name, path in files
+    ]
+    found = find_duplicates_many(documents)
+    for (name, _), (document, *_) in zip(files, documents):
+        results[name]["duplicates"] = found[document]
+
+    ordered = {name: results[name] for name, _ in files}
+    return {"files": ordered, "summary": _summarize(ordered, cache_hits, time.perf_counter() - start)}
+
+
+def analyze_batch(target: str, max_workers: int = BATCH_WORKERS, use_cache: bool = True,
+                  namespace: str = None, rules: str = None) -> dict:
+    """
+    Analyzes every Python file in a directory, zip or tarball. `namespace`
+    (default: the target's absolute path) prefixes the files' names in the
+    duplicate index; uploads pass a stable name instead of their temp path.
+    """
+    if namespace is None:
+        namespace = os.path.abspath(target)
+        if os.path.isfile(target) and target.endswith(".py"):
+            namespace = os.path.dirname(namespace)
+    with tempfile.TemporaryDirectory(prefix="smell-batch-") as workdir:
+        files = collect_sources(target, workdir)
+        return analyze_sources(files, max_workers=max_workers, use_cache=use_cache, namespace=namespace,
+                               rules=rules)
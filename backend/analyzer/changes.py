@@ -0,0 +1,211 @@
+import os
+import re
+import subprocess
+import tempfile
+import time
+
+from analyzer.batch import BATCH_WORKERS, analyze_sources
+
+GIT_TIMEOUT = int(os.getenv("GIT_TIMEOUT", 60))
+
+# "@@ -a[,b] +c[,d] @@" -> new-side start line and line count (count defaults to 1)
+_HUNK_HEADER = re.compile(rb"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+class GitError(RuntimeError):
+    """Raised when the repository or revision range cannot be read with git."""
+
+
+# --------------------------------------------------------------------
+# 🔹 Thin git plumbing (subprocess, no extra dependency)
+# --------------------------------------------------------------------
+def _git(repo: str, *args, stdin: bytes = None, env: dict = None) -> bytes:
+    try:
+        done = subprocess.run(
+            ["git", "-C", repo, *args],
+            input=stdin, capture_output=True, timeout=GIT_TIMEOUT, check=False,
+            env={**os.environ, **env} if env else None,
+        )
+    except FileNotFoundError:
+        raise GitError("git executable not found")
+    except subprocess.TimeoutExpired:
+        raise GitError(f"git {args[0]} timed out after {GIT_TIMEOUT} s")
+    if done.returncode != 0:
+        message = done.stderr.decode("utf-8", "replace").strip() or f"git {args[0]} failed"
+        raise GitError(message)
+    return done.stdout
+
+
+def _diff_args(rev_range: str, staged: bool) -> list:
+    """
+    `git diff` arguments for the three supported comparisons:
+    staged changes (pre-commit), "A..B" / "A...B" commit ranges (CI), and a
+    single revision compared with the working tree.
+    """
+    if staged:
+        return ["--cached"] + ([rev_range] if rev_range else [])
+    return [rev_range or "HEAD"]
+
+
+def _content_source(rev_range: str, staged: bool):
+    """Where changed files are read from: ':' (index), a revision, or None (working tree)."""
+    if staged:
+        return ":"
+    if rev_range and ".." in rev_range:
+        head = rev_range.split("...", 1)[1] if "..." in rev_range else rev_range.split("..", 1)[1]
+        return f"{head or 'HEAD'}:"
+    return None
+
+
+def changed_python_files(repo: str, rev_range: str = None, staged: bool = False) -> list:
+    """Repository-relative paths of added, copied, modified or renamed .py files."""
+    out = _git(repo, "diff", "--name-only", "-z", "--no-renames", "--diff-filter=ACMR",
+               *_diff_args(rev_range, staged), "--", "*.py")
+    return sorted(path.decode("utf-8", "surrogateescape") for path in out.split(b"\0") if path)
+
+
+def changed_lines(repo: str, paths: list, rev_range: str = None, staged: bool = False) -> dict:
+    """
+    {path: [(start, end), ...]} with the 1-based new-side line ranges each
+    file's hunks touch. Pure deletions are kept as the single line they
+    removed text before, so a smell around them still counts as touched.
+    """
+    if not paths:
+        return {}
+    out = _git(repo, "diff", "-U0", "--no-color", "--no-ext-diff", "--no-renames",
+               *_diff_args(rev_range, staged), "--", *paths)
+    ranges, current = {}, None
+    for line in out.splitlines():
+        if line.startswith(b"+++ "):
+            name = line[4:]
+            current = None if name == b"/dev/null" else name[2:].decode("utf-8", "surrogateescape")
+            if current is not None:
+                ranges.setdefault(current, [])
+        elif current is not None and line.startswith(b"@@"):
+            match = _HUNK_HEADER.match(line)
+            if match:
+                start, count = int(match.group(1)), int(match.group(2) or 1)
+                ranges[current].append((max(start, 1), start + max(count, 1) - 1))
+    return ranges
+
+
+def _checkout_python_files(repo: str, source: str, workdir: str):
+    """
+    Writes every .py file of the index (`source` ":") or of a revision
+    ("<rev>:") under `workdir`. A revision is read into a scratch index so
+    the repository's own index and working tree are left alone.
+    """
+    env = None
+    if source != ":":
+        env = {"GIT_INDEX_FILE": os.path.join(workdir, ".smell-index")}
+        _git(repo, "read-tree", source[:-1], env=env)
+    listing = _git(repo, "ls-files", "-z", "--", "*.py", env=env)
+    _git(repo, "checkout-index", "-z", "--stdin", f"--prefix={workdir}{os.sep}", stdin=listing, env=env)
+
+
+def _materialize(repo: str, paths: list, source: str, workdir: str) -> list:
+    """
+    (display_name, path) pairs for analyze_sources. Working-tree files are
+    used in place. For the index or a revision, the whole tree's Python
+    files are checked out under `workdir` with the same relative layout, so
+    pylint resolves imports of unchanged sibling modules as it would in the
+    repository; only the changed files are analyzed.
+    """
+    if source is None:
+        return [(rel, os.path.join(repo, rel)) for rel in paths]
+    if paths:
+        _checkout_python_files(repo, source, workdir)
+    return [(rel, os.path.join(workdir, rel)) for rel in paths]
+
+
+# --------------------------------------------------------------------
+# 🔹 Hunk filtering and thresholds
+# --------------------------------------------------------------------
+def _overlaps(start, end, ranges) -> bool:
+    return any(start <= hi and lo <= end for lo, hi in ranges)
+
+
+def _is_rule_issue(issue: dict) -> bool:
+    """Real pylint findings carry a line number; placeholders and tool errors use "-"."""
+    return isinstance(issue.get("line"), int)
+
+
+def restrict_to_hunks(result: dict, ranges: list) -> dict:
+    """A copy of one file's result keeping only smells that overlap the changed lines."""
+    restricted = dict(result)
+    restricted["long_methods"] = [
+        m for m in result["long_methods"] if "start" in m and _overlaps(m["start"], m["end"], ranges)]
+    restricted["large_classes"] = [
+        c for c in result["large_classes"] if "start" in c and _overlaps(c["start"], c["end"], ranges)]
+    restricted["rule_based"] = [
+        i for i in result["rule_based"] if not _is_rule_issue(i) or _overlaps(i["line"], i["line"], ranges)]
+    restricted["duplicates"] = [
+        d for d in result.get("duplicates", []) if _overlaps(d["start"], d["end"], ranges)]
+    return restricted
+
+
+def count_smells(files: dict) -> dict:
+    counts = {"long_methods": 0, "large_classes": 0, "rule_based_issues": 0, "rule_based_errors": 0,
+              "duplicates": 0}
+    for result in files.values():
+        counts["duplicates"] += len(result.get("duplicates", []))
+        counts["long_methods"] += sum(1 for m in result["long_methods"] if "start" in m)
+        counts["large_classes"] += sum(1 for c in result["large_classes"] if "start" in c)
+        for issue in result["rule_based"]:
+            if _is_rule_issue(issue):
+                counts["rule_based_issues"] += 1
+                counts["rule_based_errors"] += issue.get("category") == "Error"
+    return counts
+
+
+def check_thresholds(counts: dict, limits: dict) -> list:
+    """Violations for every count above its limit (a None limit is not checked)."""
+    return [
+        {"metric": metric, "count": counts[metric], "limit": limit}
+        for metric, limit in limits.items()
+        if limit is not None and counts[metric] > limit
+    ]
+
+
+# --------------------------------------------------------------------
+# 🔹 Changed-files analysis
+# --------------------------------------------------------------------
+def analyze_changes(repo: str, rev_range: str = None, staged: bool = False, hunks: bool = False,
+                    limits: dict = None, max_workers: int = BATCH_WORKERS, use_cache: bool = True,
+                    rules: str = None) -> dict:
+    """
+    Analyzes only the Python files changed in `rev_range` (or the staged
+    changes) of the git repository at `repo`. Unchanged content is served
+    from the result cache, so cost follows the diff rather than the repo.
+    With `hunks`, only smells overlapping changed lines are reported.
+    `rules="fast"` swaps pylint for the built-in AST rules.
+    """
+    start = time.perf_counter()
+    repo = _git(repo, "rev-parse", "--show-toplevel").decode("utf-8", "surrogateescape").strip()
+    paths = changed_python_files(repo, rev_range, staged)
+    ranges = changed_lines(repo, paths, rev_range, staged) if hunks else None
+
+    with tempfile.TemporaryDirectory(prefix="smell-changes-") as workdir:
+        files = _materialize(repo, paths, _content_source(rev_range, staged), workdir)
+        report = analyze_sources(files, max_workers=max_workers, use_cache=use_cache, namespace=repo,
+                                rules=rules)
+
+    if hunks:
+        report["files"] = {name: restrict_to_hunks(result, ranges.get(name, []))
+                           for name, result in report["files"].items()}
+
+    counts = count_smells(report["files"])
+    violations = check_thresholds(counts, limits or {})
+    report["changes"] = {
+        "repository": repo,
+        "range": "staged" if staged and not rev_range else rev_range or "HEAD (working tree)",
+        "staged": staged,
+        "hunks_only": hunks,
+        "changed_files": paths,
+        "changed_lines": ranges,
+        "counts": counts,
+        "violations": violations,
+        "passed": not violations,
+        "elapsed_seconds": round(time.perf_counter() - start, 3),
+    }
+    return report
@@ -0,0 +1,485 @@
+import ast
+import io
+import math
+import tokenize
+from collections import namedtuple
+
+import numpy as np
+
+from analyzer.feature_schema import METRIC_DTYPE, METRIC_NAMES
+
+# Same fields as radon.raw.Module
+RawMetrics = namedtuple("RawMetrics", ["loc", "lloc", "sloc", "comments", "multi", "blank", "single_comments"])
+
+# Halstead report fields in metric record order (radon's HalsteadReport field names)
+HALSTEAD_FIELDS = ("h1", "h2", "N1", "N2", "vocabulary", "length", "calculated_length",
+                   "volume", "difficulty", "effort", "time", "bugs")
+
+DEF_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef)
+SCOPE_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+_SKIPPED_TOKENS = (tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE)
+# Characters str.splitlines() breaks on besides "\n"; they shift its numbering away from the AST's
+_EXTRA_LINE_BREAKS = "\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
+
+# --------------------------------------------------------------------
+# 🔹 Raw metrics: statement groups from one tokenization
+# --------------------------------------------------------------------
+def _logical_lines(tokens: list) -> int:
+    """
+    Logical lines of one statement group, counted like radon: every
+    ';'-separated part counts once, twice if a ':' is followed by a body on
+    the same line. `tokens` are (type, string) pairs without comments or
+    newlines; the ENDMARKER radon sees at the end is implied.
+    """
+    count, part = 0, []
+    parts = []
+    for token in tokens:
+        if token == (tokenize.OP, ";"):
+            parts.append(part)
+            part = []
+        else:
+            part.append(token)
+    parts.append(part)
+
+    for index, part in enumerate(parts):
+        # radon's last part still holds the ENDMARKER, which shifts its colon test by one
+        size = len(part) + (index == len(parts) - 1)
+        colon = next((i for i in range(len(part) - 1, -1, -1) if part[i] == (tokenize.OP, ":")), None)
+        if colon is not None:
+            count += 2 - (colon == size - 2)
+        elif part:
+            count += 1
+    return count
+
+
+def _group_counts(tokens: list, n_lines: int, nonblank: int) -> tuple:
+    """(lloc, sloc, comments, multi, blank, single_comments) of one group."""
+    comments = sum(1 for t in tokens if t[0] == tokenize.COMMENT)
+    sloc = multi = blank = single_comments = 0
+    if len(tokens) == 1 and tokens[0][0] == tokenize.COMMENT:
+        single_comments = 1
+    elif len(tokens) == 1 and tokens[0][0] == tokenize.STRING:
+        if tokens[0][2] == tokens[0][3]:
+            single_comments = 1
+        else:
+            multi, blank = nonblank, n_lines - nonblank
+    else:
+        sloc, blank = nonblank, n_lines - nonblank
+    code = [(t[0], t[1]) for t in tokens if t[0] not in _SKIPPED_TOKENS]
+    return _logical_lines(code), sloc, comments, multi, blank, single_comments
+
+
+# A stripped line without any of these is one complete statement with plain tokens
+_COMPLEX_CHARS = frozenset("'\"#\\;([{}])")
+
+
+def _simple_group(line: str):
+    """
+    Counts of a line that needs no tokenizer: blank, a lone comment, or a
+    statement without strings, comments, brackets, continuations or ';'.
+    None for anything else.
+    """
+    if not line:
+        return 0, 0, 0, 0, 1, 0
+    if line[0] == "#":
+        return 0, 0, 1, 0, 0, 1
+    if not _COMPLEX_CHARS.isdisjoint(line):
+        return None
+    # One ';'-free part: two logical lines if a ':' token is followed by more code
+    has_colon = ":" in line.replace(":=", "")
+    return 1 + (has_colon and not line.endswith(":")), 1, 0, 0, 0, 0
+
+
+def _tokenized_group(stripped: list, row: int, nonblank: list):
+    """
+    Tokenizes from `row` until the statement group starting there ends: at a
+    NEWLINE, or at an NL outside brackets (blank and comment-only lines).
+    Returns (next row, counts), or None on an error token or tokenizer
+    error, which radon resolves by re-tokenizing line by line.
+    """
+    next_row = row
+
+    def readline():
+        nonlocal next_row
+        if next_row >= len(stripped):
+            return ""
+        next_row += 1
+        # The joined text radon tokenizes has no newline after its last line
+        return stripped[next_row - 1] + ("\n" if next_row < len(stripped) else "")
+
+    tokens, depth = [], 0
+    try:
+        for tok in tokenize.generate_tokens(readline):
+            kind = tok.type
+            if kind == tokenize.ERRORTOKEN or kind in (tokenize.INDENT, tokenize.DEDENT, tokenize.ENDMARKER):
+                return None
+            if kind == tokenize.OP and tok.string in "([{":
+                depth += 1
+            elif kind == tokenize.OP and tok.string in ")]}":
+                depth -= 1
+            if kind == tokenize.NEWLINE or (kind == tokenize.NL and depth == 0):
+                end = row + tok.start[0]
+                return end, _group_counts(tokens, end - row, nonblank[end] - nonblank[row])
+            if kind != tokenize.NL:
+                tokens.append((kind, tok.string, tok.start[0], tok.end[0]))
+    except tokenize.TokenError:
+        return None
+    return None
+
+
+def _single_pass_groups(stripped: list, nonblank: list):
+    """
+    Splits the stripped lines into statement groups, tokenizing each line
+    at most once: simple lines are counted directly and only groups with
+    strings, comments, brackets or continuations go through the tokenizer.
+    Returns None when that cannot decide a group.
+    """
+    groups, row = [], 0
+    while row < len(stripped):
+        counts = _simple_group(stripped[row])
+        if counts is not None:
+            groups.append((row, counts))
+            row += 1
+            continue
+        group = _tokenized_group(stripped, row, nonblank)
+        if group is None:
+            return None
+        end, counts = group
+        groups.append((row, counts))
+        row = end
+    return groups
+
+
+def _line_by_line_groups(stripped: list, nonblank: list) -> list:
+    """
+    radon's own grouping: tokenize a line, and while that fails keep
+    appending the next one. Quadratic in the length of multi-line
+    statements, so only used when the single pass cannot decide.
+    """
+    groups, row = [], 0
+    while row < len(stripped):
+        end = row + 1
+        while True:
+            try:
+                tokens = list(tokenize.generate_tokens(io.StringIO("\n".join(stripped[row:end])).readline))
+                if not any(t.type == tokenize.ERRORTOKEN for t in tokens):
+                    break
+            except tokenize.TokenError:
+                pass
+            if end >= len(stripped):
+                raise SyntaxError(f"SyntaxError at line: {row + 1}")
+            end += 1
+        kept = [(t.type, t.string, t.start[0], t.end[0]) for t in tokens
+                if t.type not in (tokenize.NL, tokenize.NEWLINE, tokenize.ENDMARKER)]
+        groups.append((row, _group_counts(kept, end - row, nonblank[end] - nonblank[row])))
+        row = end
+    return groups
+
+
+def raw_groups(text: str) -> tuple:
+    """
+    Raw metrics of every statement group of `text`, with radon's semantics
+    (lines are stripped, then tokenized). Returns (0-based first line of
+    every group, cumulative (lloc, sloc, comments, multi, blank,
+    single_comments) counts with a leading zero row), so the raw metrics of
+    any span are one subtraction.
+    """
+    stripped = [line.strip() for line in text.splitlines()]
+    nonblank = np.concatenate(([0], np.cumsum([bool(line) for line in stripped], dtype=np.int64))).tolist()
+    groups = _single_pass_groups(stripped, nonblank)
+    if groups is None:
+        groups = _line_by_line_groups(stripped, nonblank)
+
+    cumulative = np.zeros((len(groups) + 1, 6), dtype=np.int64)
+    if groups:
+        np.cumsum(np.asarray([counts for _, counts in groups], dtype=np.int64), axis=0, out=cumulative[1:])
+    return np.asarray([start for start, _ in groups], dtype=np.int64), cumulative
+
+
+def _raw_span(starts, cumulative, start: int, end: int = None) -> RawMetrics:
+    """Raw metrics of the 1-based inclusive span start..end (in splitlines numbering)."""
+    lo = np.searchsorted(starts, start - 1, side="left")
+    hi = len(starts) if end is None else np.searchsorted(starts, end - 1, side="right")
+    lloc, sloc, comments, multi, blank, single_comments = (int(v) for v in cumulative[hi] - cumulative[lo])
+    return RawMetrics(sloc + blank + multi + single_comments, lloc, sloc, comments, multi, blank, single_comments)
+
+
+def _splitlines_numbering(parsed):
+    """
+    Maps AST line numbers (split on "\\n") to radon's str.splitlines()
+    numbering as (first, last) sub-line per line, or None when they agree.
+    """
+    if not any(ch in parsed.text for ch in _EXTRA_LINE_BREAKS):
+        return None
+    first, last, offset = [0], [0], 0
+    for line in parsed.lines:
+        first.append(offset + 1)
+        offset += len((line + "\n").splitlines())
+        last.append(offset)
+    return first, last
+
+
+# --------------------------------------------------------------------
+# 🔹 Halstead and cyclomatic complexity: one AST walk for all scopes
+# --------------------------------------------------------------------
+class _ScopeTally:
+    """Halstead counts and cyclomatic decision points of one scope (or the module)."""
+    __slots__ = ("node", "level", "parent", "operators", "operands", "operator_names", "operand_keys",
+                 "decisions", "children")
+
+    def __init__(self, node, level, parent):
+        self.node = node
+        self.level = level
+        self.parent = parent
+        self.operators = self.operands = self.decisions = 0
+        self.operator_names = set()
+        self.operand_keys = set()
+        self.children = []
+
+    def halstead(self) -> tuple:
+        h1, h2 = len(self.operator_names), len(self.operand_keys)
+        n1, n2 = self.operators, self.operands
+        vocabulary, length = h1 + h2, n1 + n2
+        calculated_length = h1 * math.log(h1, 2) + h2 * math.log(h2, 2) if h1 and h2 else 0
+        volume = length * math.log(vocabulary, 2) if vocabulary else 0
+        difficulty = (h1 * n2) / float(2 * h2) if h2 else 0
+        effort = difficulty * volume
+        return (h1, h2, n1, n2, vocabulary, length, calculated_length,
+                volume, difficulty, effort, effort / 18.0, volume / 3000.0)
+
+    def complexity(self) -> int:
+        """
+        radon's cyclomatic complexity of this scope: nested functions and
+        classes are measured on their own, except that a class includes
+        its methods; the module adds every top-level block's decisions.
+        """
+        if isinstance(self.node, DEF_TYPES):
+            return 1 + self.decisions
+        methods = sum(1 + child.decisions for child in self.children if isinstance(child.node, DEF_TYPES))
+        if isinstance(self.node, ast.ClassDef):
+            return 1 + self.decisions + methods
+        return 1 + self.decisions + sum(
+            child.decisions if isinstance(child.node, DEF_TYPES) else child.complexity() - 1
+            for child in self.children
+        )
+
+
+def _operand_key(node):
+    kind = type(node)
+    if kind is ast.Name:
+        return node.id
+    if kind is ast.Attribute:
+        return node.attr
+    if kind is ast.Constant:
+        return node.value
+    return node  # any other expression is its own distinct operand
+
+
+def _operator_name(node) -> tuple:
+    return (type(node.op).__name__,)
+
+
+# Node type -> (operator names, operand nodes) for the nodes radon counts as operators
+_HALSTEAD_EVENTS = {
+    ast.BinOp: lambda node: (_operator_name(node), (node.left, node.right)),
+    ast.UnaryOp: lambda node: (_operator_name(node), (node.operand,)),
+    ast.BoolOp: lambda node: (_operator_name(node), node.values),
+    ast.AugAssign: lambda node: (_operator_name(node), (node.target, node.value)),
+    ast.Compare: lambda node: (tuple(type(op).__name__ for op in node.ops), (*node.comparators, node.left)),
+}
+
+
+def _match_decisions(node) -> int:
+    wildcard = any(getattr(case.pattern, "pattern", False) is None for case in node.cases)
+    return max(0, len(node.cases) - wildcard)
+
+
+# Node type -> cyclomatic decision points
+_DECISIONS = {
+    ast.If: lambda node: 1,
+    ast.IfExp: lambda node: 1,
+    ast.Assert: lambda node: 1,
+    ast.BoolOp: lambda node: len(node.values) - 1,
+    ast.Try: lambda node: len(node.handlers) + bool(node.orelse),
+    ast.For: lambda node: 1 + bool(node.orelse),
+    ast.While: lambda node: 1 + bool(node.orelse),
+    ast.AsyncFor: lambda node: 1 + bool(node.orelse),
+    ast.comprehension: lambda node: 1 + len(node.ifs),
+    ast.Match: _match_decisions,
+}
+
+# Childless marker nodes (Load, Add, Eq, ...) that would only cost a stack push each
+_LEAF_TYPES = (ast.expr_context, ast.boolop, ast.operator, ast.unaryop, ast.cmpop)
+
+
+def _children(node) -> list:
+    """ast.iter_child_nodes without the marker leaves, as a list."""
+    children = []
+    for field in node._fields:
+        value = getattr(node, field, None)
+        if isinstance(value, list):
+            children.extend(item for item in value if isinstance(item, ast.AST) and not isinstance(item, _LEAF_TYPES))
+        elif isinstance(value, ast.AST) and not isinstance(value, _LEAF_TYPES):
+            children.append(value)
+    return children
+
+
+def _walk_scopes(tree) -> list:
+    """
+    Tallies every scope in one iterative walk. Halstead operators and
+    operands are added to every enclosing scope; an operand's distinct key
+    is (innermost function name, value), with the function name dropped
+    for scopes the function is not inside. Decision points go to the
+    innermost scope only. Like radon, function signatures and decorators
+    are skipped, class bases and decorators count for Halstead only, and
+    nothing under an `assert` adds complexity.
+    """
+    module = _ScopeTally(tree, 0, None)
+    tallies = [module]
+    # node, enclosing tallies (module first), innermost function (name, level), complexity counted?
+    stack = [(tree, (module,), (None, 0), True)]
+    while stack:
+        node, chain, function, counted = stack.pop()
+        kind = type(node)
+
+        event = _HALSTEAD_EVENTS.get(kind)
+        if event is not None:
+            names, operands = event(node)
+            keys = [_operand_key(operand) for operand in operands]
+            name, level = function
+            for tally in chain:
+                tally.operators += len(names)
+                tally.operands += len(keys)
+                tally.operator_names.update(names)
+                context = name if level >= tally.level else None
+                tally.operand_keys.update([(context, key) for key in keys])
+        if counted:
+            decisions = _DECISIONS.get(kind)
+            if decisions is not None:
+                chain[-1].decisions += decisions(node)
+
+        if kind in SCOPE_TYPES:
+            tally = _ScopeTally(node, len(chain), chain[-1])
+            chain[-1].children.append(tally)
+            tallies.append(tally)
+            inner = chain + (tally,)
+            if kind is not ast.ClassDef:
+                scope_function = (node.name, tally.level)
+                stack.extend([(child, inner, scope_function, True) for child in reversed(node.body)])
+                continue
+            stack.extend([(child, inner, function, True) for child in reversed(node.body)])
+            header = [*node.bases, *node.keywords, *node.decorator_list]
+            stack.extend([(child, inner, function, False) for child in header])
+            continue
+
+        counted = counted and kind is not ast.Assert
+        stack.extend([(child, chain, function, counted) for child in _children(node)])
+    return tallies
+
+
+# --------------------------------------------------------------------
+# 🔹 Maintainability index and the per-file result
+# --------------------------------------------------------------------
+def maintainability_index(volume, complexity, lloc, comment_pct) -> float:
+    """The MI formula radon's mi_compute uses (with multi-line strings counted as comments)."""
+    if volume <= 0 or lloc <= 0:
+        return 100.0
+    comments_scale = math.sqrt(2.46 * math.radians(comment_pct))
+    nn_mi = (171 - 5.2 * math.log(volume) - 0.23 * complexity - 16.2 * math.log(lloc)
+             + 50 * math.sin(comments_scale))
+    return min(max(0.0, nn_mi * 100 / 171.0), 100.0)
+
+
+def _metric_values(raw: RawMetrics, halstead: tuple, complexity: int) -> tuple:
+    comment_pct = (raw.comments + raw.multi) / float(raw.sloc) * 100 if raw.sloc else 0
+    return (
+        raw.loc, raw.lloc, raw.sloc,
+        raw.comments, raw.single_comments, raw.multi,
+        raw.blank, *halstead,
+        maintainability_index(halstead[7], complexity, raw.lloc, comment_pct),
+        complexity,
+    )
+
+
+class SourceMetrics:
+    """
+    Raw, Halstead, maintainability and cyclomatic metrics of one file and
+    of each of its function / class scopes, laid out as
+    feature_schema.METRIC_NAMES. Values are plain Python numbers; `record`
+    copies them into the float32 layout the models read.
+    """
+
+    def __init__(self, file_values: tuple, scope_values: dict):
+        self.file_values = file_values
+        self._scope_values = scope_values
+
+    def values(self, node=None) -> tuple:
+        """Metric values of the file, or of the scope whose AST node is `node`."""
+        return self.file_values if node is None else self._scope_values[node]
+
+    def record(self, node=None, out=None) -> np.ndarray:
+        record = out if out is not None else np.zeros(len(METRIC_NAMES), dtype=METRIC_DTYPE)
+        record[:] = self.values(node)
+        return record
+
+    def halstead(self, node=None) -> dict:
+        """The Halstead report as a dict keyed by HALSTEAD_FIELDS."""
+        return dict(zip(HALSTEAD_FIELDS, self.values(node)[7:19]))
+
+
+def _measure(parsed) -> SourceMetrics:
+    # Tokens first: radon reported tokenization errors before parse errors
+    starts, cumulative = raw_groups(parsed.text)
+    tallies = _walk_scopes(parsed.tree)
+    numbering = _splitlines_numbering(parsed)
+
+    module = tallies[0]
+    file_values = _metric_values(_raw_span(starts, cumulative, 1), module.halstead(), module.complexity())
+    scope_values = {}
+    for tally in tallies[1:]:
+        node = tally.node
+        start, end = node.lineno, node.end_lineno or node.lineno
+        if numbering is not None:
+            start, end = numbering[0][start], numbering[1][end]
+        raw = _raw_span(starts, cumulative, start, end)
+        scope_values[node] = _metric_values(raw, tally.halstead(), tally.complexity())
+    return SourceMetrics(file_values, scope_values)
+
+
+def measure(parsed) -> SourceMetrics:
+    """
+    Metrics of a ParsedSource from one tokenization and one AST walk,
+    computed once and shared by every stage that asks. Raises SyntaxError
+    for sources that cannot be tokenized or parsed.
+    """
+    return parsed.derived("code_metrics", _measure)
+
+
+def measure_scopes(parsed, nodes) -> SourceMetrics:
+    """
+    Metrics of just the given function / class nodes of a ParsedSource, for
+    callers that need a few scopes rather than the file: only their lines
+    are tokenized and only their subtrees walked (a scope nested in another
+    one asked for comes from the outer walk). The values equal
+    measure(parsed).values(node); the result has no file values.
+    """
+    if _splitlines_numbering(parsed) is not None:
+        metrics = measure(parsed)
+        return SourceMetrics(None, {node: metrics.values(node) for node in nodes})
+
+    wanted = set(nodes)
+    scope_values = {}
+    for root in sorted(wanted, key=lambda node: node.lineno):
+        if root in scope_values:
+            continue
+        start, end = root.lineno, root.end_lineno or root.lineno
+        starts, cumulative = raw_groups(parsed.segment(start, end))
+        for tally in _walk_scopes(ast.Module(body=[root], type_ignores=[]))[1:]:
+            node = tally.node
+            if node in wanted:
+                raw = _raw_span(starts, cumulative, node.lineno - start + 1,
+                                (node.end_lineno or node.lineno) - start + 1)
+                scope_values[node] = _metric_values(raw, tally.halstead(), tally.complexity())
+    return SourceMetrics(None, scope_values)
@@ -0,0 +1,110 @@
+import os
+import numpy as np
+
+# Suffix of the array-backed export next to a model pickle
+COMPACT_SUFFIX = ".npz"
+
+
+def compact_path(model_path: str) -> str:
+    return os.path.splitext(model_path)[0] + COMPACT_SUFFIX
+
+
+def is_exportable(model) -> bool:
+    """Decision trees and forests of them (anything exposing `tree_` / `estimators_`)."""
+    return hasattr(model, "tree_") or (
+        hasattr(model, "estimators_") and all(hasattr(est, "tree_") for est in model.estimators_)
+    )
+
+
+# --------------------------------------------------------------------
+# 🔹 Export: flatten every tree into shared node arrays
+# --------------------------------------------------------------------
+def export_compact(model, path: str) -> str:
+    """
+    Writes a fitted decision tree or random forest as flat numpy arrays:
+    one row per node across all trees, child indices already offset to the
+    shared arrays, and per-leaf class probabilities. Only duck-typed model
+    attributes are read, so this module never imports scikit-learn.
+    """
+    if not is_exportable(model):
+        raise TypeError(f"{type(model).__name__} is not a tree ensemble")
+
+    trees = [model.tree_] if hasattr(model, "tree_") else [est.tree_ for est in model.estimators_]
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        left = tree.children_left.astype(np.int32)
+        right = tree.children_right.astype(np.int32)
+        is_leaf = left == -1
+        value = tree.value[:, 0, :].astype(np.float64)
+        totals = value.sum(axis=1, keepdims=True)
+        value = np.divide(value, totals, out=np.zeros_like(value), where=totals > 0)
+
+        roots.append(offset)
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(tree.threshold.astype(np.float64))
+        # Leaves point at themselves so traversal can run a fixed number of steps
+        own = np.arange(offset, offset + tree.node_count, dtype=np.int32)
+        lefts.append(np.where(is_leaf, own, left + offset))
+        rights.append(np.where(is_leaf, own, right + offset))
+        values.append(value)
+        offset += tree.node_count
+
+    np.savez(
+        path,
+        feature=np.concatenate(features),
+        threshold=np.concatenate(thresholds),
+        left=np.concatenate(lefts),
+        right=np.concatenate(rights),
+        value=np.concatenate(values),
+        roots=np.asarray(roots, dtype=np.int32),
+        classes=np.asarray(model.classes_),
+        max_depth=np.int32(max(tree.max_depth for tree in trees)),
+        n_features=np.int32(model.n_features_in_),
+    )
+    return path
+
+
+# --------------------------------------------------------------------
+# 🔹 Inference: vectorized traversal of every tree at once
+# --------------------------------------------------------------------
+class CompactForest:
+    """
+    numpy-only stand-in for a fitted tree / forest classifier. `predict`
+    walks all trees for all rows together, `max_depth` steps, and averages
+    the leaf probabilities the way scikit-learn's forests do.
+    """
+
+    def __init__(self, arrays):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.classes_ = arrays["classes"]
+        self.max_depth = int(arrays["max_depth"])
+        self.n_features_in_ = int(arrays["n_features"])
+
+    @classmethod
+    def load(cls, path: str) -> "CompactForest":
+        with np.load(path, allow_pickle=False) as data:
+            return cls({name: data[name] for name in data.files})
+
+    def apply(self, X) -> np.ndarray:
+        """Leaf index (into the shared arrays) reached by every row in every tree."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        rows = np.arange(X.shape[0])[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], len(self.roots)))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_proba(self, X) -> np.ndarray:
+        return self.value[self.apply(X)].mean(axis=1)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
@@ -0,0 +1,447 @@
+import ast
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from analyzer.parsed_source import as_parsed
+from analyzer.smell_localizer import collect_scopes
+
+# Define base directory for backend
+base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+DUPLICATE_DB_PATH = os.getenv("DUPLICATE_DB_PATH", os.path.join(base_dir, "results", "duplicates.db"))
+DUPLICATE_DETECTION = os.getenv("DUPLICATE_DETECTION", "1") == "1"
+# Functions with fewer AST nodes are not fingerprinted (getters, one-line wrappers)
+DUPLICATE_MIN_NODES = int(os.getenv("DUPLICATE_MIN_NODES", 40))
+# Estimated Jaccard similarity of shingle sets from which a pair is reported
+DUPLICATE_THRESHOLD = float(os.getenv("DUPLICATE_THRESHOLD", 0.8))
+DUPLICATE_MAX_MATCHES = int(os.getenv("DUPLICATE_MAX_MATCHES", 5))
+# Retention: only the most recently indexed documents are kept, none older than
+# the age limit (0 = no limit); dropped documents are re-indexed when analyzed again
+DUPLICATE_MAX_DOCUMENTS = int(os.getenv("DUPLICATE_MAX_DOCUMENTS", 10000))
+DUPLICATE_MAX_AGE_DAYS = float(os.getenv("DUPLICATE_MAX_AGE_DAYS", 0))
+
+# Signature layout; stored in the index, which is cleared when these change.
+# 16 bands of 8 rows make pairs above ~0.7 similarity very likely to share a bucket.
+SHINGLE_SIZE = 5
+MINHASH_PERMUTATIONS = 128
+LSH_BANDS = 16
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+MINHASH_SEED = 1
+NORMALIZATION_VERSION = "ast-1"
+HASH_FAMILY = "multiply-shift"
+
+_MAX_HASH = np.uint64((1 << 32) - 1)
+# Multiply-shift permutations: (a * x + b) mod 2^64, top 32 bits; a is odd
+_rng = np.random.RandomState(MINHASH_SEED)
+_PERM_A = _rng.randint(0, 1 << 63, size=MINHASH_PERMUTATIONS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_PERM_B = _rng.randint(0, 1 << 63, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+# Keys or ids per SQLite statement when looking up buckets and fragments
+_QUERY_CHUNK = 400
+
+
+# --------------------------------------------------------------------
+# 🔹 Function fingerprints: normalized AST shingles -> MinHash
+# --------------------------------------------------------------------
+_FUNCTION_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef)
+# Nodes whose fields hold no further labelled nodes (only names, values or contexts)
+_LEAF_TYPES = {ast.Name, ast.Constant, ast.Pass, ast.Break, ast.Continue, ast.Global, ast.Nonlocal}
+_type_codes = {}
+_constant_codes = {}
+
+
+def _code(label: str) -> int:
+    return zlib.crc32(label.encode("ascii"))
+
+
+def _label_code(node) -> int:
+    """
+    Stable 32-bit code of a node's normalized label: its type, plus the value
+    type for constants. Identifiers, literals, comments and layout are left
+    out, so renamed or reformatted copies fingerprint alike.
+    """
+    kind = type(node)
+    if kind is ast.Constant:
+        value_type = type(node.value)
+        code = _constant_codes.get(value_type)
+        if code is None:
+            code = _constant_codes[value_type] = _code("Constant:" + value_type.__name__)
+        return code
+    code = _type_codes.get(kind)
+    if code is None:
+        code = _type_codes[kind] = _code(kind.__name__)
+    return code
+
+
+def _node_sequence(parsed) -> tuple:
+    """
+    Label codes of the whole tree in pre-order, and the (first, end) slice
+    of every function's subtree in it, from one walk shared by all functions.
+    Expression contexts (Load / Store / Del) are not labelled.
+    """
+    codes, spans = [], {}
+    stack = [parsed.tree]
+    while stack:
+        node = stack.pop()
+        if type(node) is tuple:
+            # Leaving a function: its subtree ends here
+            spans[node[0]] = (node[1], len(codes))
+            continue
+        codes.append(_label_code(node))
+        if type(node) in _LEAF_TYPES:
+            continue
+        if isinstance(node, _FUNCTION_TYPES):
+            stack.append((node, len(codes) - 1))
+        children = []
+        for field in node._fields:
+            value = getattr(node, field, None)
+            if isinstance(value, list):
+                children.extend(item for item in value if isinstance(item, ast.AST))
+            elif isinstance(value, ast.AST) and not isinstance(value, ast.expr_context):
+                children.append(value)
+        children.reverse()
+        stack.extend(children)
+    return np.array(codes, dtype=np.uint64), spans
+
+
+def shingle_hashes(codes: np.ndarray) -> np.ndarray:
+    """32-bit hashes of every SHINGLE_SIZE-long window of label codes."""
+    count = len(codes) - SHINGLE_SIZE + 1
+    hashes = np.zeros(count, dtype=np.uint64)
+    for offset in range(SHINGLE_SIZE):
+        hashes = hashes * np.uint64(1000003) + codes[offset:offset + count]
+    return (hashes ^ (hashes >> np.uint64(32))) & _MAX_HASH
+
+
+def minhash(hashes: np.ndarray) -> np.ndarray:
+    """MinHash signature (uint32, MINHASH_PERMUTATIONS values) of a set of 32-bit shingle hashes."""
+    permuted = (hashes[:, None] * _PERM_A + _PERM_B) >> np.uint64(32)
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def band_keys(signature: np.ndarray) -> list:
+    """The LSH bucket key of every band: the band's rows as bytes."""
+    return [band.tobytes() for band in signature.reshape(LSH_BANDS, LSH_ROWS)]
+
+
+def fingerprint_functions(source) -> list:
+    """
+    One fragment per function or method large enough to fingerprint:
+    {"function", "start", "end", "nodes", "signature"}. Sources that cannot
+    be parsed have no fragments.
+    """
+    parsed = as_parsed(source)
+    try:
+        codes, spans = parsed.derived("duplicate_nodes", _node_sequence)
+        scopes = collect_scopes(parsed)
+    except Exception:
+        return []
+
+    fragments = []
+    for scope in scopes:
+        if scope["kind"] != "function" or scope["node"] not in spans:
+            continue
+        first, end = spans[scope["node"]]
+        if end - first < max(DUPLICATE_MIN_NODES, SHINGLE_SIZE):
+            continue
+        fragments.append({
+            "function": scope["qualname"],
+            "start": scope["start"],
+            "end": scope["end"],
+            "nodes": end - first,
+            "signature": minhash(np.unique(shingle_hashes(codes[first:end]))),
+        })
+    return fragments
+
+
+# --------------------------------------------------------------------
+# 🔹 Persistent LSH index (SQLite)
+# --------------------------------------------------------------------
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    name  TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS documents (
+    document    TEXT PRIMARY KEY,
+    source_hash TEXT,
+    indexed_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_indexed_at ON documents (indexed_at);
+
+CREATE TABLE IF NOT EXISTS fragments (
+    id          INTEGER PRIMARY KEY,
+    document    TEXT NOT NULL REFERENCES documents (document) ON DELETE CASCADE,
+    function    TEXT NOT NULL,
+    start_line  INTEGER,
+    end_line    INTEGER,
+    nodes       INTEGER,
+    signature   BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fragments_document ON fragments (document);
+
+CREATE TABLE IF NOT EXISTS buckets (
+    band        INTEGER NOT NULL,
+    key         BLOB NOT NULL,
+    fragment_id INTEGER NOT NULL REFERENCES fragments (id) ON DELETE CASCADE,
+    PRIMARY KEY (band, key, fragment_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS buckets_fragment ON buckets (fragment_id);
+"""
+
+INDEX_PARAMS = json.dumps({
+    "shingle": SHINGLE_SIZE, "permutations": MINHASH_PERMUTATIONS, "bands": LSH_BANDS,
+    "seed": MINHASH_SEED, "normalization": NORMALIZATION_VERSION, "hash": HASH_FAMILY,
+}, sort_keys=True)
+
+
+def _nested(a, b) -> bool:
+    return a["start_line"] <= b["end_line"] and b["start_line"] <= a["end_line"]
+
+
+class DuplicateIndex:
+    """
+    Function fingerprints of every document analyzed so far, bucketed by
+    LSH band. A lookup only reads the buckets a signature falls into, so
+    finding near-duplicates costs the same however many functions are
+    stored. Each document keeps only its latest revision, and `prune`
+    enforces the retention limits. WAL mode and a connection per thread,
+    as in the result store.
+    """
+
+    def __init__(self, path=DUPLICATE_DB_PATH, max_documents=DUPLICATE_MAX_DOCUMENTS,
+                 max_age_days=DUPLICATE_MAX_AGE_DAYS):
+        self.path = path
+        self.max_documents = max_documents
+        self.max_age_days = max_age_days
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        with self._init_lock:
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.executescript(SCHEMA)
+                self._check_params(conn)
+                self._initialized = True
+        conn.execute("PRAGMA synchronous = NORMAL")
+        self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _check_params(conn):
+        """Signatures built with other parameters are not comparable: drop them."""
+        row = conn.execute("SELECT value FROM meta WHERE name = 'params'").fetchone()
+        if row is not None and row["value"] == INDEX_PARAMS:
+            return
+        with conn:
+            conn.execute("DELETE FROM documents")
+            conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('params', ?)", (INDEX_PARAMS,))
+
+    @staticmethod
+    def _stored(conn, document: str) -> list:
+        return conn.execute(
+            "SELECT id, document, function, start_line, end_line, nodes, signature"
+            " FROM fragments WHERE document = ? ORDER BY id", (document,)
+        ).fetchall()
+
+    def ensure(self, document: str, source_hash: str, fingerprint) -> list:
+        """
+        Makes `document` hold the fragments of revision `source_hash`,
+        replacing any other revision, and returns its fragment rows.
+        `fingerprint()` is only called when that revision is not stored yet.
+        """
+        conn = self._connect()
+        if source_hash is not None:
+            row = conn.execute("SELECT source_hash FROM documents WHERE document = ?", (document,)).fetchone()
+            if row is not None and row["source_hash"] == source_hash:
+                return self._stored(conn, document)
+
+        fragments = fingerprint()
+        with conn:
+            # Cascades to the previous revision's fragments and buckets
+            conn.execute("DELETE FROM documents WHERE document = ?", (document,))
+            conn.execute("INSERT INTO documents (document, source_hash, indexed_at) VALUES (?, ?, ?)",
+                         (document, source_hash, time.time()))
+            for fragment in fragments:
+                cursor = conn.execute(
+                    "INSERT INTO fragments (document, function, start_line, end_line, nodes, signature)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (document, fragment["function"], fragment["start"], fragment["end"],
+                     fragment["nodes"], fragment["signature"].tobytes()),
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO buckets (band, key, fragment_id) VALUES (?, ?, ?)",
+                    [(band, key, cursor.lastrowid) for band, key in enumerate(band_keys(fragment["signature"]))],
+                )
+        return self._stored(conn, document)
+
+    def query(self, rows: list, threshold: float = DUPLICATE_THRESHOLD, limit: int = DUPLICATE_MAX_MATCHES) -> dict:
+        """
+        {fragment id: matches} for stored fragment rows (from `ensure`): every
+        other fragment sharing an LSH bucket whose signature agrees on at
+        least `threshold` of its values, most similar first.
+        """
+        conn = self._connect()
+        rows_by_id = {row["id"]: row for row in rows}
+        signatures = {row["id"]: np.frombuffer(row["signature"], dtype=np.uint32) for row in rows}
+        wanted = {(band, key) for sig in signatures.values() for band, key in enumerate(band_keys(sig))}
+
+        by_band = {}
+        for band, key in wanted:
+            by_band.setdefault(band, []).append(key)
+        buckets = {}
+        for band, keys in by_band.items():
+            for i in range(0, len(keys), _QUERY_CHUNK):
+                chunk = keys[i:i + _QUERY_CHUNK]
+                for key, fragment_id in conn.execute(
+                    f"SELECT key, fragment_id FROM buckets WHERE band = ? AND key IN ({','.join('?' for _ in chunk)})",
+                    [band, *chunk],
+                ):
+                    buckets.setdefault((band, key), set()).add(fragment_id)
+
+        candidates = {}
+        for fragment_id, sig in signatures.items():
+            found = set()
+            for band, key in enumerate(band_keys(sig)):
+                found |= buckets.get((band, key), set())
+            found.discard(fragment_id)
+            candidates[fragment_id] = found
+
+        details = self._fragments(conn, set().union(*candidates.values()) if candidates else set())
+        matches = {}
+        for fragment_id, found in candidates.items():
+            scored = []
+            for other in found:
+                row = details[other]
+                if row["document"] == rows_by_id[fragment_id]["document"] and _nested(row, rows_by_id[fragment_id]):
+                    continue  # a function and one nested inside it
+                similarity = float(np.mean(signatures[fragment_id] == row["signature"]))
+                if similarity >= threshold:
+                    scored.append({
+                        "document": row["document"],
+                        "function": row["function"],
+                        "start": row["start_line"],
+                        "end": row["end_line"],
+                        "similarity": round(similarity, 3),
+                    })
+            if scored:
+                scored.sort(key=lambda m: (-m["similarity"], m["document"], m["start"] or 0))
+                matches[fragment_id] = scored[:limit]
+        return matches
+
+    def _fragments(self, conn, ids: set) -> dict:
+        ids, found = list(ids), {}
+        for i in range(0, len(ids), _QUERY_CHUNK):
+            chunk = ids[i:i + _QUERY_CHUNK]
+            for row in conn.execute(
+                f"SELECT id, document, function, start_line, end_line, signature FROM fragments"
+                f" WHERE id IN ({','.join('?' for _ in chunk)})", chunk,
+            ):
+                found[row["id"]] = {**dict(row), "signature": np.frombuffer(row["signature"], dtype=np.uint32)}
+        return found
+
+    def prune(self) -> int:
+        """
+        Drops documents indexed more than `max_age_days` ago and all but the
+        `max_documents` most recently indexed ones, with their fragments and
+        buckets. Returns the number of documents dropped.
+        """
+        conn = self._connect()
+        removed = 0
+        with conn:
+            if self.max_age_days:
+                removed += conn.execute("DELETE FROM documents WHERE indexed_at < ?",
+                                        (time.time() - self.max_age_days * 86400,)).rowcount
+            if self.max_documents:
+                removed += conn.execute(
+                    "DELETE FROM documents WHERE document IN"
+                    " (SELECT document FROM documents ORDER BY indexed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_documents,),
+                ).rowcount
+        return removed
+
+    def stats(self) -> dict:
+        row = self._connect().execute(
+            "SELECT (SELECT COUNT(*) FROM documents) AS documents, (SELECT COUNT(*) FROM fragments) AS fragments"
+        ).fetchone()
+        return dict(row)
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_duplicate_index() -> DuplicateIndex:
+    """Returns the process-wide duplicate index."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = DuplicateIndex()
+        return _index
+
+
+# --------------------------------------------------------------------
+# 🔹 Near-duplicate reports
+# --------------------------------------------------------------------
+def _report(rows: list, matches: dict) -> list:
+    return [
+        {
+            "function": row["function"],
+            "start": row["start_line"],
+            "end": row["end_line"],
+            "nodes": row["nodes"],
+            "matches": matches[row["id"]],
+        }
+        for row in rows if row["id"] in matches
+    ]
+
+
+def find_duplicates_many(documents: list, index: DuplicateIndex = None) -> dict:
+    """
+    Indexes every (document, source, source_hash, fragments) entry, then
+    reports each one's near-duplicates among everything indexed, including
+    the other documents of the same call. `fragments` may be None to
+    fingerprint `source` when the index does not have that revision yet.
+    The retention limits are applied once all lookups are done.
+    Returns {document: [{"function", "start", "end", "nodes", "matches"}]}.
+    """
+    if not DUPLICATE_DETECTION:
+        return {document: [] for document, *_ in documents}
+    index = index or get_duplicate_index()
+    stored = {}
+    for document, source, source_hash, fragments in documents:
+        fingerprint = (lambda f=fragments: f) if fragments is not None else (
+            lambda s=source: fingerprint_functions(s))
+        stored[document] = index.ensure(document, source_hash, fingerprint)
+    found = {document: _report(rows, index.query(rows)) for document, rows in stored.items()}
+    index.prune()
+    return found
+
+
+def find_duplicates(document: str, source, source_hash: str = None, index: DuplicateIndex = None) -> list:
+    """Indexes one document's functions and reports their near-duplicates (see find_duplicates_many)."""
+    parsed = as_parsed(source)
+    return find_duplicates_many([(document, parsed, source_hash or parsed.digest, None)], index)[document]
@@ -1,68 +1,70 @@
-import ast
-from radon.raw import analyze
-from radon.metrics import h_visit, mi_visit
+import logging
+
+import numpy as np
+from analyzer.code_metrics import measure
+from analyzer.feature_schema import FEATURE_COLUMNS, METRIC_DTYPE, METRIC_NAMES, column_index, project
+from analyzer.parsed_source import as_parsed
+from analyzer.smell_localizer import localize
+
+logger = logging.getLogger(__name__)
 
 # --------------------------------------------------------------------
 # 🔹 1. Extract 19 software metrics for ML detection
 # --------------------------------------------------------------------
-def extract_features(file_path):
+def extract_metric_record(file_path, out=None) -> np.ndarray:
     """
-    Extracts 19 detailed features (dataset-aligned) using Radon + AST.
+    Measures one file (path or ParsedSource) straight into a float32 record
+    laid out as feature_schema.METRIC_NAMES. `out` lets batch callers fill
+    a row of a preallocated matrix in place. Raw, Halstead, maintainability
+    and cyclomatic metrics all come from code_metrics' single pass.
     """
-    with open(file_path, "r", encoding="utf-8") as f:
-        source = f.read()
+    return measure(as_parsed(file_path)).record(out=out)
 
-    # ✅ Basic metrics
-    raw_metrics = analyze(source)
 
-    lloc = raw_metrics.lloc
-    sloc = raw_metrics.sloc
-    scloc = raw_metrics.sloc
-    comments = raw_metrics.comments
-    multi_comr = raw_metrics.multi
-    single_com = comments - multi_comr
-    blanks = raw_metrics.blank
-
-    # ✅ Halstead metrics
+def extract_scope_record(parsed, scope: dict, out=None, metrics=None) -> np.ndarray:
+    """
+    Measures one function or class scope (from smell_localizer.collect_scopes)
+    into a metric record laid out like extract_metric_record's, so the file
+    models can label scopes too. Every scope was measured in the same pass
+    as the file, unless `metrics` passes scopes measured on their own
+    (code_metrics.measure_scopes); unmeasurable scopes are all NaN.
+    """
     try:
-        h_reports = h_visit(source)
-        if isinstance(h_reports, list) and len(h_reports) > 0:
-            h_data = h_reports[0]._asdict()
-        elif hasattr(h_reports, "total"):
-            h_data = h_reports.total._asdict()
-        elif hasattr(h_reports, "_asdict"):
-            h_data = h_reports._asdict()
-        else:
-            h_data = {}
-    except Exception as e:
-        print(f"⚠️ Halstead metric extraction failed: {e}")
-        h_data = {}
- 
-    h1 = h_data.get("h1", 0)
-    h2 = h_data.get("h2", 0)
-    n1 = h_data.get("n1", 0)
-    n2 = h_data.get("n2", 0)
-    vocabulary = h_data.get("vocabulary", 0)
-    length = h_data.get("length", 0)
-    volume = h_data.get("volume", 0)
-    difficulty = h_data.get("difficulty", 0)
-    effort = h_data.get("effort", 0)
-
-    # ✅ Maintainability index
-    maintainability_index = mi_visit(source, True)
-
-    # ✅ Combine everything
-    features = {
-        "lloc": lloc, "sloc": sloc, "scloc": scloc, "comments": comments,
-        "single_com": single_com, "multi_comr": multi_comr, "blanks": blanks,
-        "h1": h1, "h2": h2, "n1": n1, "n2": n2, "vocabulary": vocabulary,
-        "length": length, "volume": volume, "difficulty": difficulty,
-        "effort": effort, "maintainability_index": maintainability_index
-    }
-    print("\n🔍 Extracted 19 Features from:", file_path)
-    for k, v in features.items():
-        print(f"   {k:<25}: {v}")
-    print(f"➡️ Total Features Extracted: {len(features)}\n")
+        return (metrics or measure(parsed)).record(scope["node"], out=out)
+    except Exception:
+        record = out if out is not None else np.zeros(len(METRIC_NAMES), dtype=METRIC_DTYPE)
+        record[:] = np.nan
+        return record
+
+
+def extract_features_many(paths, columns=FEATURE_COLUMNS) -> np.ndarray:
+    """
+    Extracts a (len(paths), len(columns)) float32 matrix in `columns` order.
+    Rows of files that cannot be measured (syntax / decode errors) are NaN.
+    """
+    records = np.zeros((len(paths), len(METRIC_NAMES)), dtype=METRIC_DTYPE)
+    for row, path in enumerate(paths):
+        try:
+            extract_metric_record(path, out=records[row])
+        except Exception:
+            records[row] = np.nan
+    return project(records, column_index(columns))
+
+
+def extract_features(file_path):
+    """
+    Extracts the 19 dataset-aligned features (plus the maintainability index
+    and cyclomatic complexity) as a dict keyed by feature_schema.METRIC_NAMES.
+    Accepts a path or a shared ParsedSource; the AST is parsed only once.
+    """
+    parsed = as_parsed(file_path)
+    features = dict(zip(METRIC_NAMES, extract_metric_record(parsed).tolist()))
+
+    # Formatting 21 lines per request is not free, so skip it unless debugging
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Extracted %d metrics (%d model features) from %s:\n%s",
+                     len(features), len(FEATURE_COLUMNS), parsed.path,
+                     "\n".join(f"   {k:<25}: {v}" for k, v in features.items()))
 
     return features
 
@@ -72,43 +74,21 @@ def extract_features(file_path):
 def find_long_methods(file_path, threshold=10):
     """
     Detects Long Method smells using AST traversal.
-    Returns a list of functions that exceed 'threshold' lines.
+    Returns a list of functions (sync or async) that span at least 'threshold' lines.
     """
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            source = f.read()
-
-        tree = ast.parse(source)
-        long_methods = []
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                start_line = node.lineno
-                end_line = max(
-                    [n.lineno for n in ast.walk(node) if hasattr(n, "lineno")],
-                    default=start_line
-                )
-                length = end_line - start_line + 1
-
-                if length >= threshold:
-                    lines = source.split('\n')
-                    snippet = '\n'.join(lines[start_line-1:end_line])
-                    long_methods.append({
-                        "function": node.name, "start": start_line, "end": end_line,
-                        "length": length, "code_snippet": snippet
-                    })
-
-        print(f"\n🔍 AST Long Method Detection Results for {file_path}:")
-        if not long_methods:
-            print("   ⚠️ No long methods found.")
-        else:
-            for m in long_methods:
-                print(f"   🧩 {m['function']} → Lines {m['start']}-{m['end']} ({m['length']} lines)")
+        parsed = as_parsed(file_path)
+        long_methods = localize(parsed, long_threshold=threshold)["long_methods"]
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("AST long method detection for %s: %s", parsed.path, ", ".join(
+                f"{m['function']} (lines {m['start']}-{m['end']}, {m['length']} lines)" for m in long_methods
+            ) or "no long methods found")
 
         return long_methods
 
     except Exception as e:
-        print(f"❌ Error in find_long_methods: {e}")
+        logger.warning("Error in find_long_methods: %s", e)
         return [{"error": str(e)}]
 
 # --------------------------------------------------------------------
@@ -119,29 +99,9 @@ def find_large_classes(file_path, method_threshold=8, line_threshold=50):
     Detects classes that are too large (many methods or lines).
     """
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            source = f.read()
-        tree = ast.parse(source)
-        large_classes = []
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                start = node.lineno
-                end = max([n.lineno for n in ast.walk(node) if hasattr(n, "lineno")], default=start)
-                total_lines = end - start + 1
-                methods = [n for n in node.body if isinstance(n, ast.FunctionDef)]
-                num_methods = len(methods)
-
-                if total_lines > line_threshold or num_methods > method_threshold:
-                    lines = source.split('\n')
-                    snippet = '\n'.join(lines[start-1:end])
-                    large_classes.append({
-                        "class": node.name, "start": start, "end": end,
-                        "lines": total_lines, "num_methods": num_methods,
-                        "code_snippet": snippet
-                    })
-
-        return large_classes
+        return localize(
+            file_path, method_threshold=method_threshold, line_threshold=line_threshold
+        )["large_classes"]
 
     except Exception as e:
         return [{"error": str(e)}]
\ No newline at end of file
@@ -0,0 +1,46 @@
+import numpy as np
+
+# --------------------------------------------------------------------
+# 🔹 Declared feature layout shared by extraction, training and inference
+# --------------------------------------------------------------------
+# Training columns of dataset/merged_dataset.csv, in the order the models see them
+FEATURE_COLUMNS = [
+    "loc", "lloc", "scloc",
+    "comments", "single_comments", "multi_comments",
+    "blanks", "h1", "h2", "n1", "n2",
+    "vocabulary", "length", "calculated_length", "volume",
+    "difficulty", "effort", "time", "bugs",
+]
+
+# Everything the extractor measures per file or scope: the training columns plus extras
+METRIC_NAMES = FEATURE_COLUMNS + ["maintainability_index", "cyclomatic_complexity"]
+METRIC_INDEX = {name: i for i, name in enumerate(METRIC_NAMES)}
+
+# Names written by the earlier extractor / models trained before this schema
+LEGACY_ALIASES = {
+    "sloc": "scloc",
+    "single_com": "single_comments",
+    "multi_comr": "multi_comments",
+}
+
+METRIC_DTYPE = np.float32
+
+
+def column_index(columns: list) -> np.ndarray:
+    """
+    Maps model feature columns to positions in a metric record. Unknown
+    columns map to -1 and are fed to the model as zeros.
+    """
+    return np.array(
+        [METRIC_INDEX.get(LEGACY_ALIASES.get(col, col), -1) for col in columns],
+        dtype=np.intp,
+    )
+
+
+def project(records: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """Selects model columns from metric records (1-D or 2-D) using a column_index."""
+    records = np.atleast_2d(records)
+    matrix = records[:, np.where(index >= 0, index, 0)]
+    if (index < 0).any():
+        matrix[:, index < 0] = 0
+    return matrix
@@ -0,0 +1,194 @@
+import ast
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from analyzer.code_metrics import measure, measure_scopes
+from analyzer.feature_extractor import extract_scope_record
+from analyzer.parsed_source import as_parsed
+from analyzer.smell_localizer import collect_scopes
+
+# Number of documents (upload names) whose scope fingerprints are remembered
+SCOPE_STORE_DOCUMENTS = int(os.getenv("SCOPE_STORE_DOCUMENTS", 512))
+
+
+# --------------------------------------------------------------------
+# 🔹 Scope fingerprints
+# --------------------------------------------------------------------
+def scope_fingerprint(parsed, scope: dict) -> str:
+    """
+    Hashes a scope's AST (without positions), so a scope keeps its
+    fingerprint when it moves, is re-indented as a whole, or only its
+    comment text or spacing changes, while any code change gives a new one.
+    The scope's blank lines and '#' count are hashed too: they are what the
+    raw metrics read from the text besides the code.
+    """
+    span = parsed.segment(scope["start"], scope["end"])
+    blank = sum(1 for line in span.split("\n") if not line.strip())
+    layout = f"{blank}:{span.count('#')}\n"
+    return hashlib.blake2b((layout + ast.dump(scope["node"])).encode("utf-8"), digest_size=16).hexdigest()
+
+
+# --------------------------------------------------------------------
+# 🔹 Per-document store of scope results
+# --------------------------------------------------------------------
+class ScopeStore:
+    """
+    Remembers, per document, the analysis of every scope keyed by its
+    fingerprint and span length. Results are stored relative to the scope,
+    so they can be re-anchored wherever the scope sits in the next revision.
+    """
+
+    def __init__(self, max_documents=SCOPE_STORE_DOCUMENTS):
+        self.max_documents = max_documents
+        self._documents = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, document_key: str) -> dict:
+        with self._lock:
+            entries = self._documents.get(document_key)
+            if entries is not None:
+                self._documents.move_to_end(document_key)
+            return entries or {}
+
+    def put(self, document_key: str, entries: dict):
+        with self._lock:
+            self._documents[document_key] = entries
+            self._documents.move_to_end(document_key)
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+
+
+_store = ScopeStore()
+
+
+def get_scope_store() -> ScopeStore:
+    return _store
+
+
+def _measure_changed(parsed, nodes: list, partial: bool):
+    """
+    Metrics for the scopes that need analysis: measured on their own when
+    `partial` (the rest of the file is reused), otherwise taken from the
+    whole-file measurement the ML stage shares. None if unmeasurable.
+    """
+    if partial:
+        try:
+            return measure_scopes(parsed, nodes)
+        except Exception:
+            pass
+    try:
+        return measure(parsed)
+    except Exception:
+        return None
+
+
+def _analyze_scope(parsed, scope: dict, thresholds: dict, metrics) -> dict:
+    """Everything about a scope that depends only on its own source span."""
+    try:
+        halstead = metrics.halstead(scope["node"])
+    except Exception:
+        halstead = {}
+    entry = {"kind": scope["kind"], "name": scope["name"], "length": scope["length"], "halstead": halstead,
+             # Metric record for the ML models, kept so unchanged scopes skip re-measuring
+             "features": extract_scope_record(parsed, scope, metrics=metrics)}
+    if scope["kind"] == "function":
+        entry["is_smell"] = scope["length"] >= thresholds["long_method_lines"]
+    else:
+        entry["num_methods"] = scope["num_methods"]
+        entry["is_smell"] = (
+            scope["length"] > thresholds["large_class_lines"]
+            or scope["num_methods"] > thresholds["large_class_methods"]
+        )
+    return entry
+
+
+# --------------------------------------------------------------------
+# 🔹 Incremental scope analysis
+# --------------------------------------------------------------------
+def analyze_scopes(source, thresholds: dict, document_id: str = None, store: ScopeStore = None,
+                   predict=None) -> dict:
+    """
+    Localizes long methods and large classes and computes per-scope Halstead
+    metrics. With a `document_id`, scopes whose fingerprint and span length
+    match the previous revision of that document reuse the stored result;
+    only new or edited scopes are analyzed, and when anything was reused
+    only those scopes are measured. Line numbers always come from the
+    current revision and snippets from its line index.
+
+    `predict(records)`, if given, receives the metric records of every scope
+    stacked into one matrix and returns one prediction (or None) per row;
+    each reported smell gets its scope's prediction as `ml_prediction`.
+    """
+    parsed = as_parsed(source)
+    scopes = collect_scopes(parsed)
+
+    store = store or get_scope_store()
+    document_key = None
+    previous = {}
+    if document_id:
+        document_key = f"{document_id}:{json.dumps(thresholds, sort_keys=True)}"
+        previous = store.get(document_key)
+
+    keys = [f"{scope_fingerprint(parsed, scope)}:{scope['length']}" for scope in scopes]
+    reused = sum(1 for key in keys if key in previous)
+    # One analysis per distinct scope that the previous revision lacks
+    changed = {}
+    for scope, key in zip(scopes, keys):
+        if key not in previous:
+            changed.setdefault(key, scope)
+    entries = {key: previous[key] for key in keys if key in previous}
+    if changed:
+        metrics = _measure_changed(parsed, [scope["node"] for scope in changed.values()], partial=reused > 0)
+        for key, scope in changed.items():
+            entries[key] = _analyze_scope(parsed, scope, thresholds, metrics)
+
+    long_methods, large_classes = [], []
+    # Entry of every scope, and (scope index, reported item) for every smell
+    scope_entries, reported = [], []
+    for i, (scope, key) in enumerate(zip(scopes, keys)):
+        entry = entries[key]
+        scope_entries.append(entry)
+
+        if not entry["is_smell"]:
+            continue
+        start = scope["start"]
+        end = start + entry["length"] - 1
+        if entry["kind"] == "function":
+            item = {
+                "function": entry["name"], "start": start, "end": end,
+                "length": entry["length"], "code_snippet": parsed.segment(start, end),
+                "metrics": entry["halstead"]
+            }
+            long_methods.append(item)
+        else:
+            item = {
+                "class": entry["name"], "start": start, "end": end,
+                "lines": entry["length"], "num_methods": entry["num_methods"],
+                "code_snippet": parsed.segment(start, end),
+                "metrics": entry["halstead"]
+            }
+            large_classes.append(item)
+        reported.append((i, item))
+
+    if document_key:
+        store.put(document_key, entries)
+
+    predictions = []
+    if predict is not None and scopes:
+        # One matrix, one model call for every scope in the file
+        predictions = predict(np.stack([entry["features"] for entry in scope_entries]))
+        for i, item in reported:
+            if predictions[i] is not None:
+                item["ml_prediction"] = predictions[i]
+
+    return {
+        "long_methods": long_methods,
+        "large_classes": large_classes,
+        "stats": {"scopes": len(scopes), "reused": reused, "analyzed": len(scopes) - reused},
+        "scope_predictions": predictions,
+    }
@@ -1,13 +1,22 @@
-import joblib
-import pandas as pd
-import re
-import os
-from analyzer.feature_extractor import extract_features
+import contextlib
+import warnings
+import numpy as np
+from analyzer.feature_extractor import extract_metric_record
+from analyzer.feature_schema import project
+from analyzer.model_registry import get_model_registry
 
 
+@contextlib.contextmanager
+def _without_feature_name_warnings():
+    """
+    Models fitted on a DataFrame warn on every ndarray predict; columns are
+    aligned by the schema, so that warning is silenced around model calls only.
+    """
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        yield
+
 
-# Define base directory for backend
-base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 
 def get_ml_explanations():
     """
@@ -33,32 +42,13 @@ def get_ml_explanations():
 
 def get_model_accuracies():
     """
-    Reads the training summary and returns a dictionary of model accuracies.
+    Returns a dictionary of model accuracies from the in-memory model registry.
     """
-    accuracies = {}
-    summary_path = os.path.join(base_dir, "results", "training_summary.txt")
-    try:
-        with open(summary_path, "r", encoding="utf-8") as f:
-            for line in f:
-                match = re.match(r"(.+?):\s+([\d\.]+)%", line)
-                if match:
-                    model_name = match.group(1).strip()
-                    accuracy = float(match.group(2))
-                    accuracies[model_name] = accuracy
-    except FileNotFoundError:
-        print(f"Warning: `{summary_path}` not found. Accuracies will not be displayed.")
-    return accuracies
+    return dict(get_model_registry().get().accuracies)
 
-def detect_ml_smells(file_path):
-    """
-    Loads the best trained ML model and predicts smell types for a given Python file.
-    Includes model accuracy and explanations for potential issues.
-    """
-    accuracies = get_model_accuracies()
-    explanations = get_ml_explanations()
-    models_dir = os.path.join(base_dir, "models")
-
-    if not accuracies:
+def _bundle_error(bundle):
+    """Returns the error result for a registry bundle that cannot predict, else None."""
+    if not bundle.accuracies:
         return {
             "Error": "Accuracy information not found",
             "explanation": {
@@ -68,77 +58,143 @@ def detect_ml_smells(file_path):
             }
         }
 
-    # Find the best model
-    best_model_name = max(accuracies, key=accuracies.get)
-    model_file_map = {
-        'Random Forest': 'random_forest_model.pkl',
-        'Decision Tree': 'decision_tree_model.pkl',
-        'SVM': 'svm_model.pkl',
-        'KNN': 'knn_model.pkl'
-    }
-    
-    model_file = model_file_map.get(best_model_name)
-    if not model_file:
+    # The registry has already picked the best model
+    if not bundle.model_file:
         return {
             "Error": "Best model not found",
             "explanation": {
                 "title": "Best model not found",
-                "reason": f"The best model '{best_model_name}' does not have a corresponding model file.",
-                "fix": "Ensure the model names in `training_summary.txt` match the keys in `model_file_map`."
+                "reason": f"The best model '{bundle.model_name}' does not have a corresponding model file.",
+                "fix": "Ensure the model names in `training_summary.txt` match the keys in `MODEL_FILE_MAP`."
             }
         }
+    return None
 
-    try:
-        # Load the best model and necessary files
-        model = joblib.load(os.path.join(models_dir, model_file))
-        feature_columns = joblib.load(os.path.join(models_dir, "feature_columns.pkl"))
-        label_encoder_path = os.path.join(models_dir, "label_encoder.pkl")
-        
-        if not os.path.exists(label_encoder_path):
-            raise FileNotFoundError(f"Label encoder not found at {label_encoder_path}")
-            
-        label_encoder = joblib.load(label_encoder_path)
-
-        # Create a reverse mapping from index to label
-        reverse_label_map = {v: k for k, v in label_encoder.items()}
-
-        # Extract features from the code
-        features = extract_features(file_path)
-        df = pd.DataFrame([features])
-
-        # Align columns to match training order
-        for col in feature_columns:
-            if col not in df.columns:
-                df[col] = 0
-        df = df[feature_columns]
-
-        # Predict with the best model
-        pred_idx = model.predict(df)[0]
-        prediction = reverse_label_map.get(pred_idx, "Unknown")
-
-        return {
-            "predictions": {
-                best_model_name: {
-                    "prediction": prediction,
-                    "accuracy": accuracies.get(best_model_name, 0)
-                }
-            }
-        }
 
-    except FileNotFoundError as e:
+def _error_result(e: Exception) -> dict:
+    explanations = get_ml_explanations()
+    if isinstance(e, FileNotFoundError):
         return {
             "Error": explanations["model_not_found"]["title"],
             "explanation": explanations["model_not_found"]
         }
-    except Exception as e:
-        return {
-            "Error": explanations["prediction_failed"]["title"],
-            "explanation": {
-                "title": explanations["prediction_failed"]["title"],
-                "reason": str(e),
-                "fix": explanations["prediction_failed"]["fix"]
+    return {
+        "Error": explanations["prediction_failed"]["title"],
+        "explanation": {
+            "title": explanations["prediction_failed"]["title"],
+            "reason": str(e),
+            "fix": explanations["prediction_failed"]["fix"]
+        }
+    }
+
+
+def _prediction_result(bundle, pred_idx) -> dict:
+    return {
+        "predictions": {
+            bundle.model_name: {
+                "prediction": bundle.reverse_label_map.get(pred_idx, "Unknown"),
+                "accuracy": bundle.accuracies.get(bundle.model_name, 0)
             }
         }
-    
+    }
+
+
+def _predict_rows(bundle, records) -> list:
+    """
+    Projects stacked metric records onto the model's training columns and
+    predicts every row with a single call.
+    """
+    matrix = project(np.asarray(records), bundle.column_index)
+    with _without_feature_name_warnings():
+        return list(bundle.model.predict(matrix))
+
+
+def detect_ml_smells(file_path):
+    """
+    Predicts smell types for a Python file (path or ParsedSource) with the best
+    trained ML model. Artifacts come from the model registry, which loads them
+    once and reloads only when the models directory changes.
+    Includes model accuracy and explanations for potential issues.
+    """
+    bundle = get_model_registry().get()
+    error = _bundle_error(bundle)
+    if error:
+        return error
+
+    try:
+        if bundle.load_error is not None:
+            raise bundle.load_error
 
- 
+        # Extract features from the code straight into the schema layout
+        record = extract_metric_record(file_path)
+        return _prediction_result(bundle, _predict_rows(bundle, record)[0])
+
+    except Exception as e:
+        return _error_result(e)
+
+
+def detect_scope_smells(records: np.ndarray) -> list:
+    """
+    Labels per-scope metric records (one row per function / class, see
+    feature_extractor.extract_scope_record) with the best model in a single
+    predict_proba (or predict) call. Returns {"label", "confidence", "model"}
+    per row, or None for rows that could not be measured and for every row
+    when no model is available.
+    """
+    records = np.atleast_2d(records)
+    results = [None] * len(records)
+    bundle = get_model_registry().get()
+    if not len(records) or _bundle_error(bundle) or bundle.load_error is not None:
+        return results
+
+    # Only the model's columns must be measured; unmeasurable rows are all NaN
+    matrix = project(records, bundle.column_index)
+    valid = np.flatnonzero(~np.isnan(matrix).any(axis=1))
+    if not len(valid):
+        return results
+    matrix = matrix[valid]
+    try:
+        with _without_feature_name_warnings():
+            if hasattr(bundle.model, "predict_proba"):
+                proba = bundle.model.predict_proba(matrix)
+                best = np.argmax(proba, axis=1)
+                labels = np.asarray(bundle.model.classes_)[best]
+                confidences = proba[np.arange(len(best)), best]
+            else:
+                labels = bundle.model.predict(matrix)
+                confidences = [None] * len(labels)
+    except Exception:
+        return results
+
+    for i, label, confidence in zip(valid, labels, confidences):
+        results[i] = {
+            "label": bundle.reverse_label_map.get(label, "Unknown"),
+            "confidence": round(float(confidence), 3) if confidence is not None else None,
+            "model": bundle.model_name,
+        }
+    return results
+
+
+def detect_ml_smells_many(feature_rows: list) -> list:
+    """
+    Batched variant of detect_ml_smells for already extracted metric records.
+    Each entry is a record from extract_metric_record or the Exception raised
+    while extracting it; all valid rows go through a single `predict` call.
+    """
+    bundle = get_model_registry().get()
+    error = _bundle_error(bundle)
+    if error:
+        return [dict(error) for _ in feature_rows]
+    if bundle.load_error is not None:
+        return [_error_result(bundle.load_error) for _ in feature_rows]
+
+    results = [_error_result(row) if isinstance(row, Exception) else None for row in feature_rows]
+    valid = [i for i, row in enumerate(feature_rows) if not isinstance(row, Exception)]
+    if valid:
+        try:
+            predictions = _predict_rows(bundle, np.vstack([feature_rows[i] for i in valid]))
+        except Exception as e:
+            predictions = [e] * len(valid)
+        for i, pred_idx in zip(valid, predictions):
+            results[i] = _error_result(pred_idx) if isinstance(pred_idx, Exception) else _prediction_result(bundle, pred_idx)
+    return results
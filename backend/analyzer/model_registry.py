@@ -0,0 +1,242 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from analyzer.compact_model import CompactForest, compact_path
+from analyzer.feature_schema import column_index
+
+logger = logging.getLogger(__name__)
+
+# Define base directory for backend
+base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+MODEL_FILE_MAP = {
+    'Random Forest': 'random_forest_model.pkl',
+    'Decision Tree': 'decision_tree_model.pkl',
+    'SVM': 'svm_model.pkl',
+    'KNN': 'knn_model.pkl'
+}
+
+# "r" memory-maps the numpy arrays inside the pickles so forked workers share pages
+MODEL_MMAP_MODE = os.getenv("MODEL_MMAP_MODE") or None
+# Seconds between change checks, and whether to hash file contents instead of stat()
+MODEL_CHECK_INTERVAL = float(os.getenv("MODEL_CHECK_INTERVAL", 2.0))
+MODEL_HASH_CONTENT = os.getenv("MODEL_HASH_CONTENT", "0") == "1"
+
+# Serving budgets checked against results/training_metrics.json (0 = unlimited):
+# single-row predict latency in microseconds and model size in bytes
+MODEL_MAX_LATENCY_US = float(os.getenv("MODEL_MAX_LATENCY_US", 0))
+MODEL_MAX_BYTES = int(os.getenv("MODEL_MAX_BYTES", 0))
+# Accuracy points a cheaper model may trail the most accurate one by and still win
+MODEL_ACCURACY_TOLERANCE = float(os.getenv("MODEL_ACCURACY_TOLERANCE", 1.0))
+# Serve the numpy export of tree models when one exists next to the pickle
+MODEL_COMPACT = os.getenv("MODEL_COMPACT", "1") == "1"
+
+
+def parse_training_summary(summary_path: str) -> dict:
+    """
+    Reads the training summary and returns a dictionary of model accuracies.
+    """
+    accuracies = {}
+    try:
+        with open(summary_path, "r", encoding="utf-8") as f:
+            for line in f:
+                match = re.match(r"(.+?):\s+([\d\.]+)%", line)
+                if match:
+                    model_name = match.group(1).strip()
+                    accuracy = float(match.group(2))
+                    accuracies[model_name] = accuracy
+    except FileNotFoundError:
+        logger.warning("`%s` not found. Accuracies will not be displayed.", summary_path)
+    return accuracies
+
+
+def load_training_metrics(metrics_path: str) -> dict:
+    """Per-model cost metrics written by train_model; empty when never recorded."""
+    try:
+        with open(metrics_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("models", {})
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _serving_cost(metrics: dict, compact: bool) -> tuple:
+    """(single-row latency µs, bytes) of the form the registry would actually load."""
+    if compact and "compact_predict_us_single" in metrics:
+        return metrics["compact_predict_us_single"], metrics["compact_bytes"]
+    return metrics.get("predict_us_single", 0.0), metrics.get("model_bytes", 0)
+
+
+def select_model(accuracies: dict, metrics: dict, max_latency_us=MODEL_MAX_LATENCY_US,
+                 max_bytes=MODEL_MAX_BYTES, tolerance=MODEL_ACCURACY_TOLERANCE,
+                 compact=MODEL_COMPACT) -> str:
+    """
+    Picks the model to serve. Models over the latency or size budget are
+    dropped, then the fastest model within `tolerance` accuracy points of
+    the best remaining one wins. Without recorded metrics, or when nothing
+    fits the budget, this falls back to the most accurate model.
+    """
+    best = max(accuracies, key=accuracies.get)
+    costs = {name: _serving_cost(metrics[name], compact) for name in accuracies if name in metrics}
+    if not costs:
+        return best
+
+    eligible = [
+        name for name, (latency, size) in costs.items()
+        if (not max_latency_us or latency <= max_latency_us) and (not max_bytes or size <= max_bytes)
+    ]
+    if not eligible:
+        logger.warning("No model fits the serving budget; using %s.", best)
+        return best
+
+    top = max(accuracies[name] for name in eligible)
+    close = [name for name in eligible if accuracies[name] >= top - tolerance]
+    return min(close, key=lambda name: (costs[name][0], -accuracies[name]))
+
+
+class ModelBundle:
+    """
+    One consistent snapshot of the trained artifacts. Readers keep using the
+    bundle they fetched even if the registry swaps in a newer one meanwhile.
+    """
+
+    def __init__(self, fingerprint, accuracies, model_name=None, model_file=None,
+                 model=None, feature_columns=None, label_encoder=None, load_error=None,
+                 model_format=None):
+        self.fingerprint = fingerprint
+        self.accuracies = accuracies
+        self.model_name = model_name
+        self.model_file = model_file
+        self.model = model
+        self.feature_columns = feature_columns
+        self.column_index = column_index(feature_columns) if feature_columns else None
+        self.label_encoder = label_encoder
+        self.reverse_label_map = {v: k for k, v in (label_encoder or {}).items()}
+        self.load_error = load_error
+        # "compact" (numpy export) or "pickle"
+        self.model_format = model_format
+
+
+# --------------------------------------------------------------------
+# 🔹 Process-wide registry with change detection
+# --------------------------------------------------------------------
+class ModelRegistry:
+    """
+    Loads the selected model, feature columns, label encoder and accuracies once
+    and serves them from memory. At most every `check_interval` seconds it
+    fingerprints the models directory and training summary; when that
+    changes, a complete new bundle is loaded and swapped in under a lock.
+    """
+
+    def __init__(self, models_dir=None, summary_path=None, mmap_mode=MODEL_MMAP_MODE,
+                 check_interval=MODEL_CHECK_INTERVAL, hash_content=MODEL_HASH_CONTENT,
+                 metrics_path=None, compact=MODEL_COMPACT):
+        self.models_dir = models_dir or os.path.join(base_dir, "models")
+        self.summary_path = summary_path or os.path.join(base_dir, "results", "training_summary.txt")
+        self.metrics_path = metrics_path or os.path.join(os.path.dirname(self.summary_path), "training_metrics.json")
+        self.compact = compact
+        self.mmap_mode = mmap_mode
+        self.check_interval = check_interval
+        self.hash_content = hash_content
+        self._bundle = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _watched_files(self) -> list:
+        files = [self.summary_path, self.metrics_path]
+        if os.path.isdir(self.models_dir):
+            files += sorted(
+                os.path.join(self.models_dir, name) for name in os.listdir(self.models_dir)
+            )
+        return files
+
+    def fingerprint(self) -> str:
+        """Stat-based (or content-hash) digest of every artifact the bundle depends on."""
+        digest = hashlib.sha256()
+        for path in self._watched_files():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                digest.update(f"{path}:missing".encode())
+                continue
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+            if self.hash_content:
+                with open(path, "rb") as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(chunk)
+        return digest.hexdigest()
+
+    def _load(self, fingerprint: str) -> ModelBundle:
+        # joblib (and scikit-learn, via unpickling) is only imported once a model is needed
+        import joblib
+
+        accuracies = parse_training_summary(self.summary_path)
+        if not accuracies:
+            return ModelBundle(fingerprint, accuracies)
+
+        model_name = select_model(accuracies, load_training_metrics(self.metrics_path), compact=self.compact)
+        model_file = MODEL_FILE_MAP.get(model_name)
+        if not model_file:
+            return ModelBundle(fingerprint, accuracies, model_name=model_name)
+
+        try:
+            model, model_format = self._load_model(os.path.join(self.models_dir, model_file))
+            feature_columns = joblib.load(os.path.join(self.models_dir, "feature_columns.pkl"))
+            label_encoder_path = os.path.join(self.models_dir, "label_encoder.pkl")
+
+            if not os.path.exists(label_encoder_path):
+                raise FileNotFoundError(f"Label encoder not found at {label_encoder_path}")
+
+            label_encoder = joblib.load(label_encoder_path)
+        except Exception as e:
+            return ModelBundle(fingerprint, accuracies, model_name, model_file, load_error=e)
+
+        return ModelBundle(fingerprint, accuracies, model_name, model_file,
+                           model, feature_columns, label_encoder, model_format=model_format)
+
+    def _load_model(self, model_path: str) -> tuple:
+        """
+        Prefers the numpy export of a tree model (loads in milliseconds, no
+        scikit-learn import) unless it is older than the pickle it came from.
+        """
+        array_path = compact_path(model_path)
+        if self.compact and os.path.exists(array_path):
+            if not os.path.exists(model_path) or os.path.getmtime(array_path) >= os.path.getmtime(model_path):
+                return CompactForest.load(array_path), "compact"
+        import joblib
+        return joblib.load(model_path, mmap_mode=self.mmap_mode), "pickle"
+
+    def get(self) -> ModelBundle:
+        """Returns the current bundle, reloading first if the artifacts changed."""
+        bundle = self._bundle
+        if bundle is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return bundle
+
+        with self._lock:
+            if self._bundle is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return self._bundle
+            fingerprint = self.fingerprint()
+            if self._bundle is None or self._bundle.fingerprint != fingerprint:
+                self._bundle = self._load(fingerprint)
+            self._checked_at = time.monotonic()
+            return self._bundle
+
+    def preload(self) -> ModelBundle:
+        """Loads the artifacts eagerly, e.g. at app startup or before forking workers."""
+        return self.get()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Returns the process-wide model registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
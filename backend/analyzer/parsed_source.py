@@ -0,0 +1,172 @@
+import ast
+import hashlib
+import io
+import mmap
+import threading
+import tokenize
+
+
+# --------------------------------------------------------------------
+# 🔹 Shared, parse-once view of an uploaded source file
+# --------------------------------------------------------------------
+class ParsedSource:
+    """
+    Holds everything the analysis stages need from one Python file:
+    raw bytes, decoded text, a line index, one AST and one token stream.
+
+    The text, AST and tokens are built lazily on first access and then
+    reused, so every detector and metric extractor in a request shares
+    the same read and the same parse. Decode / syntax errors are cached
+    too and re-raised to each stage that asks, which keeps the
+    per-stage error reporting of the original pipeline.
+    """
+
+    def __init__(self, raw: bytes, path: str = None, digest: str = None):
+        self.path = path
+        self.raw = raw
+        self._digest = digest
+        self._text = None
+        self._lines = None
+        self._line_offsets = None
+        self._tree = None
+        self._tokens = None
+        self._errors = {}
+        self._derived = {}
+        self._derived_lock = threading.RLock()
+
+    @classmethod
+    def from_path(cls, path: str) -> "ParsedSource":
+        with open(path, "rb") as f:
+            return cls(f.read(), path=path)
+
+    @classmethod
+    def from_mmap(cls, path: str, digest: str = None) -> "ParsedSource":
+        """
+        Maps the file read-only instead of copying it into memory; the text is
+        decoded straight from the mapping. Only for files that are never
+        modified while mapped (e.g. content-addressed upload blobs), and
+        `digest` may pass along a SHA-256 that is already known. Use the
+        source as a context manager (or call `close`) to release the mapping.
+        """
+        with open(path, "rb") as f:
+            try:
+                raw = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty files cannot be mapped
+                raw = b""
+        return cls(raw, path=path, digest=digest)
+
+    def close(self):
+        """
+        Releases the mapping of a source from `from_mmap` (and the file
+        descriptor it holds); views built from it stay usable. A no-op for
+        sources read into memory.
+        """
+        if isinstance(self.raw, mmap.mmap) and not self.raw.closed:
+            try:
+                self.raw.close()
+            except BufferError:
+                pass  # still being read (a stage past its budget); released when that read ends
+
+    def __enter__(self) -> "ParsedSource":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @classmethod
+    def from_text(cls, text: str, path: str = None) -> "ParsedSource":
+        parsed = cls(text.encode("utf-8"), path=path)
+        parsed._text = text
+        return parsed
+
+    def _cached(self, name, build):
+        if name in self._errors:
+            raise self._errors[name]
+        value = getattr(self, name)
+        if value is None:
+            try:
+                value = build()
+            except Exception as e:
+                self._errors[name] = e
+                raise
+            setattr(self, name, value)
+        return value
+
+    @property
+    def digest(self) -> str:
+        """SHA-256 of the raw bytes (hashed from the buffer; no copy for a mapping)."""
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.raw).hexdigest()
+        return self._digest
+
+    @property
+    def text(self) -> str:
+        """Decoded UTF-8 text with universal newlines (same as open(..., 'r'))."""
+        return self._cached(
+            "_text",
+            lambda: str(self.raw, "utf-8").replace("\r\n", "\n").replace("\r", "\n"),
+        )
+
+    @property
+    def lines(self) -> list:
+        """Source lines without their trailing newline (``text.split('\\n')``)."""
+        return self._cached("_lines", lambda: self.text.split("\n"))
+
+    @property
+    def line_offsets(self) -> list:
+        """Character offset of the start of every line, indexed from line 1 at [0]."""
+        def build():
+            offsets, pos = [], 0
+            for line in self.lines:
+                offsets.append(pos)
+                pos += len(line) + 1
+            return offsets
+        return self._cached("_line_offsets", build)
+
+    @property
+    def tree(self) -> ast.Module:
+        return self._cached("_tree", lambda: ast.parse(self.text))
+
+    @property
+    def tokens(self) -> list:
+        return self._cached(
+            "_tokens",
+            lambda: list(tokenize.generate_tokens(io.StringIO(self.text).readline)),
+        )
+
+    def derived(self, name: str, build):
+        """
+        Caches `build(self)` under `name`, like the built-in views, for values
+        other modules compute from this source (e.g. raw metric groups) so
+        concurrent stages can share them: a stage that asks while another is
+        building waits for that result. Errors are cached and re-raised too.
+        """
+        with self._derived_lock:
+            if name not in self._derived:
+                try:
+                    self._derived[name] = (build(self), None)
+                except Exception as e:
+                    self._derived[name] = (None, e)
+            value, error = self._derived[name]
+        if error is not None:
+            raise error
+        return value
+
+    def line(self, lineno: int) -> str:
+        """Returns a single 1-based line, or an empty string when out of range."""
+        lines = self.lines
+        return lines[lineno - 1] if 1 <= lineno <= len(lines) else ""
+
+    def segment(self, start: int, end: int) -> str:
+        """Returns the 1-based inclusive line range ``start..end`` as one string."""
+        return "\n".join(self.lines[start - 1:end])
+
+
+def as_parsed(source) -> ParsedSource:
+    """
+    Accepts either a file path or an existing ParsedSource, so the public
+    analyzer functions keep working when called with a plain path.
+    """
+    if isinstance(source, ParsedSource):
+        return source
+    return ParsedSource.from_path(source)
@@ -0,0 +1,189 @@
+import os
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Seconds between stack samples
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", 0.005))
+# Analyses still running after this many seconds are profiled automatically (0 = off)
+PROFILE_SLOW_SECONDS = float(os.getenv("PROFILE_SLOW_SECONDS", 0))
+# Hot functions kept in the summary, and distinct stacks kept for flame graphs
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", 25))
+PROFILE_MAX_STACKS = int(os.getenv("PROFILE_MAX_STACKS", 500))
+PROFILE_MAX_DEPTH = 64
+
+_backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+_stdlib_dir = sysconfig.get_paths()["stdlib"]
+# Standard-library modules whose frames at the top of a stack mean "blocked"
+_WAIT_MODULES = tuple(os.path.join(_stdlib_dir, name) for name in (
+    "threading.py", "queue.py", "selectors.py", os.path.join("concurrent", "futures", ""),
+    os.path.join("multiprocessing", "connection.py"),
+))
+_local = threading.local()
+
+
+def _short_path(filename: str) -> str:
+    """Site-packages and backend paths without their (machine-specific) prefix."""
+    marker = f"site-packages{os.sep}"
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    if filename.startswith(_backend_dir + os.sep):
+        return os.path.relpath(filename, _backend_dir)
+    return filename
+
+
+# --------------------------------------------------------------------
+# 🔹 Sampling profiler for one analysis across its stage threads
+# --------------------------------------------------------------------
+class SamplingProfiler:
+    """
+    Samples the stacks of the threads working on one analysis every
+    `interval` seconds from a background thread. Unlike cProfile it sees
+    every stage thread, costs nothing in the profiled code itself, and can
+    start late: with `delay` it only begins once the analysis has run that
+    long, which is how slow requests are captured automatically.
+
+    Blocking waits are charged to the first frame outside the threading
+    machinery and marked "[waiting]". Pylint runs in a separate worker
+    process, so its time shows up as `lint [waiting]` in pylint_pool.py.
+    """
+
+    def __init__(self, interval=PROFILE_INTERVAL, delay=0.0, trigger="request"):
+        self.interval = interval
+        self.delay = delay
+        self.trigger = trigger
+        self.samples = 0
+        self._threads = set()
+        self._self = Counter()
+        self._total = Counter()
+        self._stacks = Counter()
+        self._sampled_seconds = 0.0
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._sampler = threading.Thread(target=self._run, name="analysis-profiler", daemon=True)
+
+    def start(self):
+        self._sampler.start()
+        return self
+
+    @contextmanager
+    def attached(self):
+        """Includes the calling thread in the samples while the block runs."""
+        ident = threading.get_ident()
+        previous = getattr(_local, "profiler", None)
+        _local.profiler = self
+        with self._lock:
+            self._threads.add(ident)
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._threads.discard(ident)
+            _local.profiler = previous
+
+    def wrap(self, fn):
+        """`fn` attached to this profiler, for work handed to another thread."""
+        def run(*args, **kwargs):
+            with self.attached():
+                return fn(*args, **kwargs)
+        return run
+
+    def _run(self):
+        if self.delay and self._stop.wait(self.delay):
+            return  # finished before the threshold: nothing to capture
+        started = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                threads = list(self._threads)
+            frames = sys._current_frames()
+            for ident in threads:
+                frame = frames.get(ident)
+                if frame is not None:
+                    self._record(frame)
+        self._sampled_seconds = time.perf_counter() - started
+
+    def _record(self, frame):
+        waiting = False
+        while frame is not None and frame.f_code.co_filename.startswith(_WAIT_MODULES):
+            waiting, frame = True, frame.f_back
+        if frame is None:
+            return
+
+        stack = []
+        while frame is not None and len(stack) < PROFILE_MAX_DEPTH:
+            code = frame.f_code
+            stack.append((code.co_name, _short_path(code.co_filename), code.co_firstlineno))
+            frame = frame.f_back
+        self.samples += 1
+        leaf = stack[0]
+        self._self[(f"{leaf[0]} [waiting]", *leaf[1:]) if waiting else leaf] += 1
+        for key in set(stack):
+            self._total[key] += 1
+        self._stacks[";".join(f"{name} ({path}:{line})" for name, path, line in reversed(stack))] += 1
+
+    def stop(self, top_n=PROFILE_TOP_N):
+        """Stops sampling; returns the profile summary, or None if nothing was sampled."""
+        self._stop.set()
+        if self._sampler.is_alive():
+            self._sampler.join()
+        if not self.samples:
+            return None
+
+        def share(n):
+            return round(100.0 * n / self.samples, 1)
+
+        def total(key):
+            name, path, line = key
+            return self._total[(name.removesuffix(" [waiting]"), path, line)]
+
+        hot = sorted(self._self.keys() | self._total.keys(), key=lambda key: (self._self[key], total(key)), reverse=True)
+        return {
+            "mode": "sampling",
+            "trigger": self.trigger,
+            "interval_ms": round(self.interval * 1000, 3),
+            "delay_s": self.delay,
+            "sampled_s": round(self._sampled_seconds, 3),
+            "samples": self.samples,
+            "top": [
+                {
+                    "function": name,
+                    "location": f"{path}:{line}",
+                    "self_samples": self._self[(name, path, line)],
+                    "total_samples": total((name, path, line)),
+                    "self_pct": share(self._self[(name, path, line)]),
+                    "total_pct": share(total((name, path, line))),
+                }
+                for name, path, line in hot[:top_n]
+            ],
+            # Collapsed stacks ("outer;...;inner" -> samples) for flame graph tools
+            "stacks": dict(self._stacks.most_common(PROFILE_MAX_STACKS)),
+        }
+
+
+def current_profiler():
+    """The profiler the calling thread is attached to, if any."""
+    return getattr(_local, "profiler", None)
+
+
+def profiler_for(profile: bool, slow_seconds: float = PROFILE_SLOW_SECONDS):
+    """
+    A started profiler for an explicit request, a delayed one when automatic
+    capture of slow analyses is on, otherwise None.
+    """
+    if profile:
+        return SamplingProfiler(trigger="request").start()
+    if slow_seconds > 0:
+        return SamplingProfiler(delay=slow_seconds, trigger="slow").start()
+    return None
+
+
+def format_top(profile: dict, limit: int = 15) -> str:
+    """Plain-text table of the hottest functions, for the CLI."""
+    lines = [f"Profile: {profile['samples']} samples every {profile['interval_ms']} ms ({profile['trigger']})",
+             f"{'self %':>7} {'total %':>8}  function"]
+    for entry in profile["top"][:limit]:
+        lines.append(f"{entry['self_pct']:>7.1f} {entry['total_pct']:>8.1f}  {entry['function']} ({entry['location']})")
+    return "\n".join(lines)
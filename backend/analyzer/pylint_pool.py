@@ -0,0 +1,149 @@
+import atexit
+import io
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+# Pool sizing; every value can be overridden from the environment
+PYLINT_WORKERS = int(os.getenv("PYLINT_WORKERS", os.cpu_count() or 2))
+PYLINT_MAX_QUEUE = int(os.getenv("PYLINT_MAX_QUEUE", PYLINT_WORKERS * 4))
+PYLINT_JOBS_PER_WORKER = int(os.getenv("PYLINT_JOBS_PER_WORKER", 200))
+PYLINT_TIMEOUT = float(os.getenv("PYLINT_TIMEOUT", 30))
+
+# CLI flags for the subprocess fallback; in-process runs pass the JSON
+# reporter object instead, since --output-format would replace it.
+PYLINT_ARGS = ["--output-format=json", "--score=n"]
+PYLINT_API_ARGS = ["--score=n"]
+
+
+class PylintPoolFull(RuntimeError):
+    """Raised when the bounded pylint queue has no free slot."""
+
+
+# --------------------------------------------------------------------
+# 🔹 Worker-side functions (run inside the pool processes)
+# --------------------------------------------------------------------
+def warm_worker():
+    """Imports pylint, astroid and the JSON reporter once per worker process."""
+    import pylint.lint  # noqa: F401
+    from pylint.reporters import JSONReporter  # noqa: F401
+
+
+def _noop():
+    return os.getpid()
+
+
+def lint_in_process(file_path: str, args: list = PYLINT_API_ARGS) -> list:
+    """
+    Runs pylint through its Python API in the current process and returns the
+    raw JSON messages. This is what every pool worker executes per job.
+    """
+    from astroid import MANAGER
+    from pylint.lint import Run
+    from pylint.reporters import JSONReporter
+
+    # Upload paths are reused between requests, so astroid's module cache
+    # must not serve a previous revision of the same file. Stdlib and
+    # third-party modules stay cached; that is what keeps the worker warm.
+    target = os.path.abspath(file_path)
+    for name, module in list(MANAGER.astroid_cache.items()):
+        if module.file and os.path.abspath(module.file) == target:
+            del MANAGER.astroid_cache[name]
+    output = io.StringIO()
+    Run([file_path, *args], reporter=JSONReporter(output), exit=False)
+    text = output.getvalue().strip()
+    return json.loads(text) if text else []
+
+
+# --------------------------------------------------------------------
+# 🔹 Pool of long-lived, pre-warmed pylint workers
+# --------------------------------------------------------------------
+class PylintPool:
+    """
+    A process pool whose workers import pylint once and then lint many files.
+
+    * at most `workers` jobs run at a time and `max_queue` more may wait;
+      beyond that `submit` raises PylintPoolFull instead of forking more work
+    * each worker is replaced after `jobs_per_worker` jobs to cap memory growth
+    * a job that exceeds its timeout gets the whole pool recycled, because a
+      busy worker process cannot be interrupted individually
+    """
+
+    def __init__(self, workers=PYLINT_WORKERS, max_queue=PYLINT_MAX_QUEUE,
+                 jobs_per_worker=PYLINT_JOBS_PER_WORKER, timeout=PYLINT_TIMEOUT):
+        self.workers = workers
+        self.timeout = timeout
+        self.jobs_per_worker = jobs_per_worker
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=warm_worker,
+                    max_tasks_per_child=self.jobs_per_worker,
+                )
+            return self._executor
+
+    def warm(self):
+        """Starts every worker now so the first uploads do not pay the import cost."""
+        executor = self._get_executor()
+        for future in [executor.submit(_noop) for _ in range(self.workers)]:
+            future.result()
+
+    def submit(self, file_path: str):
+        if not self._slots.acquire(blocking=False):
+            raise PylintPoolFull("Pylint queue is full")
+        try:
+            future = self._get_executor().submit(lint_in_process, file_path, PYLINT_API_ARGS)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def lint(self, file_path: str, timeout: float = None) -> list:
+        """Lints one file and waits for the result; raises TimeoutError on timeout."""
+        future = self.submit(file_path)
+        try:
+            return future.result(timeout=timeout or self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            self.recycle()
+            raise TimeoutError(f"pylint exceeded {timeout or self.timeout}s")
+
+    def recycle(self):
+        """Kills the current workers (including stuck ones) and starts fresh on next use."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            # ProcessPoolExecutor has no public API to kill a running task
+            for process in list(getattr(executor, "_processes", {}).values()):
+                process.terminate()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pylint_pool() -> PylintPool:
+    """Returns the process-wide pylint pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PylintPool()
+            atexit.register(_pool.shutdown)
+        return _pool
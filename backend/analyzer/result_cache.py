@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from importlib import metadata
+
+# Bump when a detector changes its output for the same input
+ANALYZER_VERSION = "6"
+
+# Define base directory for backend
+base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", os.path.join(base_dir, "cache", "results"))
+RESULT_CACHE_ENTRIES = int(os.getenv("RESULT_CACHE_ENTRIES", 256))
+RESULT_CACHE_DISK_BYTES = int(os.getenv("RESULT_CACHE_DISK_BYTES", 256 * 1024 * 1024))
+
+# Transient failures that must not be replayed from the cache
+UNCACHEABLE_PYLINT_TYPES = {"Pylint Timeout", "Pylint Busy", "Pylint Failed"}
+
+_pylint_version = None
+
+
+def pylint_version() -> str:
+    global _pylint_version
+    if _pylint_version is None:
+        try:
+            _pylint_version = metadata.version("pylint")
+        except metadata.PackageNotFoundError:
+            _pylint_version = "missing"
+    return _pylint_version
+
+
+def source_digest(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+def analysis_key(source_hash: str, config: dict) -> str:
+    """
+    Content address of one analysis: the source hash plus everything that can
+    change the output for the same bytes (analyzer version, model artifacts,
+    detector thresholds, pylint version).
+    """
+    material = json.dumps(
+        {"source": source_hash, "version": ANALYZER_VERSION, "pylint": pylint_version(), **config},
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(result: dict) -> bool:
+    if result.get("summary", {}).get("timed_out_stages"):
+        return False
+    return not any(
+        isinstance(issue, dict) and issue.get("type") in UNCACHEABLE_PYLINT_TYPES
+        for issue in result.get("rule_based", [])
+    )
+
+
+# --------------------------------------------------------------------
+# 🔹 Two-tier (memory LRU + disk) analysis result cache
+# --------------------------------------------------------------------
+class ResultCache:
+    """
+    Maps analysis keys to serialized results. A bounded in-memory LRU sits in
+    front of a directory of JSON files; the directory is trimmed oldest-first
+    once it grows past `max_disk_bytes`. Entries never need explicit
+    invalidation because the key already covers models, thresholds and tools.
+    """
+
+    def __init__(self, cache_dir=RESULT_CACHE_DIR, max_entries=RESULT_CACHE_ENTRIES,
+                 max_disk_bytes=RESULT_CACHE_DISK_BYTES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._disk_bytes = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str):
+        with self._lock:
+            payload = self._memory.get(key)
+            if payload is not None:
+                self._memory.move_to_end(key)
+                return json.loads(payload)
+
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = f.read()
+            os.utime(path)  # mark as recently used for eviction
+        except (FileNotFoundError, OSError):
+            return None
+
+        self._remember(key, payload)
+        return json.loads(payload)
+
+    def put(self, key: str, result: dict):
+        payload = json.dumps(result, separators=(",", ":"))
+        self._remember(key, payload)
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_bytes()
+            else:
+                self._disk_bytes += len(payload)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _remember(self, key: str, payload: str):
+        with self._lock:
+            self._memory[key] = payload
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _entries(self) -> list:
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _scan_disk_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict_disk(self):
+        """Deletes least recently used files until the tier is at 90% of its budget."""
+        target = int(self.max_disk_bytes * 0.9)
+        total = self._scan_disk_bytes()
+        for _, size, path in sorted(self._entries()):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+        self._disk_bytes = total
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            for _, _, path in self._entries():
+                os.remove(path)
+            self._disk_bytes = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """Returns the process-wide result cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache()
+        return _cache
@@ -0,0 +1,628 @@
+import ast
+import builtins
+import os
+import re
+from collections import namedtuple
+
+from analyzer.parsed_source import as_parsed
+
+# "fast": built-in AST rules only, answered in-process; "full": pylint
+RULE_MODES = ("fast", "full")
+RULE_MODE = os.getenv("RULE_MODE", "full")
+# pylint's defaults, so both modes flag the same functions
+RULE_MAX_ARGS = int(os.getenv("RULE_MAX_ARGS", 5))
+RULE_MAX_POSITIONAL_ARGS = int(os.getenv("RULE_MAX_POSITIONAL_ARGS", 5))
+RULE_MAX_BRANCHES = int(os.getenv("RULE_MAX_BRANCHES", 12))
+
+# Symbols the built-in rules report, with pylint's category for each
+RULE_CATEGORIES = {
+    "unused-import": "Warning",
+    "unused-variable": "Warning",
+    "redefined-outer-name": "Warning",
+    "redefined-builtin": "Warning",
+    "function-redefined": "Error",
+    "too-many-arguments": "Refactor",
+    "too-many-positional-arguments": "Refactor",
+    "too-many-branches": "Refactor",
+    "syntax-error": "Error",
+}
+
+# pylint's dummy-variables-rgx and ignored-argument-names defaults
+DUMMY_NAMES = re.compile(r"_+$|(_[a-zA-Z0-9_]*[a-zA-Z0-9]+?$)|dummy|^ignored_|^unused_")
+IGNORED_ARGUMENTS = re.compile(r"_.*|^ignored_|^unused_")
+# Dunder objects (__all__, __doc__, ...) may be imported only to re-export them
+SPECIAL_OBJECTS = re.compile(r"^_{2}[a-z]+_{2}$")
+BUILTIN_NAMES = frozenset(dir(builtins)) - {"__doc__"}
+# Importing a builtin's name from these modules is a deliberate override
+BUILTIN_MODULES = {"builtins", "io", "six.moves", "past.builtins", "future.builtins"}
+
+STATEMENT_FIELDS = ("body", "orelse", "finalbody")
+
+# One name binding. `branch` is the path of (if / try node, branch label) pairs from its scope
+# down to it; `alias` and `module` describe imports.
+Binding = namedtuple("Binding", "name line kind node branch type_checking alias module", defaults=(None, None))
+
+
+# --------------------------------------------------------------------
+# 🔹 Scope analysis: one visitor pass over the shared AST
+# --------------------------------------------------------------------
+class Scope:
+    """Names bound, read and declared global / nonlocal in one module, class, function or comprehension."""
+
+    def __init__(self, node, kind, parent=None):
+        self.node = node
+        self.kind = kind
+        self.parent = parent
+        self.bindings = {}
+        self.loads = set()
+        self.declared = set()
+        self.global_names = set()
+        self.locals_calls = []
+        self.children = []
+        self._free = None
+        if parent is not None:
+            parent.children.append(self)
+
+    def bind(self, binding: Binding):
+        self.bindings.setdefault(binding.name, []).append(binding)
+
+    def _binds(self, name) -> bool:
+        return name in self.bindings and name not in self.declared
+
+    def free_names(self) -> set:
+        """
+        Names read in this scope or a nested one that are not bound here, so
+        they resolve to an enclosing scope. Class bodies do not enclose their
+        methods: names free in a method pass through the class unresolved.
+        """
+        if self._free is None:
+            free = {name for name in self.loads if not self._binds(name)}
+            for child in self.children:
+                free |= child.free_names() if self.kind == "class" else {
+                    name for name in child.free_names() if not self._binds(name)}
+            self._free = free
+        return self._free
+
+    def used_names(self) -> set:
+        """Names read in this scope, or in a nested one where they resolve to this scope's binding."""
+        used = set(self.loads)
+        for child in self.children:
+            used |= child.free_names()
+        return used
+
+    def walk(self):
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+def _is_type_checking(test) -> bool:
+    return (isinstance(test, ast.Name) and test.id == "TYPE_CHECKING") or (
+        isinstance(test, ast.Attribute) and test.attr == "TYPE_CHECKING")
+
+
+class ScopeBuilder(ast.NodeVisitor):
+    """
+    Builds the scope tree of a module in a single pass: every binding with
+    its line, kind and enclosing statement list, every name read, and the
+    global / nonlocal declarations. Decorators, defaults and annotations
+    are visited in the enclosing scope, as Python evaluates them.
+    """
+
+    def __init__(self):
+        self.module = None
+        self._scope = None
+        self._stmt = None
+        self._branch = ()
+        self._type_checking = 0
+
+    # ✅ Scope and statement bookkeeping
+    def _bind(self, name, kind, node, scope=None, **extra):
+        scope = scope or self._scope
+        if name in scope.global_names:
+            scope = self.module
+        scope.bind(Binding(
+            name, getattr(node, "lineno", None) or getattr(self._stmt, "lineno", 1), kind, node,
+            self._branch if scope is self._scope else (), self._type_checking > 0, **extra))
+
+    def _visit_body(self, statements, branch=None):
+        outer = self._stmt, self._branch
+        if branch is not None:
+            self._branch += (branch,)
+        for stmt in statements:
+            self._stmt = stmt
+            self.visit(stmt)
+        self._stmt, self._branch = outer
+
+    def _visit_in(self, scope, visit):
+        outer = self._scope, self._branch
+        self._scope, self._branch = scope, ()
+        visit()
+        self._scope, self._branch = outer
+
+    def _visit_all(self, nodes):
+        for node in nodes:
+            if node is not None:
+                self.visit(node)
+
+    def generic_visit(self, node):
+        for _, value in ast.iter_fields(node):
+            if isinstance(value, list):
+                if value and isinstance(value[0], ast.stmt):
+                    self._visit_body(value)
+                else:
+                    self._visit_all(v for v in value if isinstance(v, ast.AST))
+            elif isinstance(value, ast.AST):
+                self.visit(value)
+
+    def _function_scope(self):
+        scope = self._scope
+        while scope.kind == "comprehension":
+            scope = scope.parent
+        return scope
+
+    # ✅ Scopes
+    def visit_Module(self, node):
+        self.module = self._scope = Scope(node, "module")
+        self._visit_body(node.body)
+
+    def _visit_arguments(self, args):
+        """Defaults and annotations, evaluated in the enclosing scope."""
+        self._visit_all(args.defaults + args.kw_defaults)
+        for arg in args.posonlyargs + args.args + args.kwonlyargs + [args.vararg, args.kwarg]:
+            if arg is not None and arg.annotation is not None:
+                self.visit(arg.annotation)
+
+    def _bind_arguments(self, args, scope):
+        for arg in args.posonlyargs + args.args + args.kwonlyargs + [args.vararg, args.kwarg]:
+            if arg is not None:
+                self._bind(arg.arg, "arg", arg, scope)
+
+    def visit_FunctionDef(self, node):
+        self._visit_all(node.decorator_list)
+        self._visit_arguments(node.args)
+        if node.returns is not None:
+            self.visit(node.returns)
+        self._bind(node.name, "def", node)
+        scope = Scope(node, "function", self._scope)
+        self._bind_arguments(node.args, scope)
+        self._visit_in(scope, lambda: self._visit_body(node.body))
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node):
+        self._visit_arguments(node.args)
+        scope = Scope(node, "lambda", self._scope)
+        self._bind_arguments(node.args, scope)
+        self._visit_in(scope, lambda: self.visit(node.body))
+
+    def visit_ClassDef(self, node):
+        self._visit_all(node.decorator_list + node.bases + node.keywords)
+        self._bind(node.name, "class", node)
+        self._visit_in(Scope(node, "class", self._scope), lambda: self._visit_body(node.body))
+
+    def _visit_comprehension(self, node):
+        # The first iterable is evaluated in the enclosing scope
+        self.visit(node.generators[0].iter)
+
+        def visit():
+            for index, generator in enumerate(node.generators):
+                if index:
+                    self.visit(generator.iter)
+                self.visit(generator.target)
+                self._visit_all(generator.ifs)
+            if isinstance(node, ast.DictComp):
+                self._visit_all((node.key, node.value))
+            else:
+                self.visit(node.elt)
+
+        self._visit_in(Scope(node, "comprehension", self._scope), visit)
+
+    visit_ListComp = visit_SetComp = visit_DictComp = visit_GeneratorExp = _visit_comprehension
+
+    # ✅ Names
+    def visit_Name(self, node):
+        if not isinstance(node.ctx, ast.Store):
+            self._scope.loads.add(node.id)
+        elif self._scope.kind == "comprehension":
+            self._bind(node.id, "comprehension", node)
+        elif isinstance(self._stmt, (ast.For, ast.AsyncFor)):
+            self._bind(node.id, "for", node)
+        elif isinstance(self._stmt, (ast.With, ast.AsyncWith)):
+            self._bind(node.id, "with", node)
+        else:
+            self._bind(node.id, "assign", node)
+
+    def visit_NamedExpr(self, node):
+        # A walrus in a comprehension binds in the enclosing function
+        self.visit(node.value)
+        self._bind(node.target.id, "assign", node.target, self._function_scope())
+
+    def visit_AugAssign(self, node):
+        # `x += 1` reads x before rebinding it
+        if isinstance(node.target, ast.Name):
+            self._scope.loads.add(node.target.id)
+        else:
+            self.visit(node.target)
+        self.visit(node.value)
+
+    def visit_AnnAssign(self, node):
+        self.visit(node.annotation)
+        if node.value is not None:
+            self.visit(node.value)
+            self.visit(node.target)
+        elif not isinstance(node.target, ast.Name):
+            self.visit(node.target)
+
+    def visit_Global(self, node):
+        # Assignments to these names bind module globals
+        self._scope.declared.update(node.names)
+        if self._scope.kind != "module":
+            self._scope.global_names.update(node.names)
+
+    def visit_Nonlocal(self, node):
+        self._scope.declared.update(node.names)
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self._bind(alias.asname or alias.name.split(".")[0], "import", node, alias=alias)
+
+    def visit_ImportFrom(self, node):
+        # Like pylint, relative imports are named without their dots ("from . import x" -> "import x")
+        for alias in node.names:
+            if alias.name != "*":
+                self._bind(alias.asname or alias.name, "import", node, alias=alias, module=node.module)
+
+    def visit_ExceptHandler(self, node):
+        if node.type is not None:
+            self.visit(node.type)
+        if node.name:
+            self._bind(node.name, "except", node)
+        self._visit_body(node.body)
+
+    def visit_Try(self, node):
+        # The try body and its else clause run on one path, each handler on another
+        self._visit_body(node.body, (node, "try"))
+        for index, handler in enumerate(node.handlers):
+            self._branch += ((node, index),)
+            self.visit(handler)
+            self._branch = self._branch[:-1]
+        self._visit_body(node.orelse, (node, "try"))
+        self._visit_body(node.finalbody)
+
+    visit_TryStar = visit_Try
+
+    def visit_MatchAs(self, node):
+        if node.name:
+            self._bind(node.name, "assign", node)
+        self.generic_visit(node)
+
+    def visit_MatchStar(self, node):
+        if node.name:
+            self._bind(node.name, "assign", node)
+
+    def visit_MatchMapping(self, node):
+        if node.rest:
+            self._bind(node.rest, "assign", node)
+        self.generic_visit(node)
+
+    def visit_If(self, node):
+        self.visit(node.test)
+        type_checking = _is_type_checking(node.test)
+        self._type_checking += type_checking
+        self._visit_body(node.body, (node, "body"))
+        self._type_checking -= type_checking
+        self._visit_body(node.orelse, (node, "orelse"))
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Name) and node.func.id == "locals":
+            self._function_scope().locals_calls.append(node.lineno)
+        self.generic_visit(node)
+
+
+def build_scopes(tree) -> Scope:
+    """The module scope of `tree`, with every nested scope below it."""
+    builder = ScopeBuilder()
+    builder.visit(tree)
+    return builder.module
+
+
+# --------------------------------------------------------------------
+# 🔹 Rules (each yields (line, symbol, details))
+# --------------------------------------------------------------------
+def _decorator_names(node) -> set:
+    names = set()
+    for decorator in getattr(node, "decorator_list", ()):
+        target = decorator.func if isinstance(decorator, ast.Call) else decorator
+        if isinstance(target, ast.Name):
+            names.add(target.id)
+        elif isinstance(target, ast.Attribute):
+            names.add(target.attr)
+    return names
+
+
+def _import_message(binding: Binding) -> str:
+    """pylint's wording: "Unused import os", "Unused numpy imported as np", "Unused x imported from y"."""
+    name, asname = binding.alias.name, binding.alias.asname
+    if binding.module:
+        return f"Unused {name} imported from {binding.module}" + (f" as {asname}" if asname else "")
+    return f"Unused {name} imported as {asname}" if asname else f"Unused import {name}"
+
+
+def _skip_import(binding: Binding) -> bool:
+    alias = binding.alias
+    return (
+        binding.type_checking
+        or binding.module == "__future__"
+        or (alias.asname and DUMMY_NAMES.match(alias.asname))
+        or (isinstance(binding.node, ast.ImportFrom) and SPECIAL_OBJECTS.search(alias.name))
+    )
+
+
+def _exported_names(module: ast.Module) -> set:
+    """String constants in module-level `__all__` assignments (lists, tuples, concatenations)."""
+    names = set()
+    for stmt in module.body:
+        if isinstance(stmt, ast.Assign):
+            targets, value = stmt.targets, stmt.value
+        elif isinstance(stmt, (ast.AugAssign, ast.AnnAssign)):
+            targets, value = [stmt.target], stmt.value
+        else:
+            continue
+        if value is not None and any(isinstance(t, ast.Name) and t.id == "__all__" for t in targets):
+            names.update(n.value for n in ast.walk(value) if isinstance(n, ast.Constant) and isinstance(n.value, str))
+    return names
+
+
+def unused_imports(module: Scope, is_package: bool):
+    """Module-level imports never read anywhere in the module (pylint skips __init__.py)."""
+    if is_package:
+        return
+    used = module.used_names() | _exported_names(module.node)
+    for name, bindings in module.bindings.items():
+        if name in used:
+            continue
+        # "import os" and "import os.path" both bind os; each unused import is reported once
+        reported = set()
+        for binding in bindings:
+            if binding.kind == "import" and (binding.alias.name, binding.module) not in reported:
+                reported.add((binding.alias.name, binding.module))
+                if not _skip_import(binding):
+                    yield binding.line, "unused-import", _import_message(binding)
+
+
+def _only_raises(node) -> bool:
+    body = [s for s in node.body if not (isinstance(s, ast.Expr) and isinstance(s.value, ast.Constant))]
+    return len(body) == 1 and isinstance(body[0], ast.Raise)
+
+
+def unused_variables(scope: Scope):
+    """
+    Function locals never read in the function or a nested scope. Names
+    that also serve as comprehension targets, and bindings that a later
+    locals() call may read, are left alone, as pylint does.
+    """
+    node = scope.node
+    if _only_raises(node) or _decorator_names(node) & {"abstractmethod", "overload"}:
+        return
+    used = scope.used_names()
+    comprehension_targets = {
+        name for nested in scope.walk() if nested.kind == "comprehension" for name in nested.bindings}
+    for name, bindings in scope.bindings.items():
+        first = bindings[0]
+        if first.kind == "arg" or name in used or name in scope.declared or name in comprehension_targets \
+                or DUMMY_NAMES.match(name) or any(line >= first.line for line in scope.locals_calls):
+            continue
+        if first.kind == "import":
+            if not first.type_checking:
+                yield first.line, "unused-import", _import_message(first)
+        elif first.kind in ("def", "class") and first.node.decorator_list:
+            continue
+        else:
+            yield first.line, "unused-variable", f"Unused variable {name!r}"
+
+
+def _imports_builtin_override(binding: Binding) -> bool:
+    return binding.kind == "import" and binding.module in BUILTIN_MODULES
+
+
+def _inherited_arguments(scope: Scope, module: Scope):
+    """
+    Argument names of the method `scope` overrides, searched through base
+    classes defined in this module. None when a base is defined elsewhere,
+    since the overridden signature is then unknown.
+    """
+    if scope.parent.kind != "class":
+        return set()
+    name, seen = scope.node.name, set()
+    bases = list(scope.parent.node.bases)
+    while bases:
+        base = bases.pop(0)
+        definitions = module.bindings.get(base.id, ()) if isinstance(base, ast.Name) else ()
+        if not definitions and isinstance(base, ast.Name) and base.id in BUILTIN_NAMES:
+            continue  # builtin bases (object, Exception, dict, ...) take no named arguments worth keeping
+        cls = next((b.node for b in definitions if b.kind == "class"), None)
+        if cls is None:
+            return None
+        if cls in seen:
+            continue
+        seen.add(cls)
+        for stmt in cls.body:
+            if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)) and stmt.name == name:
+                return {a.arg for a in stmt.args.args + stmt.args.kwonlyargs}
+        bases.extend(cls.bases)
+    return set()
+
+
+def redefined_names(scope: Scope, module: Scope):
+    """
+    Function locals that shadow a module-level name or a builtin. Arguments
+    named after a builtin are allowed when the overridden method takes the
+    same argument (or its base class is imported, so it cannot be checked).
+    """
+    inherited = _inherited_arguments(scope, module)
+    for name, bindings in scope.bindings.items():
+        first = bindings[0]
+        if name in scope.declared:
+            continue
+        ignored = (IGNORED_ARGUMENTS if first.kind == "arg" else DUMMY_NAMES).match(name)
+        if name in module.bindings:
+            outer = module.bindings[name]
+            if ignored or outer[0].kind == "except" or outer[0].module == "__future__" or \
+                    any(b.type_checking for b in outer):
+                continue
+            yield first.line, "redefined-outer-name", \
+                f"Redefining name {name!r} from outer scope (line {outer[0].line})"
+        elif name in BUILTIN_NAMES and not _imports_builtin_override(first) and \
+                not (first.kind == "arg" and (inherited is None or name in inherited)):
+            yield first.line, "redefined-builtin", f"Redefining built-in {name!r}"
+
+
+def redefined_module_builtins(module: Scope):
+    for name, bindings in module.bindings.items():
+        if name in BUILTIN_NAMES and not _imports_builtin_override(bindings[0]):
+            yield bindings[0].line, "redefined-builtin", f"Redefining built-in {name!r}"
+
+
+def _redefined_by_decorator(node) -> bool:
+    """`@name.setter` / `@name.register` style definitions extend the first one."""
+    return any(
+        isinstance(d, ast.Attribute) and isinstance(d.value, ast.Name) and d.value.id == node.name
+        for d in node.decorator_list
+    )
+
+
+def _exclusive(a: Binding, b: Binding) -> bool:
+    """Whether two bindings sit in different branches of one if / else or try / except."""
+    for (node_a, label_a), (node_b, label_b) in zip(a.branch, b.branch):
+        if node_a is not node_b:
+            return False
+        if label_a != label_b:
+            return True
+    return False
+
+
+def _guarded_definition(binding: Binding) -> bool:
+    """`if not f:` / `if f is None:` fallbacks define f only when it is missing."""
+    if not binding.branch or binding.branch[-1][1] != "body" or not isinstance(binding.branch[-1][0], ast.If):
+        return False
+    test = binding.branch[-1][0].test
+    if isinstance(test, ast.UnaryOp) and isinstance(test.op, ast.Not):
+        return isinstance(test.operand, ast.Name) and test.operand.id == binding.name
+    return (isinstance(test, ast.Compare) and isinstance(test.left, ast.Name) and test.left.id == binding.name
+            and isinstance(test.ops[0], ast.Is) and isinstance(test.comparators[0], ast.Constant)
+            and test.comparators[0].value is None)
+
+
+def redefined_functions(scope: Scope):
+    """
+    A def or class rebinding a name already bound in the same scope.
+    Definitions in different branches of an if / else or try / except are
+    alternatives, not redefinitions.
+    """
+    for name, bindings in scope.bindings.items():
+        if len(bindings) < 2 or DUMMY_NAMES.match(name):
+            continue
+        defined = [b for b in bindings if b.kind not in ("def", "class") or "overload" not in _decorator_names(b.node)]
+        for binding in defined[1:]:
+            if binding.kind not in ("def", "class") or _exclusive(binding, defined[0]) or \
+                    _guarded_definition(binding):
+                continue
+            if binding.kind == "def" and _redefined_by_decorator(binding.node):
+                continue
+            kind = "class" if binding.kind == "class" else "method" if scope.kind == "class" else "function"
+            yield binding.line, "function-redefined", f"{kind} already defined line {defined[0].line}"
+
+
+def _branches(node) -> int:
+    """pylint's branch count for one function, excluding nested functions and classes."""
+    count = 0
+    stack = list(node.body)
+    while stack:
+        stmt = stack.pop()
+        if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        if isinstance(stmt, ast.If):
+            count += 1 + bool(stmt.orelse and not (len(stmt.orelse) == 1 and isinstance(stmt.orelse[0], ast.If)))
+        elif isinstance(stmt, (ast.For, ast.While)):
+            count += 1 + bool(stmt.orelse)
+        elif isinstance(stmt, ast.Try):
+            count += len(stmt.handlers) + bool(stmt.orelse) + bool(stmt.finalbody)
+        elif isinstance(stmt, ast.Match):
+            count += len(stmt.cases)
+        for field in STATEMENT_FIELDS:
+            stack.extend(getattr(stmt, field, ()))
+        for child in getattr(stmt, "handlers", ()) or getattr(stmt, "cases", ()):
+            stack.extend(child.body)
+    return count
+
+
+def function_design(scope: Scope):
+    """Too many arguments, positional arguments or branches, with pylint's thresholds."""
+    node = scope.node
+    args = node.args
+    positional = args.posonlyargs + args.args
+    if scope.parent.kind == "class" and "staticmethod" not in _decorator_names(node):
+        positional = positional[1:]  # self / cls
+    ignored = sum(1 for a in positional + args.kwonlyargs if IGNORED_ARGUMENTS.match(a.arg))
+    ignored_positional = sum(1 for a in positional if IGNORED_ARGUMENTS.match(a.arg))
+    if positional or args.kwonlyargs:
+        total = len(positional) + len(args.kwonlyargs) - ignored
+        if total > RULE_MAX_ARGS:
+            yield node.lineno, "too-many-arguments", f"Too many arguments ({total}/{RULE_MAX_ARGS})"
+        positional_count = len(positional) - ignored_positional
+        if positional_count > RULE_MAX_POSITIONAL_ARGS:
+            yield node.lineno, "too-many-positional-arguments", \
+                f"Too many positional arguments ({positional_count}/{RULE_MAX_POSITIONAL_ARGS})"
+    branches = _branches(node)
+    if branches > RULE_MAX_BRANCHES:
+        yield node.lineno, "too-many-branches", f"Too many branches ({branches}/{RULE_MAX_BRANCHES})"
+
+
+def find_rule_issues(source) -> list:
+    """(line, symbol, details) for every built-in rule violation, in line order."""
+    parsed = as_parsed(source)
+    module = build_scopes(parsed.tree)
+    is_package = os.path.basename(parsed.path or "") == "__init__.py"
+
+    issues = list(unused_imports(module, is_package))
+    issues.extend(redefined_module_builtins(module))
+    for scope in module.walk():
+        if scope.kind in ("module", "class", "function"):
+            issues.extend(redefined_functions(scope))
+        if scope.kind == "function":
+            issues.extend(unused_variables(scope))
+            issues.extend(redefined_names(scope, module))
+            issues.extend(function_design(scope))
+    return sorted(issues, key=lambda issue: (issue[0], issue[1]))
+
+
+# --------------------------------------------------------------------
+# 🔹 Results in the rule_based shape the results page renders
+# --------------------------------------------------------------------
+def run_builtin_rules(source) -> list:
+    """
+    Runs the built-in rules and formats them like run_pylint_analysis:
+    {category, type, details, line, code_snippet}, or the "No issues found"
+    placeholder. Unparsable sources report pylint's syntax-error.
+    """
+    parsed = as_parsed(source)
+    lines = parsed.lines
+    try:
+        issues = find_rule_issues(parsed)
+    except SyntaxError as e:
+        issues = [(e.lineno or 1, "syntax-error", f"Parsing failed: '{e.msg} (<unknown>, line {e.lineno})'")]
+
+    if not issues:
+        return [{"category": "No issues found", "type": "Clean Code", "details": "", "line": "-"}]
+
+    return [
+        {
+            "category": RULE_CATEGORIES[symbol],
+            "type": symbol,
+            "details": details,
+            "line": line,
+            "code_snippet": lines[line - 1].strip() if 1 <= line <= len(lines) else "",
+        }
+        for line, symbol, details in issues
+    ]
@@ -1,7 +1,33 @@
+import contextlib
+import importlib.util
+import logging
 import subprocess
 import json
-from analyzer.feature_extractor import find_long_methods, find_large_classes
-from analyzer.ml_detector import detect_ml_smells
+import os
+import time
+from analyzer.duplicates import find_duplicates
+from analyzer.incremental import analyze_scopes
+from analyzer.stage_scheduler import Stage, run_stages
+from analyzer.metrics import CACHE_REQUESTS, INPUT_BYTES, STAGE_ERRORS, STAGE_SECONDS, STAGE_TIMEOUTS
+from analyzer.ml_detector import detect_ml_smells, detect_scope_smells
+from analyzer.parsed_source import ParsedSource, as_parsed
+from analyzer.profiling import current_profiler, profiler_for
+from analyzer.model_registry import get_model_registry
+from analyzer.result_cache import analysis_key, get_result_cache, is_cacheable
+from analyzer.rule_engine import RULE_MODE, RULE_MODES, run_builtin_rules
+from analyzer.pylint_pool import PYLINT_ARGS, PYLINT_TIMEOUT, PylintPoolFull, get_pylint_pool, lint_in_process
+
+# Detector thresholds used by analyze_file; part of the result cache key
+ANALYSIS_THRESHOLDS = {
+    "long_method_lines": 12,
+    "large_class_methods": 4,
+    "large_class_lines": 25,
+}
+# Result fields (top level / summary) that describe one run, not the source
+PER_RUN_FIELDS = ("duplicates", "profile")
+PER_RUN_SUMMARY_FIELDS = ("incremental", "ml_scopes", "timings", "cache_hit")
+
+logger = logging.getLogger(__name__)
 
 
 # --------------------------------------------------------
@@ -34,28 +60,41 @@ def get_smell_reason(smell_type: str) -> dict:
 # --------------------------------------------------------
 # 🔹 Run Pylint and capture issues
 # --------------------------------------------------------
-def run_pylint_analysis(file_path: str) -> list:
+def _collect_pylint_messages(file_path: str, in_process: bool = False) -> list:
+    """
+    Returns pylint's raw JSON messages for a file. Uses the pre-warmed worker
+    pool when pylint is importable, otherwise falls back to the pylint CLI.
+    `in_process` lints in the calling process, for callers that already run
+    inside a worker process (batch analysis).
+    """
+    if importlib.util.find_spec("pylint") is not None:
+        if in_process:
+            return lint_in_process(file_path)
+        return get_pylint_pool().lint(file_path)
+
+    result = subprocess.run(
+        ["pylint", file_path, *PYLINT_ARGS],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        timeout=PYLINT_TIMEOUT
+    )
+    output = result.stdout.strip()
+    return json.loads(output) if output else []
+
+
+def run_pylint_analysis(file_path, in_process: bool = False) -> list:
     """
     Runs pylint on a given file and returns structured issues.
     Only critical issues (error, warning, refactor) are kept.
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-        result = subprocess.run(
-            ["pylint", file_path, "--output-format=json", "--score=n"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            timeout=30
-        )
-
-        output = result.stdout.strip()
-        if not output:
-            return [{"category": "No issues found", "type": "Clean Code", "details": "", "line": "-"}]
+        parsed = as_parsed(file_path)
+        lines = parsed.lines
 
-        issues = json.loads(output)
+        issues = _collect_pylint_messages(parsed.path, in_process)
+        if not issues:
+            return [{"category": "No issues found", "type": "Clean Code", "details": "", "line": "-"}]
 
         # Keep only significant issue categories
         critical_types = {"error", "warning", "refactor"}
@@ -78,28 +117,240 @@ def run_pylint_analysis(file_path: str) -> list:
 
         return formatted
 
-    except subprocess.TimeoutExpired:
+    except (subprocess.TimeoutExpired, TimeoutError):
+        STAGE_TIMEOUTS.inc(stage="pylint")
         return [{"category": "Error", "type": "Pylint Timeout", "details": "Pylint took too long to analyze.", "line": "-"}]
+    except PylintPoolFull:
+        STAGE_ERRORS.inc(stage="pylint")
+        return [{"category": "Error", "type": "Pylint Busy", "details": "Too many analyses are queued; try again shortly.", "line": "-"}]
     except Exception as e:
+        STAGE_ERRORS.inc(stage="pylint")
+        logger.warning("Pylint failed on %s: %s", getattr(file_path, "path", file_path), e)
         return [{"category": "Error", "type": "Pylint Failed", "details": str(e), "line": "-"}]
 
 
+def run_rule_analysis(file_path, rules: str = None, in_process: bool = False) -> list:
+    """
+    Rule-based issues in one shape for both tiers: "fast" answers from the
+    built-in AST rules (rule_engine) in milliseconds, "full" runs pylint.
+    `rules` defaults to RULE_MODE.
+    """
+    rules = rules or RULE_MODE
+    if rules not in RULE_MODES:
+        raise ValueError(f"Unknown rule mode: {rules}")
+    if rules == "full":
+        return run_pylint_analysis(file_path, in_process)
+    try:
+        return run_builtin_rules(file_path)
+    except Exception as e:
+        STAGE_ERRORS.inc(stage="pylint")
+        logger.warning("Built-in rules failed on %s: %s", getattr(file_path, "path", file_path), e)
+        return [{"category": "Error", "type": "Rules Failed", "details": str(e), "line": "-"}]
+
+
 # --------------------------------------------------------
 # 🔹 Combine ML + AST + Pylint in one unified analysis
 # --------------------------------------------------------
-def analyze_file(file_path: str) -> dict:
+def analysis_cache_key(parsed: ParsedSource, rules: str = None) -> str:
+    """Result cache key for a source: its hash plus model / threshold / rule tier / tool versions."""
+    return analysis_key(parsed.digest, {
+        "models": get_model_registry().get().fingerprint,
+        "thresholds": ANALYSIS_THRESHOLDS,
+        "rules": rules or RULE_MODE,
+    })
+
+
+def cache_payload(result: dict) -> dict:
+    """
+    The part of a result that depends only on the cache key. Fields about
+    one run (duplicates, profile, incremental reuse, scope label counts,
+    timings) are left out, so a hit for another document never reports them
+    as its own.
+    """
+    payload = {k: v for k, v in result.items() if k not in PER_RUN_FIELDS}
+    payload["summary"] = {k: v for k, v in result["summary"].items() if k not in PER_RUN_SUMMARY_FIELDS}
+    return payload
+
+
+def _report_cached_stages(result: dict, on_stage):
+    on_stage("ml", result["ml_result"])
+    on_stage("ast", {"long_methods": result["long_methods"], "large_classes": result["large_classes"]})
+    on_stage("pylint", result["rule_based"])
+
+
+def detect_duplicates(parsed: ParsedSource, document_id: str = None) -> list:
+    """
+    Functions of `parsed` with near-duplicates anywhere in the duplicate
+    index, which also stores them for later analyses. The file is indexed
+    as `document_id` (or its absolute path), one revision per document.
+    """
+    document = document_id or os.path.abspath(parsed.path or parsed.digest)
+    return find_duplicates(document, parsed, parsed.digest)
+
+
+def analyze_file(file_path: str, use_cache: bool = True, on_stage=None, document_id: str = None,
+                 source_hash: str = None, profile: bool = False, rules: str = None,
+                 duplicate_id: str = None) -> dict:
     """
     Runs ML-based prediction, AST-based smell detection, and Pylint static analysis.
     Returns a unified structured dictionary for frontend visualization.
+    Identical sources are answered from the content-addressed result cache.
+    `on_stage(name, data)`, if given, is called as each stage ("ml", "ast",
+    "pylint", "duplicates") finishes so callers can publish partial results.
+    `document_id` names the logical file across uploads for incremental scope
+    reuse. `duplicate_id` (default: `document_id`) names it in the duplicate
+    index, where it replaces any earlier revision indexed under that name.
+    Duplicates depend on what else has been analyzed, so they are looked up
+    again on a cache hit and never cached.
+    `source_hash` marks an immutable content-addressed blob: it is mapped
+    into memory instead of read, and its hash is reused as the cache key.
+    Per-stage timings (seconds) are attached as `summary["timings"]`.
+    `profile` samples the analysis (bypassing the cache lookup) and attaches
+    the hot-function summary as `result["profile"]`; slow analyses are also
+    profiled automatically when PROFILE_SLOW_SECONDS is set.
+    `rules` picks the rule-based tier ("fast" or "full", default RULE_MODE);
+    the "pylint" stage keeps its name either way.
     """
-    print(f"\n🚀 Analyzing file: {file_path}")
+    rules = rules or RULE_MODE
+    duplicate_id = duplicate_id or document_id
+    logger.info("Analyzing file: %s", file_path)
+    started = time.perf_counter()
 
-    # ✅ 1. ML-based prediction
-    ml_result = detect_ml_smells(file_path)
+    # ✅ 0. Read once (parsing is lazy); every stage below shares this object
+    if source_hash:
+        parsed = ParsedSource.from_mmap(file_path, digest=source_hash)
+    else:
+        parsed = ParsedSource.from_path(file_path)
+    # A mapped upload is released as soon as the analysis is done
+    with parsed:
+        INPUT_BYTES.observe(len(parsed.raw))
 
-    # ✅ 2. AST-based smell localization (Adaptive thresholds)
-    long_methods = find_long_methods(file_path, threshold=12)
-    large_classes = find_large_classes(file_path, method_threshold=4, line_threshold=25)
+        cache = get_result_cache() if use_cache else None
+        cache_key = analysis_cache_key(parsed, rules) if cache else None
+        if cache and not profile:
+            cached = cache.get(cache_key)
+            CACHE_REQUESTS.inc(cache="result", result="miss" if cached is None else "hit")
+            if cached is not None:
+                if on_stage:
+                    _report_cached_stages(cached, on_stage)
+                # Only the lookup (and the duplicate search) is timed; the other stages did not run
+                cached["summary"]["cache_hit"] = True
+                timings = {}
+                results, _ = run_stages([
+                    Stage("duplicates", lambda: detect_duplicates(parsed, duplicate_id), lambda e: []),
+                ], on_stage=on_stage, timings=timings)
+                cached["duplicates"] = results["duplicates"]
+                _finish_timings(cached, timings, started)
+                return cached
+
+        timings = {}
+        profiler = profiler_for(profile)
+        try:
+            with profiler.attached() if profiler else contextlib.nullcontext():
+                result = _run_analysis(parsed, on_stage or (lambda name, data: None), document_id, timings, rules,
+                                       duplicate_id)
+        finally:
+            profile_data = profiler.stop() if profiler else None
+        if cache and is_cacheable(result):
+            cache.put(cache_key, cache_payload(result))
+        _finish_timings(result, timings, started)
+        if profile_data:
+            result["profile"] = profile_data
+            logger.info("Profiled %s (%s): %d samples", file_path, profile_data["trigger"], profile_data["samples"])
+        return result
+
+
+def _finish_timings(result: dict, timings: dict, started: float):
+    """Records the total time and attaches `timings` to the result summary."""
+    elapsed = time.perf_counter() - started
+    STAGE_SECONDS.observe(elapsed, stage="total")
+    result["summary"]["timings"] = {**timings, "total": round(elapsed, 4)}
+
+
+def _ml_timeout(e: Exception) -> dict:
+    return {
+        "Error": "ML Prediction Timeout",
+        "explanation": {
+            "title": "ML Prediction Timeout",
+            "reason": str(e),
+            "fix": "The file may be too large for the ML stage budget; other stages are still shown."
+        }
+    }
+
+
+def _pylint_timeout(e: Exception) -> list:
+    return [{"category": "Error", "type": "Pylint Timeout", "details": str(e), "line": "-"}]
+
+
+def _run_analysis(parsed: ParsedSource, on_stage, document_id: str = None, timings: dict = None,
+                  rules: str = None, duplicate_id: str = None) -> dict:
+    """
+    Runs every stage on an already loaded source. Pylint works in its own
+    process, so it is started alongside ML prediction and AST localization
+    and the three overlap instead of running back to back. With the "fast"
+    rule tier, the rule stage reuses the shared AST instead.
+    """
+    # Parse up front so the concurrent stages share one AST instead of racing to build it
+    try:
+        parsed.tree
+    except Exception:
+        pass
+
+    scope_stats = {}
+    # Stage threads join the caller's profile, if one is running
+    profiler = current_profiler()
+    track = profiler.wrap if profiler else (lambda fn: fn)
+
+    def ast_stage():
+        long_methods, large_classes, stats = localize_smells(parsed, document_id)
+        scope_stats.update(stats)
+        return {"long_methods": long_methods, "large_classes": large_classes}
+
+    results, timed_out = run_stages([
+        # ✅ 1. Rule-based analysis (Pylint) – longest, so it is submitted first
+        Stage("pylint", track(lambda: run_rule_analysis(parsed, rules)), _pylint_timeout),
+        # ✅ 2. ML-based prediction
+        Stage("ml", track(lambda: detect_ml_smells(parsed)), _ml_timeout),
+        # ✅ 3. AST-based smell localization (Adaptive thresholds, one visitor pass)
+        Stage("ast", track(ast_stage), lambda e: {"long_methods": [], "large_classes": []}),
+        # ✅ 4. Near-duplicate functions among every file analyzed so far (MinHash / LSH index)
+        Stage("duplicates", track(lambda: detect_duplicates(parsed, duplicate_id or document_id)), lambda e: []),
+    ], on_stage=on_stage, timings=timings)
+
+    result = assemble_result(
+        results["ml"], results["ast"]["long_methods"], results["ast"]["large_classes"], results["pylint"]
+    )
+    result["duplicates"] = results["duplicates"]
+    result["summary"]["rules"] = rules or RULE_MODE
+    if timed_out:
+        result["summary"]["timed_out_stages"] = timed_out
+    ml_labels = scope_stats.pop("ml_labels", None)
+    if ml_labels:
+        result["summary"]["ml_scopes"] = ml_labels
+    if document_id and scope_stats:
+        result["summary"]["incremental"] = scope_stats
+    return result
+
+
+def localize_smells(parsed: ParsedSource, document_id: str = None) -> tuple:
+    """
+    Returns (long_methods, large_classes, scope_stats) with reasons and per-scope
+    Halstead metrics attached, using ANALYSIS_THRESHOLDS. With a `document_id`,
+    scopes unchanged since that document's previous revision are reused.
+    Every scope is also labelled by the ML model in one batched call; smells
+    carry their label as `ml_prediction` and `scope_stats["ml_labels"]`
+    counts the labels over all scopes.
+    """
+    try:
+        localized = analyze_scopes(parsed, ANALYSIS_THRESHOLDS, document_id=document_id,
+                                   predict=detect_scope_smells)
+        long_methods, large_classes = localized["long_methods"], localized["large_classes"]
+        stats = localized["stats"]
+        labels = [p["label"] for p in localized["scope_predictions"] if p]
+        if labels:
+            stats["ml_labels"] = {label: labels.count(label) for label in sorted(set(labels))}
+    except Exception as e:
+        long_methods, large_classes, stats = [{"error": str(e)}], [{"error": str(e)}], {}
 
     # Attach human-readable reasons
     for method in long_methods:
@@ -108,10 +359,12 @@ def analyze_file(file_path: str) -> dict:
     for cls in large_classes:
         cls["reason"] = get_smell_reason("LargeClass")
 
-    # ✅ 3. Rule-based analysis (Pylint)
-    pylint_results = run_pylint_analysis(file_path)
+    return long_methods, large_classes, stats
+
 
-    # ✅ 4. Detect if the file is clean
+def assemble_result(ml_result: dict, long_methods: list, large_classes: list, pylint_results: list) -> dict:
+    """Combines the stage outputs into the structure the results page renders."""
+    # ✅ 5. Detect if the file is clean
     no_smells_detected = (
         not long_methods and
         not large_classes and
@@ -119,7 +372,7 @@ def analyze_file(file_path: str) -> dict:
         any("Clean Code" in i.get("type", "") for i in pylint_results)
     )
 
-    # ✅ 5. If everything is clean, mark it
+    # ✅ 6. If everything is clean, mark it
     if no_smells_detected:
         return {
             "ml_result": {"predictions": {"status": "Clean Code"}},
@@ -129,7 +382,7 @@ def analyze_file(file_path: str) -> dict:
             "summary": get_smell_reason("CleanCode")
         }
 
-    # ✅ 6. Otherwise, return combined analysis
+    # ✅ 7. Otherwise, return combined analysis
     return {
         "ml_result": ml_result,
         "long_methods": long_methods,
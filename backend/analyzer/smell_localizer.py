@@ -1,25 +1,111 @@
 import ast
+from analyzer.parsed_source import as_parsed
 
-def find_long_methods(file_path, threshold=50):
-    with open(file_path, "r", encoding="utf-8") as f:
-        source = f.read()
+SCOPE_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+FUNCTION_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef)
+# Fields that hold nested statements; definitions can only appear in these
+STATEMENT_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
 
-    tree = ast.parse(source)
-    long_methods = []
 
-    for node in ast.walk(tree):
-        if isinstance(node, ast.FunctionDef):
-            start_line = node.lineno
-            # Try getting the last line of the function
-            end_line = max([n.lineno for n in ast.walk(node) if hasattr(n, 'lineno')], default=start_line)
-            length = end_line - start_line + 1
+# --------------------------------------------------------------------
+# 🔹 Single-pass scope visitor
+# --------------------------------------------------------------------
+class ScopeLocalizer(ast.NodeVisitor):
+    """
+    Visits every statement exactly once and records one entry per function,
+    async function and class. Spans come from `end_lineno`, so no subtree
+    is walked a second time; statements are attributed to their innermost
+    scope as the visitor passes them. Expression subtrees are never entered,
+    since a def or class cannot occur inside an expression.
+    """
 
-            if length > threshold:
+    def __init__(self):
+        self.scopes = []
+        self._stack = []
+
+    def _visit_scope(self, node, kind):
+        parent = self._stack[-1] if self._stack else None
+        start = node.lineno
+        end = node.end_lineno or start
+        scope = {
+            "kind": kind,
+            "name": node.name,
+            "qualname": f"{parent['qualname']}.{node.name}" if parent else node.name,
+            "start": start,
+            "end": end,
+            "length": end - start + 1,
+            "depth": len(self._stack),
+            "statements": 0,
+            "node": node,
+        }
+        if kind == "class":
+            scope["num_methods"] = sum(isinstance(n, FUNCTION_TYPES) for n in node.body)
+        else:
+            args = node.args
+            scope["num_args"] = len(args.posonlyargs) + len(args.args) + len(args.kwonlyargs)
+            scope["is_async"] = isinstance(node, ast.AsyncFunctionDef)
+        if parent:
+            parent["statements"] += 1
+
+        self.scopes.append(scope)
+        self._stack.append(scope)
+        self.generic_visit(node)
+        self._stack.pop()
+
+    def visit_FunctionDef(self, node):
+        self._visit_scope(node, "function")
+
+    def visit_AsyncFunctionDef(self, node):
+        self._visit_scope(node, "function")
+
+    def visit_ClassDef(self, node):
+        self._visit_scope(node, "class")
+
+    def generic_visit(self, node):
+        for field in STATEMENT_FIELDS:
+            children = getattr(node, field, None)
+            if not isinstance(children, list):
+                continue
+            for child in children:
+                if self._stack and isinstance(child, ast.stmt) and not isinstance(child, SCOPE_TYPES):
+                    self._stack[-1]["statements"] += 1
+                self.visit(child)
+
+
+def collect_scopes(source) -> list:
+    """Returns every function / class scope of a path or ParsedSource in source order."""
+    parsed = as_parsed(source)
+    visitor = ScopeLocalizer()
+    visitor.visit(parsed.tree)
+    return visitor.scopes
+
+
+# --------------------------------------------------------------------
+# 🔹 Long-method / large-class localization from one pass
+# --------------------------------------------------------------------
+def localize(source, long_threshold=10, method_threshold=8, line_threshold=50) -> dict:
+    """
+    Runs the scope visitor once and derives long methods, large classes and
+    per-scope metrics from it. Snippets are sliced from the shared line index.
+    """
+    parsed = as_parsed(source)
+    scopes = collect_scopes(parsed)
+    long_methods, large_classes, metrics = [], [], []
+
+    for scope in scopes:
+        start, end = scope["start"], scope["end"]
+        if scope["kind"] == "function":
+            if scope["length"] >= long_threshold:
                 long_methods.append({
-                    "function": node.name,
-                    "start": start_line,
-                    "end": end_line,
-                    "length": length
+                    "function": scope["name"], "start": start, "end": end,
+                    "length": scope["length"], "code_snippet": parsed.segment(start, end)
                 })
+        elif scope["length"] > line_threshold or scope["num_methods"] > method_threshold:
+            large_classes.append({
+                "class": scope["name"], "start": start, "end": end,
+                "lines": scope["length"], "num_methods": scope["num_methods"],
+                "code_snippet": parsed.segment(start, end)
+            })
+        metrics.append({k: v for k, v in scope.items() if k != "node"})
 
-    return long_methods
+    return {"long_methods": long_methods, "large_classes": large_classes, "scopes": metrics}
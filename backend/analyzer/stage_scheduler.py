@@ -0,0 +1,90 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from analyzer.metrics import STAGE_ERRORS, STAGE_TIMEOUTS, timed
+from analyzer.pylint_pool import PYLINT_TIMEOUT
+
+# Per-stage wall-clock budgets in seconds
+STAGE_BUDGETS = {
+    "ml": float(os.getenv("STAGE_TIMEOUT_ML", 20)),
+    "ast": float(os.getenv("STAGE_TIMEOUT_AST", 20)),
+    "duplicates": float(os.getenv("STAGE_TIMEOUT_DUPLICATES", 10)),
+    # pylint enforces its own timeout in the worker pool; this is only a backstop
+    "pylint": float(os.getenv("STAGE_TIMEOUT_PYLINT", PYLINT_TIMEOUT + 5)),
+}
+STAGE_THREADS = int(os.getenv("STAGE_THREADS", 16))
+
+_executor = ThreadPoolExecutor(max_workers=STAGE_THREADS, thread_name_prefix="analysis-stage")
+
+
+class Stage:
+    """
+    One unit of work in an analysis. `fallback()` builds the partial result
+    used when the stage times out or raises; `cancel()` is an optional hook
+    to stop work that lives outside this process (e.g. a pylint job).
+    """
+
+    def __init__(self, name, fn, fallback, timeout=None, cancel=None):
+        self.name = name
+        self.fn = fn
+        self.fallback = fallback
+        self.timeout = timeout if timeout is not None else STAGE_BUDGETS.get(name, 30)
+        self.cancel = cancel
+
+
+# --------------------------------------------------------------------
+# 🔹 Run independent stages concurrently with per-stage deadlines
+# --------------------------------------------------------------------
+def _timed_call(stage, timings):
+    with timed(stage.name, timings):
+        return stage.fn()
+
+
+def run_stages(stages: list, on_stage=None, timings: dict = None) -> tuple:
+    """
+    Starts every stage at once and collects results as they complete, so the
+    wall-clock time is close to the slowest stage rather than the sum.
+    Returns (results by stage name, names of stages that timed out).
+    Each finished stage's duration is recorded in the metrics registry and,
+    if `timings` is given, stored there by stage name.
+
+    A timed-out stage is abandoned: queued work is cancelled and its cancel
+    hook runs, but a Python thread that is already running cannot be
+    interrupted, so its eventual result is simply discarded.
+    """
+    started = time.monotonic()
+    futures = {_executor.submit(_timed_call, stage, timings): stage for stage in stages}
+    deadlines = {future: started + stage.timeout for future, stage in futures.items()}
+    results, timed_out = {}, []
+
+    def publish(stage, value):
+        results[stage.name] = value
+        if on_stage:
+            on_stage(stage.name, value)
+
+    pending = set(futures)
+    while pending:
+        now = time.monotonic()
+        done, pending = wait(pending, timeout=max(0, min(deadlines[f] for f in pending) - now),
+                             return_when=FIRST_COMPLETED)
+        for future in done:
+            stage = futures[future]
+            try:
+                publish(stage, future.result())
+            except Exception as e:
+                STAGE_ERRORS.inc(stage=stage.name)
+                publish(stage, stage.fallback(e))
+
+        now = time.monotonic()
+        for future in [f for f in pending if deadlines[f] <= now]:
+            pending.discard(future)
+            stage = futures[future]
+            future.cancel()
+            if stage.cancel:
+                stage.cancel()
+            timed_out.append(stage.name)
+            STAGE_TIMEOUTS.inc(stage=stage.name)
+            publish(stage, stage.fallback(TimeoutError(f"{stage.name} exceeded {stage.timeout}s")))
+
+    return results, timed_out
@@ -1,17 +1,148 @@
 
+import json
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
+from joblib import Parallel, delayed
+from sklearn.model_selection import ParameterGrid, RandomizedSearchCV, StratifiedKFold, train_test_split
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.svm import SVC
 from sklearn.neighbors import KNeighborsClassifier
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from sklearn.metrics import accuracy_score, classification_report
 import joblib
-import os
 
-
-
-def train_models():
+# Allow `python analyzer/train_model.py` as well as `python -m analyzer.train_model`
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from analyzer.compact_model import CompactForest, compact_path, export_compact, is_exportable
+from analyzer.feature_schema import FEATURE_COLUMNS
+from analyzer.model_registry import MODEL_FILE_MAP, select_model
+
+# Cross-validation folds and sampled parameter settings per candidate
+TRAIN_CV_FOLDS = int(os.getenv("TRAIN_CV_FOLDS", 5))
+TRAIN_SEARCH_ITER = int(os.getenv("TRAIN_SEARCH_ITER", 12))
+# Processes fitting candidates side by side, and threads per forest fit. Forests
+# only get their own threads when candidates are searched one at a time
+# (TRAIN_JOBS=1); otherwise the processes already occupy every core.
+TRAIN_JOBS = int(os.getenv("TRAIN_JOBS", -1))
+TRAIN_FOREST_JOBS = int(os.getenv("TRAIN_FOREST_JOBS", -1))
+# Rows timed one at a time when measuring prediction latency
+TRAIN_LATENCY_ROWS = int(os.getenv("TRAIN_LATENCY_ROWS", 200))
+RANDOM_STATE = 42
+
+
+# --------------------------------------------------------------------
+# 🔹 Candidate models and their bounded search spaces
+# --------------------------------------------------------------------
+# SVM and KNN are distance based, so they get a scaler in front of them;
+# the metrics span several orders of magnitude (loc vs effort).
+CANDIDATES = {
+    "Random Forest": (
+        lambda: RandomForestClassifier(random_state=RANDOM_STATE),
+        {
+            "n_estimators": [25, 50, 100, 200],
+            "max_depth": [None, 8, 16, 32],
+            "min_samples_leaf": [1, 2, 4],
+            "max_features": ["sqrt", "log2"],
+        },
+    ),
+    "Decision Tree": (
+        lambda: DecisionTreeClassifier(random_state=RANDOM_STATE),
+        {
+            "criterion": ["gini", "entropy"],
+            "max_depth": [None, 4, 8, 16, 32],
+            "min_samples_leaf": [1, 2, 4, 8],
+        },
+    ),
+    "SVM": (
+        lambda: make_pipeline(StandardScaler(), SVC(kernel="rbf", random_state=RANDOM_STATE)),
+        {
+            "svc__C": [0.1, 1.0, 10.0, 100.0],
+            "svc__gamma": ["scale", 0.01, 0.1, 1.0],
+        },
+    ),
+    "KNN": (
+        lambda: make_pipeline(StandardScaler(), KNeighborsClassifier(algorithm="auto")),
+        {
+            "kneighborsclassifier__n_neighbors": [3, 5, 7, 11, 15],
+            "kneighborsclassifier__weights": ["uniform", "distance"],
+        },
+    ),
+}
+
+
+def _search_candidate(name: str, X_train, y_train, folds: int, n_iter: int, inner_jobs: int = 1) -> dict:
+    """
+    Runs a randomized search with k-fold CV for one candidate and refits the
+    best setting on the whole training split. Executed in a worker process;
+    estimators that parallelize themselves get `inner_jobs` threads.
+    """
+    build, space = CANDIDATES[name]
+    estimator = build()
+    if "n_jobs" in estimator.get_params():
+        estimator.set_params(n_jobs=inner_jobs)
+    search = RandomizedSearchCV(
+        estimator, space,
+        n_iter=min(n_iter, len(ParameterGrid(space))),
+        cv=StratifiedKFold(n_splits=folds, shuffle=True, random_state=RANDOM_STATE),
+        scoring="accuracy", n_jobs=1, refit=True, random_state=RANDOM_STATE,
+    )
+    started = time.perf_counter()
+    search.fit(X_train, y_train)
+    best = search.best_index_
+    return {
+        "name": name,
+        "model": search.best_estimator_,
+        "params": search.best_params_,
+        "cv_accuracy": search.cv_results_["mean_test_score"][best] * 100,
+        "cv_std": search.cv_results_["std_test_score"][best] * 100,
+        "search_seconds": time.perf_counter() - started,
+        "fit_seconds": search.refit_time_,
+    }
+
+
+def _single_threaded(model):
+    """Forests predict with one thread; a thread pool per single-row call only adds latency."""
+    if isinstance(model, RandomForestClassifier):
+        model.set_params(n_jobs=1)
+    return model
+
+
+def measure_latency(model, X, rows: int = TRAIN_LATENCY_ROWS) -> dict:
+    """
+    Prediction cost per row in microseconds: one row at a time (the per-upload
+    path) and the whole matrix at once (the batch path). Median of the
+    single-row timings, so one scheduler hiccup does not skew it.
+    """
+    sample = X[:max(1, min(rows, len(X)))]
+    model.predict(sample[:1])  # warm caches / lazy init
+
+    timings = []
+    for i in range(len(sample)):
+        started = time.perf_counter()
+        model.predict(sample[i:i + 1])
+        timings.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    model.predict(X)
+    batch = time.perf_counter() - started
+
+    return {
+        "predict_us_single": float(np.median(timings) * 1e6),
+        "predict_us_p95": float(np.percentile(timings, 95) * 1e6),
+        "predict_us_batch": float(batch / len(X) * 1e6),
+    }
+
+
+def train_models(folds: int = TRAIN_CV_FOLDS, n_iter: int = TRAIN_SEARCH_ITER, n_jobs: int = TRAIN_JOBS):
     # Define base directory for backend
     base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 
@@ -22,14 +153,9 @@ def train_models():
 
 
     # ✅ Step 2: Define full 19-feature set
-    selected_features = [
-        "lloc", "sloc", "scloc",
-        "comments", "single_com", "multi_comr",
-        "blanks", "h1", "h2", "n1", "n2",
-        "vocabulary", "length", "volume",
-        "difficulty", "effort", "maintainability_index",
-        "smell_type"
-    ]
+    # Same names and order as analyzer/feature_schema.FEATURE_COLUMNS, i.e. the
+    # columns of merged_dataset.csv that the extractor actually produces
+    selected_features = FEATURE_COLUMNS + ["smell_type"]
 
 
     # ✅ Step 3: Ensure all expected columns exist
@@ -55,20 +181,21 @@ def train_models():
 
 
     # ✅ Step 5: Preprocess
-    X.fillna(0, inplace=True)
+    # float32 matches the records the extractor hands to the model at inference
+    X = X.fillna(0).to_numpy(dtype=np.float32)
 
     # Store original labels for reference
     label_encoder = {label: idx for idx, label in enumerate(y.unique())}
-    y_encoded = y.map(label_encoder)
+    y_encoded = y.map(label_encoder).to_numpy()
     num_classes = len(label_encoder)
 
     print(f"✅ Number of classes: {num_classes}")
     print(f"✅ Label mapping: {label_encoder}")
 
 
-    # ✅ Step 6: Train-test split
+    # ✅ Step 6: Hold out a test split; the search only ever sees the training part
     X_train, X_test, y_train, y_test = train_test_split(
-        X, y_encoded, test_size=0.2, random_state=42
+        X, y_encoded, test_size=0.2, random_state=RANDOM_STATE, stratify=y_encoded
     )
 
 
@@ -77,80 +204,72 @@ def train_models():
     os.makedirs(models_dir, exist_ok=True)
 
 
-    # Dictionary to store model results
-    results = {}
-
-
     print("\n" + "="*60)
-    print("🚀 TRAINING MULTIPLE MODELS")
+    print(f"🚀 SEARCHING {len(CANDIDATES)} MODELS ({folds}-fold CV, ≤{n_iter} settings each)")
     print("="*60)
 
 
-    # ✅ Model 1: Random Forest
-    print("\n📊 Training Random Forest Classifier...")
-    rf_model = RandomForestClassifier(n_estimators=100, random_state=42)
-    rf_model.fit(X_train, y_train)
-    rf_pred = rf_model.predict(X_test)
-    rf_accuracy = accuracy_score(y_test, rf_pred) * 100
-    results['Random Forest'] = rf_accuracy
-
-    print(f"🎯 Random Forest Accuracy: {rf_accuracy:.2f}%")
-    print("\n📊 Classification Report:")
-    print(classification_report(y_test, rf_pred))
-
-    joblib.dump(rf_model, os.path.join(models_dir, "random_forest_model.pkl"))
-    print(f"✅ Saved: {os.path.join(models_dir, 'random_forest_model.pkl')}")
-
-
-    # ✅ Model 2: Decision Tree
-    print("\n" + "-"*60)
-    print("🌳 Training Decision Tree Classifier...")
-    dt_model = DecisionTreeClassifier(criterion='gini', random_state=42)
-    dt_model.fit(X_train, y_train)
-    dt_pred = dt_model.predict(X_test)
-    dt_accuracy = accuracy_score(y_test, dt_pred) * 100
-    results['Decision Tree'] = dt_accuracy
-
-    print(f"🎯 Decision Tree Accuracy: {dt_accuracy:.2f}%")
-    print("\n📊 Classification Report:")
-    print(classification_report(y_test, dt_pred))
-
-    joblib.dump(dt_model, os.path.join(models_dir, "decision_tree_model.pkl"))
-    print(f"✅ Saved: {os.path.join(models_dir, 'decision_tree_model.pkl')}")
-
-
-    # ✅ Model 3: Support Vector Machine (SVM)
-    print("\n" + "-"*60)
-    print("🔷 Training SVM Classifier...")
-    svm_model = SVC(kernel='rbf', C=1.0, gamma='scale', random_state=42)
-    svm_model.fit(X_train, y_train)
-    svm_pred = svm_model.predict(X_test)
-    svm_accuracy = accuracy_score(y_test, svm_pred) * 100
-    results['SVM'] = svm_accuracy
-
-    print(f"🎯 SVM Accuracy: {svm_accuracy:.2f}%")
-    print("\n📊 Classification Report:")
-    print(classification_report(y_test, svm_pred))
-
-    joblib.dump(svm_model, os.path.join(models_dir, "svm_model.pkl"))
-    print(f"✅ Saved: {os.path.join(models_dir, 'svm_model.pkl')}")
-
-
-    # ✅ Model 4: K-Nearest Neighbors (KNN)
-    print("\n" + "-"*60)
-    print("🔵 Training KNN Classifier...")
-    knn_model = KNeighborsClassifier(n_neighbors=5, weights='uniform', algorithm='auto')
-    knn_model.fit(X_train, y_train)
-    knn_pred = knn_model.predict(X_test)
-    knn_accuracy = accuracy_score(y_test, knn_pred) * 100
-    results['KNN'] = knn_accuracy
+    # ✅ Step 7: Search every candidate in parallel worker processes
+    # (single-threaded inside, so the processes do not oversubscribe the cores)
+    inner_jobs = TRAIN_FOREST_JOBS if n_jobs == 1 else 1
+    searches = Parallel(n_jobs=n_jobs)(
+        delayed(_search_candidate)(name, X_train, y_train, folds, n_iter, inner_jobs) for name in CANDIDATES
+    )
 
-    print(f"🎯 KNN Accuracy: {knn_accuracy:.2f}%")
-    print("\n📊 Classification Report:")
-    print(classification_report(y_test, knn_pred))
 
-    joblib.dump(knn_model, os.path.join(models_dir, "knn_model.pkl"))
-    print(f"✅ Saved: {os.path.join(models_dir, 'knn_model.pkl')}")
+    # ✅ Step 8: Score on the hold-out split, measure cost, save
+    # Models are compared and selected on their mean CV accuracy; one 80/20
+    # split is too noisy to rank them, so the hold-out score is only reported.
+    # Latency is measured here, one model at a time, so candidates do not
+    # compete for the CPU while being timed.
+    results, metrics = {}, {}
+    for search in searches:
+        name, model = search["name"], _single_threaded(search["model"])
+        predictions = model.predict(X_test)
+        accuracy = accuracy_score(y_test, predictions) * 100
+        results[name] = search["cv_accuracy"]
+
+        model_path = os.path.join(models_dir, MODEL_FILE_MAP[name])
+        joblib.dump(model, model_path)
+
+        metrics[name] = {
+            "accuracy": accuracy,
+            "cv_accuracy": search["cv_accuracy"],
+            "cv_std": search["cv_std"],
+            "params": search["params"],
+            "search_seconds": search["search_seconds"],
+            "fit_seconds": search["fit_seconds"],
+            "model_bytes": os.path.getsize(model_path),
+            "pickle_bytes": len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)),
+            "model_file": MODEL_FILE_MAP[name],
+            **measure_latency(model, X_test),
+        }
+
+        # Tree models also ship as flat numpy arrays the registry can serve
+        array_path = compact_path(model_path)
+        if is_exportable(model):
+            export_compact(model, array_path)
+            compact = measure_latency(CompactForest.load(array_path), X_test)
+            metrics[name].update({
+                "compact_bytes": os.path.getsize(array_path),
+                "compact_predict_us_single": compact["predict_us_single"],
+                "compact_predict_us_p95": compact["predict_us_p95"],
+                "compact_predict_us_batch": compact["predict_us_batch"],
+            })
+        elif os.path.exists(array_path):
+            os.remove(array_path)
+
+        print("\n" + "-"*60)
+        print(f"📊 {name}: {search['params']}")
+        print(f"🎯 Hold-out Accuracy: {accuracy:.2f}%  |  CV: {search['cv_accuracy']:.2f}% ± {search['cv_std']:.2f}")
+        print(f"⏱️ Fit: {search['fit_seconds']:.3f}s  |  Predict: {metrics[name]['predict_us_single']:.0f}µs/row "
+              f"(batch {metrics[name]['predict_us_batch']:.1f}µs/row)  |  Size: {metrics[name]['model_bytes'] / 1024:.0f} KiB")
+        if "compact_bytes" in metrics[name]:
+            print(f"📦 Compact export: {metrics[name]['compact_predict_us_single']:.0f}µs/row  |  "
+                  f"Size: {metrics[name]['compact_bytes'] / 1024:.0f} KiB")
+        print("\n📊 Classification Report:")
+        print(classification_report(y_test, predictions))
+        print(f"✅ Saved: {model_path}")
 
 
     # ✅ Save feature columns and label encoder
@@ -160,35 +279,54 @@ def train_models():
     print(f"✅ Saved: {os.path.join(models_dir, 'label_encoder.pkl')}")
 
 
-    # ✅ Display final comparison
+    # ✅ Display final comparison (mean CV accuracy)
     print("\n" + "="*60)
-    print("📈 MODEL COMPARISON SUMMARY")
+    print(f"📈 MODEL COMPARISON SUMMARY ({folds}-fold CV accuracy)")
     print("="*60)
     for model_name, acc in sorted(results.items(), key=lambda x: x[1], reverse=True):
-        print(f"{model_name:20s}: {acc:.2f}%")
+        print(f"{model_name:20s}: {acc:.2f}% ± {metrics[model_name]['cv_std']:.2f}  "
+              f"(hold-out {metrics[model_name]['accuracy']:.2f}%)")
     print("="*60)
 
     best_model = max(results, key=results.get)
-    print(f"\n🏆 Best Model: {best_model} with {results[best_model]:.2f}% accuracy")
+    print(f"\n🏆 Best Model: {best_model} with {results[best_model]:.2f}% CV accuracy")
 
 
     # ✅ Save comparison summary to file
     results_dir = os.path.join(base_dir, "results")
     os.makedirs(results_dir, exist_ok=True)
     summary_path = os.path.join(results_dir, "training_summary.txt")
+    # The registry reads the first percentage of each line, i.e. the CV accuracy
     with open(summary_path, "w", encoding="utf-8") as f:
         f.write("="*60 + "\n")
-        f.write("📈 MODEL COMPARISON SUMMARY\n")
+        f.write(f"📈 MODEL COMPARISON SUMMARY ({folds}-fold CV accuracy)\n")
         f.write("="*60 + "\n")
         for model_name, acc in sorted(results.items(), key=lambda x: x[1], reverse=True):
-            f.write(f"{model_name:20s}: {acc:.2f}%\n")
+            f.write(f"{model_name:20s}: {acc:.2f}% ± {metrics[model_name]['cv_std']:.2f}  "
+                    f"(hold-out {metrics[model_name]['accuracy']:.2f}%)\n")
         f.write("="*60 + "\n")
         best_model = max(results, key=results.get)
-        f.write(f"\n🏆 Best Model: {best_model} with {results[best_model]:.2f}% accuracy\n")
+        f.write(f"\n🏆 Best Model: {best_model} with {results[best_model]:.2f}% CV accuracy\n")
 
     print(f"\n✅ Training summary saved to: {summary_path}")
 
 
+    # ✅ Save per-model cost metrics next to the summary
+    metrics_path = os.path.join(results_dir, "training_metrics.json")
+    with open(metrics_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "folds": folds,
+            "search_iterations": n_iter,
+            "train_rows": int(len(X_train)),
+            "test_rows": int(len(X_test)),
+            "models": metrics,
+        }, f, indent=2, default=str)
+
+    print(f"✅ Training metrics saved to: {metrics_path}")
+    print(f"🚦 Served under the configured latency / size budget: {select_model(results, metrics)}")
+    return metrics
+
+
 
 if __name__ == "__main__":
-    train_models()
\ No newline at end of file
+    train_models()
@@ -1,11 +1,28 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify
+from flask import Flask, Response, render_template, request, redirect, url_for, jsonify
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.utils import secure_filename
 import os
 import json
+import logging
+import tempfile
 
 # ✅ Import ML + analysis helpers
 from analyzer.smell_detector import analyze_file
+from analyzer.batch import BATCH_MAX_BYTES, analyze_batch
+from analyzer.metrics import REGISTRY
 from analyzer.ml_detector import get_model_accuracies
-from ai_routes import ai_bp
+from analyzer.pylint_pool import get_pylint_pool
+from analyzer.rule_engine import RULE_MODES
+from ai_routes import ai_bp, check_ai_configuration
+from blob_store import get_blob_store
+from job_queue import QueueFull, get_job_queue
+from result_store import SMELL_KINDS, get_result_store
+from utils.validator import UploadRejected
+from warmup import APP_WARMUP, warm_up
+
+# Log level for the analyzer and routes; progress output is DEBUG, so it is off by default
+LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING").upper()
+logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
 template_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'frontend', 'templates'))
 static_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'frontend', 'static'))
@@ -16,13 +33,34 @@ base_dir = os.path.dirname(os.path.abspath(__file__))
 app = Flask(__name__, template_folder=template_dir, static_folder=static_dir)
 app.config['UPLOAD_FOLDER'] = os.path.join(base_dir, 'uploads')
 app.config['RESULTS_FOLDER'] = os.path.join(base_dir, 'results')
+# Server-side directories under this root may be scanned by path via /api/analyze-batch
+app.config['BATCH_ROOT'] = os.getenv('BATCH_ROOT')
 
 # Register the AI blueprint
 app.register_blueprint(ai_bp, url_prefix="/api")
 
+# The job queue (background analyses started by /analyze), the result store
+# (finished analyses; older `results/<id>.json` files stay readable through it)
+# and the blob store (uploads, once per content hash) are created on first use.
+# Spawn-started worker processes (pylint and batch pools) re-import this module
+# as __mp_main__, so importing it must not start threads, open stores or warm up.
+if __name__ != '__mp_main__':
+    check_ai_configuration()
+    # Pre-fork servers (gunicorn --preload) load heavy dependencies once in the master
+    if APP_WARMUP:
+        warm_up()
+
+
+@app.route('/metrics')
+def metrics():
+    """Stage latencies, cache hits, timeouts, errors and queue gauges (Prometheus text format)."""
+    get_job_queue()  # registers the queue gauges
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
 
 @app.route('/api/model-accuracies')
 def model_accuracies():
+    # Served from the model registry's in-memory cache
     accuracies = get_model_accuracies()
     return jsonify(accuracies)
 
@@ -35,67 +73,247 @@ def home():
     return render_template('index.html')
 
 
-# ✅ Route 2: Analyze Uploaded File
+# ✅ Route 2: Analyze Uploaded File (queued; returns at once)
+def _wants_json() -> bool:
+    return request.args.get('async') == '1' or request.accept_mimetypes.best == 'application/json'
+
+
+def _wants_profile() -> bool:
+    """Profiling is requested with `?profile=1` or an `X-Profile: 1` header."""
+    return request.args.get('profile') == '1' or request.headers.get('X-Profile') == '1'
+
+
+def _rule_mode(value=None):
+    """Rule tier from `value` or `?rules=fast|full`; None (RULE_MODE) when absent or unknown."""
+    value = value or request.args.get('rules')
+    return value if value in RULE_MODES else None
+
+
+def run_analysis_job(job, blob, filename, profile=False, rules=None):
+    """Job body: analyze, publish each stage, then persist the result by job id."""
+    # The upload name identifies revisions of the same file for incremental reuse;
+    # the blob digest is already the source hash, so nothing is read or hashed again.
+    # In the duplicate index each upload is its own document: two services' utils.py
+    # must not replace each other there, as revisions of one file would.
+    result_data = analyze_file(blob.path, on_stage=job.record_stage, document_id=filename,
+                               source_hash=blob.digest, profile=profile, rules=rules,
+                               duplicate_id=f"{filename}@{blob.digest[:16]}")
+
+    # The source itself stays in the blob store, referenced by its hash
+    get_result_store().put(job.id, filename, result_data, source_hash=blob.digest)
+
+    return result_data
+
+
 @app.route('/analyze', methods=['POST'])
 def analyze():
-    if 'file' not in request.files:
+    # Stream the upload into the content-addressed blob store (validated and
+    # hashed chunk by chunk); identical content is stored only once
+    try:
+        received = get_blob_store().receive(request.environ)
+    except UploadRejected as e:
+        return jsonify({"success": False, "error": str(e)}), e.status_code
+    if received is None:
         return "No file uploaded"
 
-    file = request.files['file']
-    if file.filename == '':
-        return "No selected file"
+    blob, client_filename = received
+    job_queue = get_job_queue()
+    job_id = job_queue.new_id()
+    filename = secure_filename(client_filename) or "upload.py"
 
-    # Save uploaded file
-    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], file.filename)
-    file.save(filepath)
+    try:
+        job_queue.submit(job_id, filename, run_analysis_job, blob, filename, _wants_profile(), _rule_mode())
+    except QueueFull as e:
+        return jsonify({"success": False, "error": str(e)}), 429, {"Retry-After": "5"}
 
-    # Run combined analysis
-    result_data = analyze_file(filepath)
+    if _wants_json():
+        return jsonify({
+            "success": True,
+            "job_id": job_id,
+            "status_url": url_for('job_status', job_id=job_id),
+            "events_url": url_for('job_events', job_id=job_id),
+            "result_url": url_for('show_result', result_id=job_id),
+        }), 202
 
-    # Save results to a JSON file
-    os.makedirs(app.config['RESULTS_FOLDER'], exist_ok=True)
-    result_filename = f"{file.filename}.json"
-    result_filepath = os.path.join(app.config['RESULTS_FOLDER'], result_filename)
-    
-    with open(result_filepath, 'w') as f:
-        json.dump(result_data, f, indent=4)
+    # Redirect to the result page; it shows live progress until the job finishes
+    return redirect(url_for('show_result', result_id=job_id))
 
-    # Redirect to the result page
-    return redirect(url_for('show_result', filename=file.filename))
 
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    return jsonify(job.to_dict())
 
-# ✅ Route 3: Show Analysis Result
-@app.route('/result/<filename>')
-def show_result(filename):
-    result_filename = f"{filename}.json"
-    result_filepath = os.path.join(app.config['RESULTS_FOLDER'], result_filename)
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
 
-    if not os.path.exists(result_filepath):
-        return "Result not found", 404
+@app.route('/api/jobs/<job_id>/events')
+def job_events(job_id):
+    """Server-sent events: one event per status change and finished stage."""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+
+    def stream():
+        seq = -1
+        while True:
+            events = job.events_after(seq, timeout=15)
+            if not events:
+                yield ": keep-alive\n\n"
+                continue
+            for event in events:
+                seq = event["seq"]
+                yield f"id: {seq}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+            if job.finished and seq == len(job.events) - 1:
+                return
+
+    return Response(stream(), mimetype='text/event-stream', headers={"Cache-Control": "no-cache"})
+
 
-    with open(result_filepath, 'r') as f:
-        result_data = json.load(f)
+# ✅ Route 2b: Analyze a whole repository (zip / tarball upload or server path)
+def run_batch_job(job, target, namespace=None, rules=None, upload=False):
+    """Job body: analyze a directory or archive; an uploaded archive is deleted afterwards."""
+    try:
+        return analyze_batch(target, namespace=namespace, rules=rules)
+    finally:
+        if upload:
+            os.remove(target)
 
-    with open(filepath, 'r', encoding='utf-8') as f:
-        code_content = f.read()
 
-    # Check if any smells were detected
-    no_smells_detected = all(not result_data.get(key) for key in ['long_methods', 'large_classes', 'rule_based'])
+def _receive_archive(archive):
+    """Saves an uploaded archive to a temp file the batch job owns; returns its path."""
+    with tempfile.NamedTemporaryFile(prefix="smell-batch-", suffix=os.path.basename(archive.filename),
+                                     delete=False) as tmp:
+        archive.save(tmp)
+    return tmp.name
+
+
+@app.route('/api/analyze-batch', methods=['POST'])
+def analyze_batch_route():
+    # Refuse oversized uploads before any of the body is read; bodies without a
+    # Content-Length are cut off at the same limit while being parsed
+    too_large = jsonify({"success": False, "error": "Archive exceeds the batch size limit"}), 413
+    if request.content_length is not None and request.content_length > BATCH_MAX_BYTES:
+        return too_large
+    request.max_content_length = BATCH_MAX_BYTES
+    try:
+        payload = request.get_json(silent=True) or request.form
+        archive = request.files.get('file')
+        rules = _rule_mode(payload.get('rules'))
+        if archive and archive.filename:
+            # Name the archive's files after the upload, not the temp file
+            namespace = secure_filename(archive.filename) or "archive"
+            target, upload = _receive_archive(archive), True
+            filename = archive.filename
+        elif payload.get('path'):
+            root = app.config['BATCH_ROOT']
+            target = os.path.realpath(payload['path'])
+            if not root or os.path.commonpath([target, os.path.realpath(root)]) != os.path.realpath(root):
+                return jsonify({"success": False, "error": "Path is outside BATCH_ROOT"}), 403
+            namespace, upload = None, False
+            filename = payload['path']
+        else:
+            return jsonify({"success": False, "error": "Upload an archive or pass a path"}), 400
+    except RequestEntityTooLarge:
+        return too_large
+
+    job_queue = get_job_queue()
+    job_id = job_queue.new_id()
+    try:
+        job_queue.submit(job_id, filename, run_batch_job, target, namespace, rules, upload)
+    except QueueFull as e:
+        if upload:
+            os.remove(target)
+        return jsonify({"success": False, "error": str(e)}), 429, {"Retry-After": "5"}
+
+    # The report is the job's result, served by the status URL once the job is done
+    return jsonify({
+        "success": True,
+        "job_id": job_id,
+        "status_url": url_for('job_status', job_id=job_id),
+        "events_url": url_for('job_events', job_id=job_id),
+    }), 202
+
+
+# ✅ Route 3: Show Analysis Result
+@app.route('/result/<result_id>')
+def show_result(result_id):
+    job = get_job_queue().get(result_id)
+    if job is not None and job.status == "failed":
+        return f"Analysis failed: {job.error}", 500
+    if job is not None and not job.finished:
+        return render_template('results.html', pending=True, job_id=job.id, filename=job.filename,
+                               ml_result={}, summary={})
+
+    stored = get_result_store().get(secure_filename(result_id))
+    if stored is None:
+        return "Result not found", 404
+
+    result_data = stored['result']
+    code_content = stored['source'] or get_blob_store().read_text(stored['source_hash']) or ''
 
     return render_template(
         'results.html',
-        filename=filename,
+        result_id=result_id,
+        filename=stored['filename'],
         ml_result=result_data.get('ml_result', {}),
         long_methods=result_data.get('long_methods', []),
         large_classes=result_data.get('large_classes', []),
         rule_based=result_data.get('rule_based', []),
+        duplicates=result_data.get('duplicates', []),
         code_content=code_content,
-        summary=result_data.get('summary', {})
+        summary=result_data.get('summary', {}),
+        profile=result_data.get('profile')
     )
 
 
+# ✅ Route 4: Stored results, history and aggregates
+@app.route('/api/results/<result_id>')
+def get_result(result_id):
+    stored = get_result_store().get(secure_filename(result_id))
+    if stored is None:
+        return jsonify({"success": False, "error": "Result not found"}), 404
+    stored.pop('source', None)
+    return jsonify({"success": True, **stored})
+
+
+@app.route('/api/results/<result_id>/profile')
+def get_result_profile(result_id):
+    """Hot-function summary and collapsed stacks of a profiled analysis."""
+    stored = get_result_store().get(secure_filename(result_id))
+    if stored is None:
+        return jsonify({"success": False, "error": "Result not found"}), 404
+    profile = stored['result'].get('profile')
+    if profile is None:
+        return jsonify({"success": False, "error": "This analysis was not profiled"}), 404
+    if request.args.get('stacks') != '1':
+        profile = {k: v for k, v in profile.items() if k != 'stacks'}
+    return jsonify({"success": True, "id": stored['id'], "profile": profile})
+
+
+@app.route('/api/history/<path:filename>')
+def file_history(filename):
+    limit = min(request.args.get('limit', 20, type=int), 500)
+    return jsonify({
+        "success": True,
+        "filename": filename,
+        "analyses": get_result_store().history(secure_filename(filename), limit),
+        "smell_counts": get_result_store().smell_counts(secure_filename(filename)),
+    })
+
+
+@app.route('/api/smells/top')
+def top_smells():
+    kind = request.args.get('kind', 'long_method')
+    if kind not in SMELL_KINDS:
+        return jsonify({"success": False, "error": f"kind must be one of {', '.join(SMELL_KINDS)}"}), 400
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    return jsonify({"success": True, "kind": kind, "smells": get_result_store().top_smells(kind, limit)})
+
+
 # ✅ Start Flask App
 if __name__ == '__main__':
+    # Load the models and start the pylint workers before the first upload arrives
+    warm_up()
+    get_pylint_pool().warm()
     app.run(debug=True, use_reloader=False)
@@ -0,0 +1,112 @@
+"""
+Measures cold-start import time of the backend's entry points, each in a
+fresh interpreter via `python -X importtime`, and lists the heaviest
+dependencies each one pulls in.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time app cli --repeat 7 --json import_times.json
+
+Track the JSON output across commits to catch a heavy import creeping back
+into module scope.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+DEFAULT_MODULES = [
+    "app",
+    "ai_routes",
+    "cli",
+    "analyzer.smell_detector",
+    "analyzer.ml_detector",
+    "analyzer.model_registry",
+    "analyzer.feature_extractor",
+    "analyzer.batch",
+]
+
+
+def import_profile(module: str) -> list:
+    """
+    Imports `module` in a new interpreter and returns the -X importtime report
+    as (name, cumulative microseconds, nesting depth) rows, in report order
+    (children are listed before the module that imported them).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+        env={**os.environ, "APP_WARMUP": "0"},
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed: {proc.stderr.strip().splitlines()[-1]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header row
+        stripped = name.lstrip()
+        rows.append((stripped, int(cumulative), (len(name) - len(stripped) - 1) // 2))
+    return rows
+
+
+def dependencies(rows: list, module: str, max_depth: int = 2) -> list:
+    """(name, cumulative µs) of what `module` itself imported, up to `max_depth` levels down."""
+    index = max(i for i, row in enumerate(rows) if row[0] == module)
+    base = rows[index][2]
+    found = []
+    for name, cumulative, depth in reversed(rows[:index]):
+        if depth <= base:
+            break
+        if depth - base <= max_depth:
+            found.append((name, cumulative))
+    return found
+
+
+def measure(module: str, repeat: int, top: int) -> dict:
+    runs = [import_profile(module) for _ in range(repeat)]
+    totals = [next(us for name, us, _ in run if name == module) for run in runs]
+    heavy = sorted(dependencies(runs[-1], module), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "module": module,
+        "median_ms": statistics.median(totals) / 1000,
+        "min_ms": min(totals) / 1000,
+        "heaviest": [{"module": name, "ms": us / 1000} for name, us in heavy],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="Heaviest dependencies listed per module")
+    parser.add_argument("--json", help="Also write the measurements to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'module':<30} {'median (ms)':>12} {'min (ms)':>10}  heaviest imports")
+    for module in args.modules:
+        try:
+            result = measure(module, args.repeat, args.top)
+        except RuntimeError as e:
+            print(f"{module:<30} {'failed':>12}  {e}")
+            continue
+        results.append(result)
+        heaviest = ", ".join(f"{h['module']} {h['ms']:.0f}" for h in result["heaviest"])
+        print(f"{module:<30} {result['median_ms']:>12.1f} {result['min_ms']:>10.1f}  {heaviest}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "repeat": args.repeat, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
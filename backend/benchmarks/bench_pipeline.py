@@ -0,0 +1,224 @@
+"""
+Times every stage of the analysis pipeline on synthetic corpora and checks
+the numbers against a stored baseline.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_pipeline                       # compare to baseline
+    python -m benchmarks.bench_pipeline --save-baseline       # record a new one
+    python -m benchmarks.bench_pipeline --corpora giant_class --sizes 1KB 5MB
+
+Each (corpus, size, stage) runs in its own interpreter, so the peak RSS
+reported is that stage's alone (imports included; pylint pool workers are
+separate processes and not counted). Stages are warmed up once, then timed
+`--repeat` times; the median is compared with the baseline and the run
+exits with status 1 if any stage is slower by more than `--threshold`.
+Caches, the result store and the blob store point at a scratch directory,
+so every timed call does the full work.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.corpora import CORPORA, SIZES, write_corpus
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+STAGES = [
+    "extract_features",
+    "find_long_methods",
+    "find_large_classes",
+    "detect_ml_smells",
+    "run_pylint_analysis",
+    "analyze_roundtrip",
+]
+# Stages skipped above this many bytes by default (pylint alone takes minutes on 5 MB)
+STAGE_MAX_BYTES = {"run_pylint_analysis": SIZES["1MB"], "analyze_roundtrip": SIZES["1MB"]}
+# Slowdowns smaller than this are treated as noise whatever the ratio
+NOISE_FLOOR_SECONDS = 0.005
+
+
+# --------------------------------------------------------------------
+# 🔹 Stage runners (executed inside the worker interpreter)
+# --------------------------------------------------------------------
+def _stage_callable(stage: str, path: str):
+    """Returns a zero-argument callable that runs `stage` once on `path`."""
+    if stage == "extract_features":
+        from analyzer.feature_extractor import extract_features
+        return lambda: extract_features(path)
+    if stage == "find_long_methods":
+        from analyzer.feature_extractor import find_long_methods
+        return lambda: find_long_methods(path)
+    if stage == "find_large_classes":
+        from analyzer.feature_extractor import find_large_classes
+        return lambda: find_large_classes(path)
+    if stage == "detect_ml_smells":
+        from analyzer.ml_detector import detect_ml_smells
+        return lambda: detect_ml_smells(path)
+    if stage == "run_pylint_analysis":
+        from analyzer.smell_detector import run_pylint_analysis
+        return lambda: run_pylint_analysis(path)
+    if stage == "analyze_roundtrip":
+        return _roundtrip(path)
+    raise ValueError(f"unknown stage {stage}")
+
+
+def _roundtrip(path: str):
+    """POST /analyze through the Flask test client and wait for the job to finish."""
+    import app as web
+    from analyzer.result_cache import get_result_cache
+
+    client = web.app.test_client()
+    with open(path, "rb") as f:
+        source = f.read()
+    counter = iter(range(1 << 30))
+
+    def run():
+        # Fresh cache and a new upload name (document id) each time, so nothing is reused
+        get_result_cache().clear()
+        response = client.post(
+            "/analyze?async=1",
+            data={"file": (io.BytesIO(source), f"bench_{next(counter)}.py")},
+            content_type="multipart/form-data",
+        )
+        job_id = response.get_json()["job_id"]
+        job = web.job_queue.get(job_id)
+        while not job.finished:
+            job.events_after(len(job.events) - 1, timeout=1)
+        if job.status != "done":
+            raise RuntimeError(job.error)
+        return client.get(f"/result/{job_id}").status_code
+    return run
+
+
+def run_stage(stage: str, path: str, repeat: int) -> dict:
+    """Warm-up call, then `repeat` timed calls; analyzer output is discarded."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        fn = _stage_callable(stage, path)
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        fn()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+    return {
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        # ru_maxrss is in KiB on Linux
+        "rss_before_mb": rss_before / 1024,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+# --------------------------------------------------------------------
+# 🔹 Orchestration, baseline comparison and reporting
+# --------------------------------------------------------------------
+def measure(stage: str, path: str, repeat: int, scratch: str) -> dict:
+    env = {
+        **os.environ,
+        "APP_WARMUP": "0",
+        "RESULT_CACHE_DIR": os.path.join(scratch, "cache"),
+        "RESULT_DB_PATH": os.path.join(scratch, "results.db"),
+        "BLOB_DIR": os.path.join(scratch, "blobs"),
+        "UPLOAD_MAX_BYTES": str(max(SIZES.values()) * 2),
+    }
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_pipeline", "--worker", stage, path, str(repeat)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "worker failed")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Keys whose median slowed down by more than `threshold` (and the noise floor)."""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        slower = current["median_s"] - previous["median_s"]
+        if slower > NOISE_FLOOR_SECONDS and current["median_s"] > previous["median_s"] * (1 + threshold):
+            regressions.append((key, previous["median_s"], current["median_s"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpora", nargs="+", choices=list(CORPORA), default=list(CORPORA))
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["1KB", "64KB", "1MB"])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--all-sizes", action="store_true", help="Do not skip slow stages on large inputs")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown ratio (default: 25%%)")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--worker", nargs=3, metavar=("STAGE", "PATH", "REPEAT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        stage, path, repeat = args.worker
+        print(json.dumps(run_stage(stage, path, int(repeat))))
+        return 0
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    print(f"{'corpus':<15} {'size':>5} {'stage':<20} {'median (ms)':>12} {'MB/s':>8} {'peak RSS (MB)':>14} {'vs baseline':>12}")
+    with tempfile.TemporaryDirectory() as scratch:
+        for kind in args.corpora:
+            for size_name in args.sizes:
+                path = write_corpus(scratch, kind, size_name)
+                size = os.path.getsize(path)
+                for stage in args.stages:
+                    key = f"{kind}/{size_name}/{stage}"
+                    if not args.all_sizes and size > STAGE_MAX_BYTES.get(stage, size):
+                        print(f"{kind:<15} {size_name:>5} {stage:<20} {'skipped':>12}")
+                        continue
+                    try:
+                        result = measure(stage, path, args.repeat, scratch)
+                    except RuntimeError as e:
+                        print(f"{kind:<15} {size_name:>5} {stage:<20} {'failed':>12}  {e}")
+                        continue
+                    result["bytes"] = size
+                    result["mb_per_s"] = size / (1 << 20) / result["median_s"] if result["median_s"] else 0.0
+                    results[key] = result
+
+                    previous = baseline.get(key)
+                    delta = f"{result['median_s'] / previous['median_s'] - 1:+.0%}" if previous else "-"
+                    print(f"{kind:<15} {size_name:>5} {stage:<20} {result['median_s'] * 1000:>12.1f} "
+                          f"{result['mb_per_s']:>8.2f} {result['peak_rss_mb']:>14.1f} {delta:>12}")
+
+    report = {"python": sys.version.split()[0], "repeat": args.repeat, "results": results}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for key, before, after in regressions:
+        print(f"REGRESSION {key}: {before * 1000:.1f} ms -> {after * 1000:.1f} ms")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
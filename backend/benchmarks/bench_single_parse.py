@@ -0,0 +1,88 @@
+"""
+Compares the original multi-read / multi-parse analysis path with the shared
+ParsedSource pipeline on large synthetic files.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_single_parse --lines 2000 5000 10000
+
+Pylint and the ML model are left out on purpose: both are identical on each
+side, so only the read / parse / metric work that changed is timed.
+"""
+import argparse
+import ast
+import contextlib
+import os
+import tempfile
+import time
+
+from radon.raw import analyze
+from radon.metrics import h_visit, mi_visit
+
+from analyzer.feature_extractor import extract_features
+from analyzer.parsed_source import ParsedSource
+from analyzer.smell_localizer import localize
+from benchmarks.corpora import make_source
+
+
+def legacy_path(path: str) -> None:
+    """Replicates the reads and parses of the pre-ParsedSource pipeline."""
+    # extract_features: one read, radon raw + h_visit + mi_visit (two more parses)
+    with open(path, "r", encoding="utf-8") as f:
+        source = f.read()
+    analyze(source)
+    h_visit(source)
+    mi_visit(source, True)
+    # find_long_methods / find_large_classes: one read + one parse each
+    for node_type in (ast.FunctionDef, ast.ClassDef):
+        with open(path, "r", encoding="utf-8") as f:
+            source = f.read()
+        tree = ast.parse(source)
+        for node in ast.walk(tree):
+            if isinstance(node, node_type):
+                max([n.lineno for n in ast.walk(node) if hasattr(n, "lineno")], default=node.lineno)
+    # run_pylint_analysis: one more read for snippets
+    with open(path, "r", encoding="utf-8") as f:
+        f.readlines()
+
+
+def shared_path(path: str) -> None:
+    parsed = ParsedSource.from_path(path)
+    extract_features(parsed)
+    localize(parsed, long_threshold=12, method_threshold=4, line_threshold=25)
+    parsed.lines
+
+
+def best_of(fn, path: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(path)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, nargs="+", default=[2000, 5000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'lines':>8} {'legacy (ms)':>12} {'shared (ms)':>12} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for target in args.lines:
+            path = os.path.join(tmp, f"synthetic_{target}.py")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(make_source(target))
+
+            # Silence the analyzer's progress prints while timing
+            with open(os.devnull, "w") as devnull:
+                with contextlib.redirect_stdout(devnull):
+                    legacy = best_of(legacy_path, path, args.repeat)
+                    shared = best_of(shared_path, path, args.repeat)
+
+            print(f"{target:>8} {legacy * 1000:>12.1f} {shared * 1000:>12.1f} {legacy / shared:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
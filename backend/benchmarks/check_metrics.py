@@ -0,0 +1,136 @@
+"""
+Checks the native metrics engine (analyzer.code_metrics) against radon, the
+reference implementation it replaces, and times both.
+
+Run from the backend directory:
+
+    python -m benchmarks.check_metrics                     # synthetic corpora
+    python -m benchmarks.check_metrics path/to/repo --scopes
+
+Every file's record (raw, Halstead, maintainability index, cyclomatic
+complexity) must equal radon's; with --scopes every function and class is
+compared too, against radon run on the scope's own source. Exits 1 on any
+mismatch.
+"""
+import argparse
+import ast
+import math
+import os
+import sys
+import tempfile
+import textwrap
+import time
+
+from radon.metrics import h_visit_ast, mi_compute
+from radon.raw import analyze
+from radon.visitors import ComplexityVisitor
+
+from analyzer.code_metrics import SCOPE_TYPES, measure
+from analyzer.feature_schema import METRIC_NAMES
+from analyzer.parsed_source import ParsedSource
+from benchmarks.corpora import CORPORA, write_corpus
+
+
+def radon_values(text: str, node) -> tuple:
+    """What radon reports for `text` (raw) and `node` (Halstead, complexity), in METRIC_NAMES order."""
+    raw = analyze(text)
+    halstead = tuple(h_visit_ast(node).total)
+    complexity = ComplexityVisitor.from_ast(node).total_complexity
+    comment_pct = (raw.comments + raw.multi) / float(raw.sloc) * 100 if raw.sloc else 0
+    return (
+        raw.loc, raw.lloc, raw.sloc,
+        raw.comments, raw.single_comments, raw.multi,
+        raw.blank, *halstead,
+        mi_compute(halstead[7], complexity, raw.lloc, comment_pct),
+        complexity,
+    )
+
+
+def _differences(native: tuple, reference: tuple) -> list:
+    return [
+        f"{name}: native {a!r} != radon {b!r}"
+        for name, a, b in zip(METRIC_NAMES, native, reference)
+        if not math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+    ]
+
+
+def check_file(path: str, scopes: bool) -> tuple:
+    """(native seconds, radon seconds, mismatch messages, scopes compared) for one file."""
+    parsed = ParsedSource.from_path(path)
+    try:
+        tree = parsed.tree
+    except (SyntaxError, ValueError):
+        return 0.0, 0.0, [], 0
+
+    start = time.perf_counter()
+    try:
+        metrics = measure(parsed)
+    except SyntaxError as e:
+        try:
+            analyze(parsed.text)
+        except SyntaxError:
+            return 0.0, 0.0, [], 0  # radon rejects the file as well
+        return 0.0, 0.0, [f"{path}: native engine raised {e}"], 0
+    native_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    try:
+        reference = radon_values(parsed.text, tree)
+    except SyntaxError:
+        return native_seconds, 0.0, [f"{path}: radon raised, native engine did not"], 0
+    radon_seconds = time.perf_counter() - start
+
+    problems = [f"{path}: {d}" for d in _differences(metrics.values(), reference)]
+    compared = 0
+    if scopes:
+        for node in ast.walk(tree):
+            if not isinstance(node, SCOPE_TYPES):
+                continue
+            segment = textwrap.dedent(parsed.segment(node.lineno, node.end_lineno))
+            try:
+                expected = radon_values(segment, node)
+            except SyntaxError:
+                continue  # spans that radon cannot tokenize on their own
+            compared += 1
+            problems.extend(f"{path}:{node.lineno} {node.name}: {d}"
+                            for d in _differences(metrics.values(node), expected))
+    return native_seconds, radon_seconds, problems, compared
+
+
+def python_files(paths: list) -> list:
+    files = []
+    for target in paths:
+        if os.path.isfile(target):
+            files.append(target)
+        for root, dirs, names in os.walk(target):
+            dirs[:] = sorted(d for d in dirs if d not in ("__pycache__", ".git"))
+            files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith(".py"))
+    return files
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("paths", nargs="*", help="Files or directories (default: 64KB synthetic corpora)")
+    parser.add_argument("--scopes", action="store_true", help="Also compare every function and class")
+    parser.add_argument("--show", type=int, default=20, help="Mismatches printed (default: 20)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="metrics-check-") as tmp:
+        paths = args.paths or [write_corpus(tmp, kind, "64KB") for kind in CORPORA]
+        native = reference = 0.0
+        problems, files, scopes = [], 0, 0
+        for path in python_files(paths):
+            n, r, found, compared = check_file(path, args.scopes)
+            native, reference = native + n, reference + r
+            problems.extend(found)
+            files, scopes = files + 1, scopes + compared
+
+    print(f"files: {files}  scopes: {scopes}  mismatches: {len(problems)}")
+    print(f"native: {native:.3f} s  radon: {reference:.3f} s  speedup: {reference / native if native else 0:.2f}x")
+    for problem in problems[:args.show]:
+        print(f"  {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
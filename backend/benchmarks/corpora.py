@@ -0,0 +1,108 @@
+"""
+Synthetic Python corpora for the benchmarks. Every generator takes a target
+size in bytes and returns valid source of roughly that size, built from one
+repeated shape so timings scale predictably with size.
+"""
+import os
+
+SIZES = {
+    "1KB": 1 << 10,
+    "64KB": 64 << 10,
+    "1MB": 1 << 20,
+    "5MB": 5 << 20,
+}
+
+
+def _fill(target_bytes: int, chunk) -> str:
+    """Concatenates chunk(n) for n = 0, 1, ... until `target_bytes` is reached."""
+    chunks, size, n = [], 0, 0
+    while size < target_bytes:
+        text = chunk(n)
+        chunks.append(text)
+        size += len(text)
+        n += 1
+    return "".join(chunks)
+
+
+def make_source(target_lines: int) -> str:
+    """Builds a module of roughly `target_lines` lines mixing classes and functions."""
+    chunks, n = [], 0
+    while sum(c.count("\n") for c in chunks) < target_lines:
+        chunks.append(mixed_chunk(n))
+        n += 1
+    return "".join(chunks)
+
+
+def mixed_chunk(n: int) -> str:
+    """One class with seven methods plus a module-level helper."""
+    parts = [
+        f"class Service{n}:\n"
+        f"    \"\"\"Synthetic service {n}.\"\"\"\n"
+        f"    def __init__(self, value):\n"
+        f"        self.value = value  # stored\n"
+    ]
+    for m in range(6):
+        parts.append(
+            f"    def method_{m}(self, x, y=1):\n"
+            f"        total = 0\n"
+            f"        for i in range(x):\n"
+            f"            if i % {m + 2} == 0:\n"
+            f"                total += i * y\n"
+            f"            else:\n"
+            f"                total -= self.value\n"
+            f"        return total\n\n"
+        )
+    parts.append(
+        f"def helper_{n}(a, b):\n"
+        f"    return [a + i for i in range(b) if i % 3]\n\n"
+    )
+    return "".join(parts)
+
+
+def deep_nesting_chunk(n: int, depth: int = 16) -> str:
+    """A function whose body is `depth` nested if/else levels inside a nested class."""
+    lines = [f"class Outer{n}:\n", "    class Inner:\n", f"        def deep_{n}(self, x):\n"]
+    for level in range(depth):
+        indent = "    " * (level + 3)
+        lines.append(f"{indent}if x > {level}:\n")
+        lines.append(f"{indent}    x -= {level % 3 + 1}\n")
+    lines.append("    " * (depth + 3) + "return x\n")
+    for level in reversed(range(depth)):
+        indent = "    " * (level + 3)
+        lines.append(f"{indent}else:\n{indent}    x += {level}\n")
+    lines.append("            return x\n\n")
+    return "".join(lines)
+
+
+def tiny_functions_chunk(n: int) -> str:
+    return f"def f_{n}(a):\n    return a + {n}\n\n"
+
+
+def giant_class(target_bytes: int) -> str:
+    """One class that keeps growing methods until the target size."""
+    header = "class Giant:\n    \"\"\"Synthetic god object.\"\"\"\n\n"
+    return header + _fill(
+        target_bytes - len(header),
+        lambda n: (
+            f"    def op_{n}(self, x):\n"
+            f"        y = x * {n % 7 + 1}\n"
+            f"        return y if y % 2 else -y\n\n"
+        ),
+    )
+
+
+CORPORA = {
+    "mixed": lambda size: _fill(size, mixed_chunk),
+    "deep_nesting": lambda size: _fill(size, deep_nesting_chunk),
+    "tiny_functions": lambda size: _fill(size, tiny_functions_chunk),
+    "giant_class": giant_class,
+}
+
+
+def write_corpus(directory: str, kind: str, size_name: str) -> str:
+    """Writes (once) and returns the path of `<kind>_<size>.py` under `directory`."""
+    path = os.path.join(directory, f"{kind}_{size_name}.py")
+    if not os.path.exists(path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(CORPORA[kind](SIZES[size_name]))
+    return path
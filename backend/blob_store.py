@@ -0,0 +1,148 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import namedtuple
+
+from werkzeug.formparser import parse_form_data
+
+from utils.validator import SourceValidator
+
+# Define base directory for backend
+base_dir = os.path.dirname(os.path.abspath(__file__))
+
+BLOB_DIR = os.getenv("BLOB_DIR", os.path.join(base_dir, "uploads", "blobs"))
+# Largest accepted source upload; multipart overhead is allowed on top
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", 2 * 1024 * 1024))
+MULTIPART_OVERHEAD = 64 * 1024
+
+Blob = namedtuple("Blob", ["digest", "path", "size", "existed"])
+
+
+# --------------------------------------------------------------------
+# 🔹 Upload sink: validate, hash and write each chunk exactly once
+# --------------------------------------------------------------------
+class BlobWriter:
+    """
+    File-like target for werkzeug's multipart parser. Each chunk is
+    validated, fed to SHA-256 and written to a temp file in the blob
+    directory, so the digest is ready the moment the upload ends and
+    `commit()` only has to rename the file into place.
+    """
+
+    def __init__(self, store, max_bytes):
+        self.store = store
+        self.validator = SourceValidator(max_bytes)
+        self._hash = hashlib.sha256()
+        os.makedirs(store.tmp_dir, exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=store.tmp_dir, suffix=".part")
+        self._file = os.fdopen(fd, "w+b")
+
+    def write(self, chunk):
+        self.validator.feed(chunk)
+        self._hash.update(chunk)
+        return self._file.write(chunk)
+
+    def seek(self, offset, whence=0):
+        return self._file.seek(offset, whence)
+
+    def tell(self):
+        return self._file.tell()
+
+    def read(self, size=-1):
+        return self._file.read(size)
+
+    def commit(self) -> Blob:
+        self.validator.finish()
+        self._file.close()
+        digest = self._hash.hexdigest()
+        path = self.store.path_for(digest)
+        existed = os.path.exists(path)
+        if existed:
+            os.remove(self.tmp_path)  # identical content is already stored
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(self.tmp_path, path)
+        return Blob(digest, path, self.validator.size, existed)
+
+    def discard(self):
+        if not self._file.closed:
+            self._file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+# --------------------------------------------------------------------
+# 🔹 Content-addressed store of uploaded sources
+# --------------------------------------------------------------------
+class BlobStore:
+    """
+    Keeps each distinct upload once, under its SHA-256. Blobs are never
+    modified after the rename, so analyzers can safely memory-map them and
+    the digest doubles as the result-cache source hash.
+    """
+
+    def __init__(self, root=BLOB_DIR, max_bytes=UPLOAD_MAX_BYTES):
+        self.root = root
+        self.tmp_dir = os.path.join(root, "tmp")
+        self.max_bytes = max_bytes
+
+    def path_for(self, digest: str) -> str:
+        # A letter prefix keeps the module name valid, so pylint does not flag it
+        return os.path.join(self.root, digest[:2], f"blob_{digest}.py")
+
+    def writer(self) -> BlobWriter:
+        return BlobWriter(self, self.max_bytes)
+
+    def read_text(self, digest: str):
+        """Stored source as text, or None if no blob has that digest."""
+        if not digest:
+            return None
+        try:
+            with open(self.path_for(digest), "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def receive(self, environ, field: str = "file"):
+        """
+        Parses a multipart request, streaming every file part through a
+        BlobWriter. Returns (Blob, client filename) for `field`, or None if
+        it is missing or empty. Raises UploadRejected for oversized or
+        binary content, and werkzeug's RequestEntityTooLarge when the
+        declared request size already exceeds the limit.
+        """
+        writers = []
+
+        def stream_factory(total_content_length, content_type, filename, content_length=None):
+            writer = self.writer()
+            writers.append(writer)
+            return writer
+
+        try:
+            _, _, files = parse_form_data(
+                environ, stream_factory=stream_factory,
+                max_content_length=self.max_bytes + MULTIPART_OVERHEAD,
+            )
+            upload = files.get(field)
+            if upload is None or not upload.filename:
+                return None
+            blob = upload.stream.commit()
+            writers.remove(upload.stream)
+            return blob, upload.filename
+        finally:
+            for writer in writers:
+                writer.discard()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    """Returns the process-wide upload blob store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = BlobStore()
+        return _store
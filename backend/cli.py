@@ -0,0 +1,172 @@
+"""
+Command-line entry point for the code smell analyzer.
+
+Run from the backend directory, e.g.
+
+    python cli.py batch path/to/repo --output report.json
+    python cli.py batch project.zip --workers 8
+    python cli.py analyze slow_module.py --profile
+    python cli.py analyze module.py --rules fast   # built-in AST rules instead of pylint
+    python cli.py changed path/to/repo --range origin/main...HEAD --max-long-methods 0
+    python cli.py changed . --staged --hunks          # e.g. from a pre-commit hook
+    python cli.py export-model "Random Forest"
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+from analyzer.batch import BATCH_WORKERS, BatchInputError, analyze_batch
+from analyzer.model_registry import MODEL_FILE_MAP, get_model_registry
+from analyzer.rule_engine import RULE_MODES
+
+
+def _write_report(report: dict, output: str):
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+def cmd_batch(args) -> int:
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            report = analyze_batch(args.target, max_workers=args.workers, use_cache=not args.no_cache,
+                                   rules=args.rules)
+    except (BatchInputError, FileNotFoundError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    if args.summary_only:
+        report = {"summary": report["summary"]}
+    _write_report(report, args.output)
+    return 0
+
+
+def cmd_analyze(args) -> int:
+    from analyzer.profiling import format_top
+    from analyzer.smell_detector import analyze_file
+
+    if not os.path.isfile(args.file):
+        print(f"Error: {args.file} not found", file=sys.stderr)
+        return 2
+    result = analyze_file(args.file, use_cache=not args.no_cache, profile=args.profile, rules=args.rules)
+    if result.get("profile"):
+        print(format_top(result["profile"], args.profile_top), file=sys.stderr)
+    _write_report(result, args.output)
+    return 0
+
+
+def cmd_changed(args) -> int:
+    from analyzer.changes import GitError, analyze_changes
+
+    limits = {
+        "long_methods": args.max_long_methods,
+        "large_classes": args.max_large_classes,
+        "rule_based_issues": args.max_rule_issues,
+        "rule_based_errors": args.max_rule_errors,
+        "duplicates": args.max_duplicates,
+    }
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            report = analyze_changes(
+                args.repo, rev_range=args.range, staged=args.staged, hunks=args.hunks,
+                limits=limits, max_workers=args.workers, use_cache=not args.no_cache,
+                rules=args.rules,
+            )
+    except GitError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    if args.summary_only:
+        report = {"summary": report["summary"], "changes": report["changes"]}
+    _write_report(report, args.output)
+    for violation in report["changes"]["violations"]:
+        print(f"Threshold exceeded: {violation['metric']} = {violation['count']} (limit {violation['limit']})",
+              file=sys.stderr)
+    return 0 if report["changes"]["passed"] else 1
+
+
+def cmd_export_model(args) -> int:
+    import joblib
+    from analyzer.compact_model import compact_path, export_compact, is_exportable
+
+    models_dir = get_model_registry().models_dir
+    status = 0
+    for name in args.models or list(MODEL_FILE_MAP):
+        if name not in MODEL_FILE_MAP:
+            print(f"Error: unknown model '{name}' (choose from {', '.join(MODEL_FILE_MAP)})", file=sys.stderr)
+            status = 2
+            continue
+        model_path = os.path.join(models_dir, MODEL_FILE_MAP[name])
+        if not os.path.exists(model_path):
+            print(f"Skipping {name}: {model_path} not found", file=sys.stderr)
+            continue
+        model = joblib.load(model_path)
+        if not is_exportable(model):
+            print(f"Skipping {name}: only tree models can be exported", file=sys.stderr)
+            continue
+        print(export_compact(model, compact_path(model_path)))
+    return status
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Code smell analyzer")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="Analyze a directory, zip or tarball of Python files")
+    batch.add_argument("target", help="Directory, .zip or .tar(.gz) archive")
+    batch.add_argument("--workers", type=int, default=BATCH_WORKERS, help="Worker processes (default: CPU count)")
+    batch.add_argument("--output", "-o", help="Write the JSON report here instead of stdout")
+    batch.add_argument("--no-cache", action="store_true", help="Ignore and do not fill the result cache")
+    batch.add_argument("--summary-only", action="store_true", help="Only emit the per-repo summary")
+    batch.add_argument("--rules", choices=RULE_MODES, help="Rule tier: fast built-in AST rules or full pylint (default: RULE_MODE)")
+    batch.set_defaults(func=cmd_batch)
+
+    analyze = commands.add_parser("analyze", help="Analyze one Python file and print the JSON result")
+    analyze.add_argument("file", help="Python source file")
+    analyze.add_argument("--output", "-o", help="Write the JSON result here instead of stdout")
+    analyze.add_argument("--no-cache", action="store_true", help="Ignore and do not fill the result cache")
+    analyze.add_argument("--profile", action="store_true", help="Sample the analysis and report the hot functions")
+    analyze.add_argument("--profile-top", type=int, default=15, help="Hot functions printed to stderr (default: 15)")
+    analyze.add_argument("--rules", choices=RULE_MODES, help="Rule tier: fast built-in AST rules or full pylint (default: RULE_MODE)")
+    analyze.set_defaults(func=cmd_analyze)
+
+    changed = commands.add_parser(
+        "changed", help="Analyze only the Python files changed in a git revision range",
+        description="Exit status: 0 within thresholds, 1 thresholds exceeded, 2 git or input error.",
+    )
+    changed.add_argument("repo", nargs="?", default=".", help="Git repository (default: current directory)")
+    changed.add_argument("--range", "-r", help="'A..B' / 'A...B' commit range, or one revision compared "
+                                               "with the working tree (default: HEAD)")
+    changed.add_argument("--staged", action="store_true", help="Analyze the staged (index) changes")
+    changed.add_argument("--hunks", action="store_true", help="Only report smells overlapping changed lines")
+    changed.add_argument("--max-long-methods", type=int, help="Fail above this many long methods")
+    changed.add_argument("--max-large-classes", type=int, help="Fail above this many large classes")
+    changed.add_argument("--max-rule-issues", type=int, help="Fail above this many pylint findings")
+    changed.add_argument("--max-rule-errors", type=int, help="Fail above this many pylint errors")
+    changed.add_argument("--max-duplicates", type=int, help="Fail above this many duplicated functions")
+    changed.add_argument("--workers", type=int, default=BATCH_WORKERS, help="Worker processes (default: CPU count)")
+    changed.add_argument("--output", "-o", help="Write the JSON report here instead of stdout")
+    changed.add_argument("--no-cache", action="store_true", help="Ignore and do not fill the result cache")
+    changed.add_argument("--summary-only", action="store_true", help="Omit the per-file results")
+    changed.add_argument("--rules", choices=RULE_MODES, help="Rule tier: fast built-in AST rules or full pylint (default: RULE_MODE)")
+    changed.set_defaults(func=cmd_changed)
+
+    export = commands.add_parser("export-model", help="Write numpy exports of trained tree models")
+    export.add_argument("models", nargs="*", help="Model names (default: every trained tree model)")
+    export.set_defaults(func=cmd_export_model)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
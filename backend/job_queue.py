@@ -0,0 +1,185 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from analyzer.metrics import REGISTRY, STAGE_ERRORS
+
+# Concurrency and backpressure for background analyses
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", 32))
+# Finished jobs kept in memory for status polling
+JOB_HISTORY = int(os.getenv("JOB_HISTORY", 1000))
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(RuntimeError):
+    """Raised when the job queue cannot accept more work (HTTP 429)."""
+
+
+class Job:
+    """
+    One background analysis. Stage results are appended as events so that
+    pollers and SSE streams can pick up exactly what they have not seen yet.
+    """
+
+    def __init__(self, job_id: str, filename: str):
+        self.id = job_id
+        self.filename = filename
+        self.status = "queued"
+        self.stages = {}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.events = []
+        self._changed = threading.Condition()
+
+    def _emit(self, event: str, data):
+        with self._changed:
+            self.updated_at = time.time()
+            self.events.append({"seq": len(self.events), "event": event, "data": data})
+            self._changed.notify_all()
+
+    def set_status(self, status: str):
+        self.status = status
+        self._emit("status", {"status": status})
+
+    def record_stage(self, name: str, data):
+        """Stage callback passed to analyze_file."""
+        self.stages[name] = data
+        self._emit("stage", {"stage": name, "result": data})
+
+    def finish(self, result: dict):
+        self.result = result
+        self.status = "done"
+        self._emit("done", {"status": "done", "result_id": self.id})
+
+    def fail(self, error: str):
+        self.error = error
+        self.status = "failed"
+        self._emit("failed", {"status": "failed", "error": error})
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def events_after(self, seq: int, timeout: float) -> list:
+        """Blocks up to `timeout` seconds for events with a sequence number > seq."""
+        with self._changed:
+            if len(self.events) <= seq + 1 and not self.finished:
+                self._changed.wait(timeout)
+            return self.events[seq + 1:]
+
+    def to_dict(self, include_result: bool = True) -> dict:
+        data = {
+            "id": self.id,
+            "filename": self.filename,
+            "status": self.status,
+            "stages": self.stages,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+        if self.error:
+            data["error"] = self.error
+        if include_result and self.result is not None:
+            data["result"] = self.result
+        return data
+
+
+# --------------------------------------------------------------------
+# 🔹 In-process job queue with bounded concurrency
+# --------------------------------------------------------------------
+class JobQueue:
+    """
+    Runs analyses on a local thread pool. At most `max_workers` jobs run and
+    `max_pending` wait; `submit` raises QueueFull beyond that so the route
+    can answer 429 instead of piling up work.
+    """
+
+    def __init__(self, max_workers=JOB_WORKERS, max_pending=JOB_MAX_PENDING, history=JOB_HISTORY):
+        self.max_workers = max_workers
+        self.capacity = max_workers + max_pending
+        self.history = history
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis-job")
+        self._jobs = OrderedDict()
+        self._active = 0
+        self._running = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex
+
+    def submit(self, job_id: str, filename: str, fn, *args) -> Job:
+        """Queues fn(job, *args); fn returns the final result dict."""
+        with self._lock:
+            if self._active >= self.capacity:
+                raise QueueFull("Too many analyses in progress")
+            self._active += 1
+            job = Job(job_id, filename)
+            self._jobs[job_id] = job
+            self._trim()
+
+        self._executor.submit(self._run, job, fn, args)
+        return job
+
+    def _run(self, job: Job, fn, args):
+        with self._lock:
+            self._running += 1
+        try:
+            job.set_status("running")
+            job.finish(fn(job, *args))
+        except Exception as e:
+            STAGE_ERRORS.inc(stage="job")
+            logger.exception("Analysis job %s failed", job.id)
+            job.fail(str(e))
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._running -= 1
+
+    def _trim(self):
+        while len(self._jobs) > self.history:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if not oldest.finished:
+                break
+            del self._jobs[oldest_id]
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    @property
+    def depth(self) -> int:
+        """Jobs queued or running."""
+        return self._active
+
+    @property
+    def running(self) -> int:
+        """Jobs currently occupying a worker thread."""
+        return self._running
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Returns the process-wide job queue, registering its gauges on first use."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            queue = _queue = JobQueue()
+            # Gauges read at scrape time
+            REGISTRY.gauge("job_queue_depth", "Analysis jobs queued or running.").set_function(
+                lambda: queue.depth)
+            REGISTRY.gauge("job_workers_busy", "Analysis jobs occupying a worker thread.").set_function(
+                lambda: queue.running)
+            REGISTRY.gauge("job_worker_utilization", "Busy share of the analysis worker threads (0-1).").set_function(
+                lambda: queue.running / queue.max_workers if queue.max_workers else 0.0)
+        return _queue
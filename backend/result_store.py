@@ -0,0 +1,246 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+# Define base directory for backend
+base_dir = os.path.dirname(os.path.abspath(__file__))
+
+RESULT_DB_PATH = os.getenv("RESULT_DB_PATH", os.path.join(base_dir, "results", "results.db"))
+# Where the original app kept `<id>.json` results and their uploaded sources
+LEGACY_RESULTS_DIR = os.getenv("LEGACY_RESULTS_DIR", os.path.join(base_dir, "results"))
+LEGACY_UPLOAD_DIR = os.getenv("LEGACY_UPLOAD_DIR", os.path.join(base_dir, "uploads"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id          TEXT PRIMARY KEY,
+    filename    TEXT NOT NULL,
+    source_hash TEXT,
+    created_at  REAL NOT NULL,
+    status      TEXT,
+    smell_count INTEGER,
+    result      BLOB NOT NULL,
+    source      BLOB
+);
+CREATE INDEX IF NOT EXISTS analyses_filename ON analyses (filename, created_at);
+CREATE INDEX IF NOT EXISTS analyses_source_hash ON analyses (source_hash);
+
+CREATE TABLE IF NOT EXISTS smells (
+    analysis_id TEXT NOT NULL REFERENCES analyses (id) ON DELETE CASCADE,
+    filename    TEXT NOT NULL,
+    kind        TEXT NOT NULL,
+    name        TEXT,
+    category    TEXT,
+    start_line  INTEGER,
+    end_line    INTEGER,
+    length      INTEGER
+);
+CREATE INDEX IF NOT EXISTS smells_kind_length ON smells (kind, length DESC);
+CREATE INDEX IF NOT EXISTS smells_filename ON smells (filename, kind);
+CREATE INDEX IF NOT EXISTS smells_analysis ON smells (analysis_id);
+"""
+
+# Smell kinds stored as rows, in the order the results page lists them
+SMELL_KINDS = ("long_method", "large_class", "pylint", "ml", "duplicate")
+
+# Files in the legacy results directory that are not analysis results
+LEGACY_NON_RESULTS = {"training_metrics"}
+# Keys every legacy analysis result has
+LEGACY_RESULT_KEYS = {"long_methods", "rule_based"}
+
+
+def pack(value) -> bytes:
+    """Compact JSON, zlib-compressed."""
+    return zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def unpack(blob: bytes):
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def smell_rows(result: dict) -> list:
+    """(kind, name, category, start, end, length) for every smell in an analysis result."""
+    rows = []
+    for item in result.get("long_methods", []):
+        rows.append(("long_method", item.get("function"), "Long Method",
+                     item.get("start"), item.get("end"), item.get("length")))
+    for item in result.get("large_classes", []):
+        rows.append(("large_class", item.get("class"), "Large Class",
+                     item.get("start"), item.get("end"), item.get("lines")))
+    for item in result.get("rule_based", []):
+        if isinstance(item, dict) and isinstance(item.get("line"), int):
+            rows.append(("pylint", item.get("type"), item.get("category"), item["line"], item["line"], 1))
+    for model_name, prediction in result.get("ml_result", {}).get("predictions", {}).items():
+        if isinstance(prediction, dict) and prediction.get("prediction"):
+            rows.append(("ml", prediction["prediction"], model_name, None, None, None))
+    for item in result.get("duplicates", []):
+        rows.append(("duplicate", item.get("function"), "Duplicate Code",
+                     item.get("start"), item.get("end"), item["end"] - item["start"] + 1))
+    return rows
+
+
+# --------------------------------------------------------------------
+# 🔹 SQLite (WAL) store of analysis results
+# --------------------------------------------------------------------
+class ResultStore:
+    """
+    Keeps every analysis by id: the full result and uploaded source as
+    compressed blobs, plus one indexed row per smell for history and
+    aggregate queries. WAL mode lets readers run while a job is writing;
+    each thread gets its own connection.
+    """
+
+    def __init__(self, path=RESULT_DB_PATH, legacy_dir=None, legacy_upload_dir=None):
+        self.path = path
+        # Directory of pre-store `<id>.json` files that `get` still falls back to,
+        # and the uploads directory holding their sources as `<id>`
+        self.legacy_dir = legacy_dir
+        self.legacy_upload_dir = legacy_upload_dir
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        with self._init_lock:
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.executescript(SCHEMA)
+                self._initialized = True
+        conn.execute("PRAGMA synchronous = NORMAL")
+        self._local.conn = conn
+        return conn
+
+    def put(self, result_id: str, filename: str, result: dict, source: str = None,
+            source_hash: str = None, created_at: float = None):
+        """Stores (or replaces) one analysis and its smell rows in a single transaction."""
+        summary = result.get("summary", {})
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM analyses WHERE id = ?", (result_id,))
+            conn.execute(
+                "INSERT INTO analyses (id, filename, source_hash, created_at, status, smell_count, result, source)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (result_id, filename, source_hash, created_at or time.time(),
+                 summary.get("status"), summary.get("smell_count"), pack(result),
+                 zlib.compress(source.encode("utf-8"), 6) if source is not None else None),
+            )
+            conn.executemany(
+                "INSERT INTO smells (analysis_id, filename, kind, name, category, start_line, end_line, length)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(result_id, filename, *row) for row in smell_rows(result)],
+            )
+
+    def get(self, result_id: str):
+        """
+        Returns {"id", "filename", "created_at", "source_hash", "result",
+        "source"} or None. Falls back to a legacy JSON result file.
+        """
+        row = self._connect().execute(
+            "SELECT id, filename, created_at, source_hash, result, source FROM analyses WHERE id = ?",
+            (result_id,),
+        ).fetchone()
+        if row is None:
+            return self._get_legacy(result_id)
+        return {
+            "id": row["id"],
+            "filename": row["filename"],
+            "created_at": row["created_at"],
+            "source_hash": row["source_hash"],
+            "result": unpack(row["result"]),
+            "source": zlib.decompress(row["source"]).decode("utf-8") if row["source"] is not None else None,
+        }
+
+    def _get_legacy(self, result_id: str):
+        """
+        Reads `<legacy_dir>/<id>.json`. The original format was keyed by the
+        upload name and kept the source as `<legacy_upload_dir>/<id>`; later
+        files record the source's `upload_path` (and `filename`) themselves.
+        """
+        name = os.path.basename(result_id)
+        if not self.legacy_dir or name in LEGACY_NON_RESULTS:
+            return None
+        path = os.path.join(self.legacy_dir, f"{name}.json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if not isinstance(data, dict) or not LEGACY_RESULT_KEYS <= data.keys():
+            return None
+
+        source = None
+        upload_path = data.pop("upload_path", None)
+        if upload_path is None and self.legacy_upload_dir:
+            upload_path = os.path.join(self.legacy_upload_dir, name)
+        if upload_path:
+            try:
+                with open(upload_path, "r", encoding="utf-8") as f:
+                    source = f.read()
+            except OSError:
+                pass
+        return {
+            "id": result_id,
+            "filename": data.pop("filename", name),
+            "created_at": os.path.getmtime(path),
+            "source_hash": None,
+            "result": data,
+            "source": source,
+        }
+
+    def history(self, filename: str, limit: int = 20) -> list:
+        """Most recent analyses of one upload name, newest first."""
+        rows = self._connect().execute(
+            "SELECT id, created_at, source_hash, status, smell_count FROM analyses"
+            " WHERE filename = ? ORDER BY created_at DESC LIMIT ?",
+            (filename, limit),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def top_smells(self, kind: str = "long_method", limit: int = 50) -> list:
+        """Largest smells of one kind across all analyses, e.g. the 50 longest methods."""
+        rows = self._connect().execute(
+            "SELECT s.analysis_id, s.filename, s.name, s.category, s.start_line, s.end_line, s.length,"
+            " a.created_at FROM smells s JOIN analyses a ON a.id = s.analysis_id"
+            " WHERE s.kind = ? ORDER BY s.length DESC LIMIT ?",
+            (kind, limit),
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def smell_counts(self, filename: str = None) -> dict:
+        """Number of smell rows per kind, across all analyses or for one upload name."""
+        query = "SELECT kind, COUNT(*) AS n FROM smells"
+        params = ()
+        if filename:
+            query += " WHERE filename = ?"
+            params = (filename,)
+        rows = self._connect().execute(query + " GROUP BY kind", params).fetchall()
+        return {row["kind"]: row["n"] for row in rows}
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_result_store(legacy_dir=LEGACY_RESULTS_DIR, legacy_upload_dir=LEGACY_UPLOAD_DIR) -> ResultStore:
+    """Returns the process-wide result store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultStore(legacy_dir=legacy_dir, legacy_upload_dir=legacy_upload_dir)
+        return _store
@@ -0,0 +1,18 @@
+import os
+import tempfile
+
+# Stores are configured from the environment at import time, so point them
+# at a scratch directory before any test imports the analyzer
+_scratch = tempfile.mkdtemp(prefix="smell-tests-")
+for _name, _path in {
+    "RESULT_CACHE_DIR": "cache/results",
+    "RESULT_DB_PATH": "results/results.db",
+    "DUPLICATE_DB_PATH": "results/duplicates.db",
+    "BLOB_DIR": "uploads/blobs",
+    "AI_CACHE_DIR": "cache/ai",
+}.items():
+    os.environ.setdefault(_name, os.path.join(_scratch, _path))
+
+# The AI routes answer from the local fake model, without rate limiting
+os.environ["AI_BACKEND"] = "fake"
+os.environ["AI_RATE_LIMIT"] = "0"
@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pytest
+
+import ai_cache
+import ai_routes
+from ai_cache import AIResponseCache
+from app import app
+
+CODE = "def add(a, b):\n    return a + b\n"
+
+
+@pytest.fixture
+def ai(tmp_path, monkeypatch):
+    """Fresh response cache and model clients; returns a factory for the cache TTL."""
+    monkeypatch.setattr(ai_routes, "_models", {})
+
+    def use_ttl(ttl):
+        monkeypatch.setattr(ai_cache, "_cache", AIResponseCache(str(tmp_path / "ai"), ttl=ttl))
+
+    use_ttl(3600)
+    return use_ttl
+
+
+def _explain(code=CODE):
+    response = app.test_client().post("/api/explain", json={"code": code})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_repeated_prompt_is_answered_from_cache(ai):
+    first, second = _explain(), _explain("\r\n" + CODE.replace("\n", "  \r\n"))
+    assert (first["cached"], second["cached"]) == (False, True)
+    assert second["result"] == first["result"]
+    assert ai_routes.get_model().calls == 1
+
+
+def test_concurrent_identical_prompts_share_one_call(ai, monkeypatch):
+    monkeypatch.setattr(ai_routes, "AI_FAKE_LATENCY", 0.3)
+    start = threading.Barrier(8)
+    answers = []
+
+    def request():
+        start.wait()
+        answers.append(_explain()["result"])
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(answers) == 8 and len(set(answers)) == 1
+    assert ai_routes.get_model().calls == 1
+
+
+def test_expired_answer_is_requested_again(ai):
+    ai(0.2)
+    _explain()
+    assert _explain()["cached"] is True
+    time.sleep(0.3)
+    assert _explain()["cached"] is False
+    assert ai_routes.get_model().calls == 2
+
+
+def test_one_client_serves_every_request(ai):
+    _explain()
+    client = ai_routes.get_model()
+    _explain(CODE + "\nprint(add(1, 2))\n")
+    app.test_client().post("/api/optimize", json={"code": CODE})
+
+    assert ai_routes.get_model() is client
+    assert list(ai_routes._models) == [ai_routes.GEMINI_MODEL]
+    assert client.calls == 3
@@ -0,0 +1,111 @@
+import json
+
+import pytest
+
+import ai_cache
+import ai_routes
+from ai_cache import AIResponseCache
+from app import app
+from result_store import get_result_store
+
+CODE = "def add(a, b):\n    return a + b\n"
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.acquired = 0
+
+    def acquire(self):
+        self.acquired += 1
+
+
+@pytest.fixture
+def ai(tmp_path, monkeypatch):
+    """Fresh response cache, model clients and a limiter that counts its tokens."""
+    monkeypatch.setattr(ai_routes, "_models", {})
+    monkeypatch.setattr(ai_cache, "_cache", AIResponseCache(str(tmp_path / "ai"), ttl=3600))
+    limiter = CountingLimiter()
+    monkeypatch.setattr(ai_routes, "_rate_limiter", limiter)
+    return limiter
+
+
+def _events(response) -> list:
+    """(event, data) pairs of a server-sent event stream."""
+    events = []
+    for block in response.get_data(as_text=True).split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_only_batch_fan_out_is_rate_limited(ai):
+    client = app.test_client()
+    client.post("/api/explain", json={"code": CODE})
+    _events(client.post("/api/optimize/stream", json={"code": CODE + "\nx = 1\n"}))
+    assert ai.acquired == 0
+
+    snippets = [{"code": CODE}, {"code": CODE + "\ny = 2\n"}]
+    _events(client.post("/api/refactor-batch", json={"snippets": snippets}))
+    assert ai.acquired == 2
+
+
+def test_stream_sends_chunks_then_caches_the_answer(ai):
+    client = app.test_client()
+    first = _events(client.post("/api/explain/stream", json={"code": CODE}))
+    chunks = [data["text"] for event, data in first if event == "chunk"]
+    assert len(chunks) > 1
+    assert first[-1] == ("done", {"type": "explain", "result": "".join(chunks).strip(), "cached": False})
+
+    second = _events(client.post("/api/explain/stream", json={"code": CODE}))
+    assert second == [("chunk", {"text": first[-1][1]["result"]}),
+                      ("done", {**first[-1][1], "cached": True})]
+    assert ai_routes.get_model().calls == 1
+
+
+def test_stream_rejects_unknown_endpoints_and_empty_code(ai):
+    client = app.test_client()
+    assert client.post("/api/summarize/stream", json={"code": CODE}).status_code == 404
+    assert client.post("/api/refactor/stream", json={"code": "  \n"}).status_code == 400
+
+
+def test_refactor_batch_streams_one_fix_per_snippet(ai):
+    snippets = [{"code": CODE, "smell_type": "Long Method", "name": "add", "start": 1},
+                {"code": CODE.replace("add", "plus"), "name": "plus", "start": 4}]
+    events = _events(app.test_client().post("/api/refactor-batch", json={"snippets": snippets}))
+
+    assert events[0] == ("start", {"count": 2})
+    assert events[-1] == ("done", {"count": 2})
+    fixes = sorted((data for event, data in events if event == "fix"), key=lambda data: data["index"])
+    assert [(fix["name"], fix["start"], fix["smell_type"]) for fix in fixes] == [
+        ("add", 1, "Long Method"), ("plus", 4, None)]
+    assert all(fix["result"] and not fix["cached"] for fix in fixes)
+    assert ai_routes.get_model().calls == 2
+
+
+def test_refactor_batch_reads_snippets_of_a_stored_result(ai):
+    result = {"long_methods": [{"function": "add", "start": 1, "code_snippet": CODE}],
+              "large_classes": [{"class": "Empty", "start": 9, "code_snippet": ""}],
+              "summary": {}}
+    get_result_store().put("batch-source", "add.py", result, source=CODE)
+
+    events = _events(app.test_client().post("/api/refactor-batch", json={"result_id": "batch-source"}))
+    assert events[0] == ("start", {"count": 1})
+    assert [data["name"] for event, data in events if event == "fix"] == ["add"]
+
+
+@pytest.mark.parametrize("payload, status", [
+    ({"snippets": ["def f(): pass"]}, 400),
+    ({"snippets": [{"code": CODE}, {"name": "missing"}]}, 400),
+    ({"snippets": [{"code": "   "}]}, 400),
+    ({"snippets": [{"code": 42}]}, 400),
+    ({"snippets": {"code": CODE}}, 400),
+    ({"snippets": []}, 400),
+    ({"result_id": "no-such-result"}, 404),
+], ids=["string-item", "item-without-code", "blank-code", "non-string-code", "not-a-list", "empty",
+        "unknown-result"])
+def test_refactor_batch_rejects_bad_input(ai, payload, status):
+    response = app.test_client().post("/api/refactor-batch", json=payload)
+    assert response.status_code == status
+    assert response.get_json()["success"] is False
+    assert ai_routes.get_model().calls == 0
@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What a spawn-started worker does with the server's main module
+REIMPORT_AS_WORKER = """
+import runpy, threading
+import blob_store, job_queue, result_store
+before = {t.name for t in threading.enumerate()}
+runpy.run_path("app.py", run_name="__mp_main__")
+print(job_queue._queue, result_store._store, blob_store._store)
+print(sorted({t.name for t in threading.enumerate()} - before))
+"""
+
+
+def test_worker_reimport_has_no_side_effects():
+    env = {**os.environ, "AI_BACKEND": "gemini", "GEMINI_API_KEY": "", "APP_WARMUP": "1", "LOG_LEVEL": "INFO"}
+    done = subprocess.run([sys.executable, "-c", REIMPORT_AS_WORKER], cwd=BACKEND, env=env,
+                          capture_output=True, text=True, timeout=60, check=True)
+    assert done.stdout.splitlines() == ["None None None", "[]"]
+    assert "Gemini API key not found" not in done.stderr
+    assert "Warm-up" not in done.stderr
@@ -0,0 +1,104 @@
+import io
+import time
+import zipfile
+
+import pytest
+
+from analyzer import batch
+from analyzer.batch import BatchInputError, analyze_batch, collect_sources
+import app as app_module
+from app import app
+from job_queue import get_job_queue
+
+
+def _zip(members: dict) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, text in members.items():
+            archive.writestr(name, text)
+    buffer.seek(0)
+    return buffer
+
+
+def _wait(job_id: str):
+    job = get_job_queue().get(job_id)
+    deadline = time.monotonic() + 60
+    while not job.finished and time.monotonic() < deadline:
+        job.events_after(len(job.events) - 1, timeout=1)
+    return job
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def test_uploaded_archive_is_analyzed_as_a_job(client):
+    archive = _zip({"pkg/util.py": "def double(x):\n    return 2 * x\n"})
+    response = client.post("/api/analyze-batch", data={"file": (archive, "repo.zip"), "rules": "fast"})
+    assert response.status_code == 202
+    body = response.get_json()
+    assert body["status_url"] == f"/api/jobs/{body['job_id']}"
+
+    job = _wait(body["job_id"])
+    assert job.status == "done", job.error
+    assert list(job.result["files"]) == ["pkg/util.py"]
+    assert job.result["summary"]["files_analyzed"] == 1
+
+
+def test_oversized_upload_is_refused_before_it_is_saved(client, monkeypatch):
+    monkeypatch.setattr(app_module, "BATCH_MAX_BYTES", 1024)
+    monkeypatch.setattr(app_module, "_receive_archive", lambda archive: pytest.fail("archive was saved"))
+    response = client.post("/api/analyze-batch", data={"file": (io.BytesIO(b"x" * 4096), "big.zip")})
+    assert response.status_code == 413
+    assert response.get_json()["success"] is False
+
+
+def test_invalid_archive_fails_its_job(client):
+    response = client.post("/api/analyze-batch", data={"file": (io.BytesIO(b"not an archive"), "notes.zip")})
+    assert response.status_code == 202
+    job = _wait(response.get_json()["job_id"])
+    assert job.status == "failed"
+    assert "archive" in job.error
+
+
+def test_archive_members_outside_the_workdir_are_refused(tmp_path):
+    path = tmp_path / "slip.zip"
+    path.write_bytes(_zip({"pkg/ok.py": "x = 1\n", "../escape.py": "x = 2\n"}).getvalue())
+    with pytest.raises(BatchInputError, match="Unsafe path"):
+        collect_sources(str(path), str(tmp_path / "work"))
+    assert not (tmp_path / "escape.py").exists()
+
+
+@pytest.mark.parametrize("limit, value", [("BATCH_MAX_FILES", 2), ("BATCH_MAX_BYTES", 20)])
+def test_archive_over_the_limits_is_refused(tmp_path, monkeypatch, limit, value):
+    monkeypatch.setattr(batch, limit, value)
+    path = tmp_path / "big.zip"
+    path.write_bytes(_zip({f"m{i}.py": "value = 12345\n" for i in range(3)}).getvalue())
+    with pytest.raises(BatchInputError, match="limits"):
+        collect_sources(str(path), str(tmp_path / "work"))
+
+
+def test_directory_summary(tmp_path):
+    long_body = "".join(f"    total += {i}\n" for i in range(40))
+    sources = {
+        "clean.py": '"""Clean."""\n\n\ndef double(x):\n    """Double."""\n    return 2 * x\n',
+        "pkg/long.py": f"def accumulate():\n    total = 0\n{long_body}    return total\n",
+        "pkg/unused.py": "import os\n\n\ndef name():\n    value = 1\n    return 'x'\n",
+        "notes.txt": "not python\n",
+    }
+    for name, text in sources.items():
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text(text)
+
+    report = analyze_batch(str(tmp_path), max_workers=1, use_cache=False, namespace="summary-test", rules="fast")
+    assert list(report["files"]) == ["clean.py", "pkg/long.py", "pkg/unused.py"]
+    summary = report["summary"]
+    assert summary["files_analyzed"] == 3
+    assert summary["cache_hits"] == 0
+    assert summary["long_methods"] == 1
+    assert summary["large_classes"] == 0
+    assert summary["top_rule_types"] == {"unused-import": 1, "unused-variable": 1}
+    assert summary["rule_based_issues"] == 2
+    assert sum(summary["status_counts"].values()) == 3
+    assert summary["status_counts"]["Smells Detected"] == 1
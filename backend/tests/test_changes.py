@@ -0,0 +1,47 @@
+import subprocess
+
+import pytest
+
+from analyzer.changes import analyze_changes
+
+HELPERS = "def scale(value, factor=2):\n    return value * factor\n"
+MAIN = "from pkg.helpers import scale\n\n\ndef run(values):\n    return [scale(v) for v in values]\n"
+
+
+def _git(repo, *args):
+    subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "helpers.py").write_text(HELPERS)
+    (tmp_path / "pkg" / "main.py").write_text(MAIN)
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "-c", "user.name=t", "-c", "user.email=t@example.com", "commit", "-qm", "initial")
+    (tmp_path / "pkg" / "main.py").write_text(MAIN + "\n\ndef total(values):\n    return sum(run(values))\n")
+    return tmp_path
+
+
+def _import_errors(report):
+    return [issue for result in report["files"].values() for issue in result["rule_based"]
+            if issue.get("type") in ("import-error", "no-name-in-module")]
+
+
+@pytest.mark.parametrize("mode", ["range", "staged"])
+def test_unchanged_sibling_modules_resolve(repo, mode):
+    if mode == "range":
+        _git(repo, "-c", "user.name=t", "-c", "user.email=t@example.com", "commit", "-qam", "total")
+        options = {"rev_range": "HEAD~1..HEAD"}
+    else:
+        _git(repo, "add", "pkg/main.py")
+        options = {"staged": True}
+
+    report = analyze_changes(str(repo), max_workers=1, use_cache=False, rules="full", **options)
+
+    assert report["changes"]["changed_files"] == ["pkg/main.py"]
+    assert list(report["files"]) == ["pkg/main.py"]
+    assert _import_errors(report) == []
+    assert report["changes"]["counts"]["rule_based_errors"] == 0
@@ -0,0 +1,98 @@
+import ast
+import glob
+import os
+
+import pytest
+
+from analyzer.code_metrics import SCOPE_TYPES, measure, measure_scopes
+from analyzer.parsed_source import ParsedSource
+from benchmarks.check_metrics import check_file
+from benchmarks.corpora import CORPORA, write_corpus
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EDGE_CASES = '''
+"""Module docstring
+spanning lines."""
+import asyncio  # trailing comment
+
+# standalone comment
+X = """not a docstring
+# not a comment
+"""
+
+
+class Shape:
+    """Class docstring."""
+
+    def area(self):
+        return 0
+
+    @property
+    def kind(self):
+        return type(self).__name__
+
+
+async def gather(items, limit=None):
+    async with asyncio.timeout(limit):
+        async for item in items:
+            if item and not item.done or limit is None:
+                yield [x async for x in item if x]
+            elif item:
+                continue
+            else:
+                break
+
+
+def classify(value):
+    try:
+        result = value / 2 if value else -value
+    except (ZeroDivisionError, TypeError) as e:
+        raise ValueError(e) from e
+    else:
+        while result > 10:
+            result //= 2
+        else:
+            result += 1
+    finally:
+        pass
+    match value:
+        case {"kind": kind, **rest} if kind:
+            return kind, rest
+        case [first, *_] | (first,):
+            return first
+        case _:
+            return lambda y=result: y ** 2 if y else None
+'''
+
+
+@pytest.mark.parametrize("kind", sorted(CORPORA))
+def test_matches_radon_on_corpora(tmp_path, kind):
+    _, _, problems, scopes = check_file(write_corpus(str(tmp_path), kind, "64KB"), scopes=True)
+    assert problems == []
+    assert scopes > 0
+
+
+def test_matches_radon_on_edge_cases(tmp_path):
+    path = tmp_path / "edge_cases.py"
+    path.write_text(EDGE_CASES)
+    _, _, problems, scopes = check_file(str(path), scopes=True)
+    assert problems == []
+    assert scopes == 5
+
+
+@pytest.mark.parametrize("path", sorted(glob.glob(os.path.join(BACKEND, "analyzer", "*.py"))),
+                         ids=os.path.basename)
+def test_matches_radon_on_analyzer_sources(path):
+    _, _, problems, _ = check_file(path, scopes=True)
+    assert problems == []
+
+
+@pytest.mark.parametrize("path", sorted(glob.glob(os.path.join(BACKEND, "analyzer", "*.py"))),
+                         ids=os.path.basename)
+def test_scopes_measured_alone_match_the_file_pass(path):
+    parsed = ParsedSource.from_path(path)
+    nodes = [node for node in ast.walk(parsed.tree) if isinstance(node, SCOPE_TYPES)]
+    whole, alone = measure(parsed), measure_scopes(parsed, nodes)
+    assert [alone.values(node) for node in nodes] == [whole.values(node) for node in nodes]
+    assert all(measure_scopes(parsed, [node]).values(node) == whole.values(node) for node in nodes[::5])
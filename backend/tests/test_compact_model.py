@@ -0,0 +1,54 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from analyzer.compact_model import CompactForest, compact_path, export_compact
+from analyzer.feature_schema import FEATURE_COLUMNS
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def training_data():
+    """The feature matrix and labels train_model fits on, prepared the same way."""
+    df = pd.read_csv(os.path.join(BACKEND, "dataset", "merged_dataset.csv"))
+    X = df.reindex(columns=FEATURE_COLUMNS).fillna(0).to_numpy(dtype=np.float32)
+    return X, df["smell_type"].astype("category").cat.codes.to_numpy()
+
+
+def _assert_parity(model, compact, X):
+    np.testing.assert_allclose(compact.predict_proba(X), model.predict_proba(X), atol=1e-12)
+    np.testing.assert_array_equal(compact.predict(X), model.predict(X))
+
+
+@pytest.mark.parametrize("model", [
+    DecisionTreeClassifier(random_state=0),
+    DecisionTreeClassifier(max_depth=4, random_state=0),
+    RandomForestClassifier(n_estimators=25, random_state=0),
+    RandomForestClassifier(n_estimators=25, max_depth=6, min_samples_leaf=3, random_state=0),
+], ids=["tree", "shallow-tree", "forest", "regularized-forest"])
+def test_export_matches_sklearn_on_training_matrix(tmp_path, training_data, model):
+    X, y = training_data
+    model.fit(X, y)
+    compact = CompactForest.load(export_compact(model, str(tmp_path / "model.npz")))
+    _assert_parity(model, compact, X)
+    # One row at a time, as single-file analyses call it
+    _assert_parity(model, compact, X[:1])
+
+
+@pytest.mark.parametrize("name", ["decision_tree_model.pkl", "random_forest_model.pkl"])
+def test_shipped_exports_match_their_pickles(training_data, name):
+    path = os.path.join(BACKEND, "models", name)
+    model = joblib.load(path)
+    X, _ = training_data
+    _assert_parity(model, CompactForest.load(compact_path(path)), X)
+
+
+def test_non_tree_models_are_refused(tmp_path):
+    with pytest.raises(TypeError):
+        export_compact(object(), str(tmp_path / "model.npz"))
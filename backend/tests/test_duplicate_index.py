@@ -0,0 +1,79 @@
+import pytest
+
+from analyzer.duplicates import DuplicateIndex, find_duplicates_many
+from analyzer.parsed_source import ParsedSource
+
+FUNCTION = '''
+def normalize_records(records, defaults):
+    cleaned = []
+    for record in records:
+        item = dict(defaults)
+        for key, value in record.items():
+            if value is None:
+                continue
+            if isinstance(value, str):
+                value = value.strip().lower()
+            item[key] = value
+        if item.get("id") and item.get("name"):
+            cleaned.append(item)
+    cleaned.sort(key=lambda r: (r["name"], r["id"]))
+    return cleaned
+'''
+
+
+@pytest.fixture
+def make_index(tmp_path):
+    indexes = []
+
+    def make(**limits):
+        index = DuplicateIndex(str(tmp_path / "duplicates.db"), **limits)
+        indexes.append(index)
+        return index
+
+    yield make
+    for index in indexes:
+        index.close()
+
+
+def _index(index, *documents):
+    entries = []
+    for document in documents:
+        parsed = ParsedSource.from_text(f"NAME = {document!r}\n" + FUNCTION)
+        entries.append((document, parsed, parsed.digest, None))
+    return find_duplicates_many(entries, index)
+
+
+def _documents(index) -> list:
+    return sorted(row["document"] for row in index._connect().execute("SELECT document FROM documents"))
+
+
+def test_only_the_newest_documents_are_kept(make_index):
+    index = make_index(max_documents=2, max_age_days=0)
+    _index(index, "a.py")
+    _index(index, "b.py")
+    found = _index(index, "c.py")
+
+    # The limit is applied after the lookup, so c.py was still compared with a.py
+    assert sorted(m["document"] for m in found["c.py"][0]["matches"]) == ["a.py", "b.py"]
+    assert _documents(index) == ["b.py", "c.py"]
+    assert index.stats() == {"documents": 2, "fragments": 2}
+    orphans = index._connect().execute(
+        "SELECT COUNT(*) FROM buckets WHERE fragment_id NOT IN (SELECT id FROM fragments)").fetchone()[0]
+    assert orphans == 0
+
+
+def test_documents_past_the_age_limit_are_dropped(make_index):
+    index = make_index(max_documents=0, max_age_days=30)
+    _index(index, "old.py", "recent.py")
+    with index._connect() as conn:
+        conn.execute("UPDATE documents SET indexed_at = indexed_at - 31 * 86400 WHERE document = 'old.py'")
+
+    _index(index, "new.py")
+    assert _documents(index) == ["new.py", "recent.py"]
+
+
+def test_no_limits_keep_everything(make_index):
+    index = make_index(max_documents=0, max_age_days=0)
+    _index(index, "a.py", "b.py", "c.py")
+    assert index.prune() == 0
+    assert index.stats()["documents"] == 3
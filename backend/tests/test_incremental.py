@@ -0,0 +1,89 @@
+import textwrap
+
+from analyzer import incremental
+from analyzer.incremental import ScopeStore, analyze_scopes
+from analyzer.parsed_source import ParsedSource
+
+THRESHOLDS = {"long_method_lines": 100, "large_class_lines": 1000, "large_class_methods": 4}
+
+FLAT = textwrap.dedent("""
+    class Service:
+        def m0(self):
+            return 0
+        def m1(self):
+            return 1
+        def m2(self):
+            return 2
+        def m3(self):
+            return 3
+        def m4(self):
+            return 4
+""")
+
+# The same lines, with m1-m4 nested into m0
+NESTED = textwrap.dedent("""
+    class Service:
+        def m0(self):
+            return 0
+            def m1(self):
+                return 1
+            def m2(self):
+                return 2
+            def m3(self):
+                return 3
+            def m4(self):
+                return 4
+""")
+
+
+def _analyze(text, store, document_id="service.py"):
+    return analyze_scopes(ParsedSource.from_text(text), THRESHOLDS, document_id=document_id, store=store)
+
+
+def test_reindented_body_is_not_reused():
+    store = ScopeStore()
+    first = _analyze(FLAT, store)
+    assert [c["num_methods"] for c in first["large_classes"]] == [5]
+
+    second = _analyze(NESTED, store)
+    assert second["large_classes"] == _analyze(NESTED, ScopeStore())["large_classes"] == []
+
+
+def test_moved_scope_is_reused():
+    store = ScopeStore()
+    _analyze(FLAT, store)
+    moved = _analyze("import os\n\n" + FLAT, store)
+    assert moved["stats"]["reused"] == moved["stats"]["scopes"]
+    assert [c["start"] for c in moved["large_classes"]] == [4]
+
+
+def test_comment_and_spacing_edits_are_reused():
+    store = ScopeStore()
+    commented = FLAT.replace("return 1", "return 1  # one")
+    _analyze(commented, store)
+    edited = commented.replace("# one", "# the first").replace("return 2", "return  (2)")
+    assert _analyze(edited, store)["stats"]["reused"] == 6
+
+
+def test_only_changed_scopes_are_measured(monkeypatch):
+    store = ScopeStore()
+    _analyze(FLAT, store)
+
+    measured = []
+    real = incremental.measure_scopes
+
+    def spy(parsed, nodes):
+        measured.extend(node.name for node in nodes)
+        return real(parsed, nodes)
+
+    monkeypatch.setattr(incremental, "measure_scopes", spy)
+    text = FLAT.replace("return 3", "return 3 + 3")
+    edited = ParsedSource.from_text(text)
+    result = analyze_scopes(edited, THRESHOLDS, document_id="service.py", store=store)
+    assert result["stats"] == {"scopes": 6, "reused": 4, "analyzed": 2}
+    assert sorted(measured) == ["Service", "m3"]
+    # The whole file was never measured
+    assert "code_metrics" not in edited._derived
+
+    fresh = analyze_scopes(ParsedSource.from_text(text), THRESHOLDS)
+    assert result["large_classes"] == fresh["large_classes"]
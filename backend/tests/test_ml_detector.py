@@ -0,0 +1,26 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.tree import DecisionTreeClassifier
+
+from analyzer import ml_detector
+from analyzer.feature_schema import FEATURE_COLUMNS
+from analyzer.model_registry import ModelBundle
+
+MESSAGE = "X does not have valid feature names"
+
+
+def test_feature_name_warning_is_only_silenced_around_predictions():
+    assert not [f for f in warnings.filters if f[1] is not None and f[1].match(MESSAGE)]
+
+    frame = pd.DataFrame(np.arange(2 * len(FEATURE_COLUMNS)).reshape(2, -1), columns=FEATURE_COLUMNS)
+    model = DecisionTreeClassifier().fit(frame, [0, 1])
+    bundle = ModelBundle("test", {}, model=model, feature_columns=FEATURE_COLUMNS)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        assert ml_detector._predict_rows(bundle, frame.to_numpy(dtype=np.float32)) == [0, 1]
+        assert not [w for w in caught if MESSAGE in str(w.message)]
+
+        model.predict(frame.to_numpy())
+        assert [w for w in caught if MESSAGE in str(w.message)]
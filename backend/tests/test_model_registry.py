@@ -0,0 +1,46 @@
+import pytest
+
+from analyzer.model_registry import select_model
+
+ACCURACIES = {"Accurate": 90.0, "Fast": 89.5, "Tiny": 80.0}
+METRICS = {
+    "Accurate": {"predict_us_single": 100.0, "model_bytes": 1000},
+    "Fast": {"predict_us_single": 10.0, "model_bytes": 5000,
+             "compact_predict_us_single": 200.0, "compact_bytes": 100},
+    "Tiny": {"predict_us_single": 1.0, "model_bytes": 10},
+}
+
+
+def _select(**budget):
+    budget = {"max_latency_us": 0, "max_bytes": 0, "tolerance": 1.0, "compact": False, **budget}
+    return select_model(ACCURACIES, METRICS, **budget)
+
+
+@pytest.mark.parametrize("budget, expected", [
+    ({}, "Fast"),
+    ({"tolerance": 0.0}, "Accurate"),
+    ({"tolerance": 20.0}, "Tiny"),
+    ({"max_latency_us": 50}, "Fast"),
+    ({"max_latency_us": 5}, "Tiny"),
+    ({"max_bytes": 2000}, "Accurate"),
+    ({"max_bytes": 2000, "tolerance": 20.0}, "Tiny"),
+    ({"max_latency_us": 50, "max_bytes": 2000}, "Tiny"),
+], ids=["tolerance", "no-tolerance", "wide-tolerance", "latency", "tight-latency", "size",
+        "size-and-tolerance", "latency-and-size"])
+def test_budgets_and_tolerance(budget, expected):
+    assert _select(**budget) == expected
+
+
+def test_nothing_within_budget_falls_back_to_most_accurate():
+    assert _select(max_latency_us=0.5) == "Accurate"
+    assert _select(max_bytes=1) == "Accurate"
+
+
+def test_without_metrics_the_most_accurate_model_wins():
+    assert select_model(ACCURACIES, {}, max_latency_us=5, max_bytes=10, tolerance=20.0) == "Accurate"
+
+
+def test_compact_costs_are_used_when_serving_exports():
+    # The export of "Fast" is small but slower than the pickle of "Accurate"
+    assert _select(compact=True) == "Accurate"
+    assert _select(compact=True, max_bytes=500) == "Fast"
@@ -0,0 +1,45 @@
+import hashlib
+
+from analyzer import smell_detector
+from analyzer.parsed_source import ParsedSource
+
+SOURCE = "def greet(name):\n    return f'hello {name}'\n"
+
+
+def test_mapping_is_released_on_exit_and_views_stay_usable(tmp_path):
+    path = tmp_path / "greet.py"
+    path.write_text(SOURCE)
+    with ParsedSource.from_mmap(str(path)) as parsed:
+        tree = parsed.tree
+        digest = parsed.digest
+    assert parsed.raw.closed
+    assert parsed.tree is tree and parsed.text == SOURCE
+    assert digest == hashlib.sha256(SOURCE.encode()).hexdigest()
+    parsed.close()  # closing twice is harmless
+
+
+def test_sources_read_into_memory_and_empty_files_need_no_closing(tmp_path):
+    path = tmp_path / "empty.py"
+    path.write_bytes(b"")
+    for parsed in (ParsedSource.from_mmap(str(path)), ParsedSource.from_path(str(path)),
+                   ParsedSource.from_text(SOURCE)):
+        with parsed:
+            pass
+        assert parsed.text == ("" if parsed.path else SOURCE)
+
+
+def test_analyze_file_releases_the_mapping(tmp_path, monkeypatch):
+    path = tmp_path / "greet.py"
+    path.write_text(SOURCE)
+    opened = []
+    from_mmap = ParsedSource.from_mmap
+
+    def spy(path, digest=None):
+        opened.append(from_mmap(path, digest))
+        return opened[-1]
+
+    monkeypatch.setattr(ParsedSource, "from_mmap", spy)
+    digest = hashlib.sha256(SOURCE.encode()).hexdigest()
+    for _ in range(2):  # an analysis, then a cache hit
+        smell_detector.analyze_file(str(path), source_hash=digest, rules="fast")
+    assert len(opened) == 2 and all(parsed.raw.closed for parsed in opened)
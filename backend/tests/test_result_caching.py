@@ -0,0 +1,51 @@
+import uuid
+
+from analyzer.result_cache import get_result_cache
+from analyzer.smell_detector import PER_RUN_SUMMARY_FIELDS, analysis_cache_key, analyze_file
+from analyzer.parsed_source import ParsedSource
+
+SOURCE = '''
+class Inventory:
+    def add(self, item):
+        self.items.append(item)
+
+    def remove(self, item):
+        self.items.remove(item)
+
+    def count(self):
+        return len(self.items)
+
+    def clear(self):
+        self.items = []
+
+    def report(self):
+        lines = []
+        for item in self.items:
+            if item:
+                lines.append(str(item))
+            else:
+                lines.append("-")
+        lines.sort()
+        header = "Inventory"
+        footer = f"{len(lines)} items"
+        return "\\n".join([header, *lines, footer])
+'''
+
+
+def test_cache_hit_does_not_inherit_another_documents_run(tmp_path):
+    path = tmp_path / "inventory.py"
+    path.write_text(f"# {uuid.uuid4().hex}\n" + SOURCE)
+
+    first = analyze_file(str(path), document_id="service-a/inventory.py", rules="fast")
+    assert first["summary"].get("incremental")
+    assert first["summary"].get("ml_scopes")
+
+    cached = get_result_cache().get(analysis_cache_key(ParsedSource.from_path(str(path)), "fast"))
+    assert not set(PER_RUN_SUMMARY_FIELDS) & set(cached["summary"])
+    assert "duplicates" not in cached and "profile" not in cached
+
+    second = analyze_file(str(path), document_id="service-b/inventory.py", rules="fast")
+    assert second["summary"]["cache_hit"] is True
+    assert "incremental" not in second["summary"] and "ml_scopes" not in second["summary"]
+    assert second["long_methods"] == first["long_methods"]
+    assert second["summary"]["timings"]["total"] > 0
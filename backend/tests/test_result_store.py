@@ -0,0 +1,58 @@
+import json
+
+from result_store import ResultStore
+
+BASELINE_RESULT = {
+    "ml_result": {"predictions": {"Random Forest": {"prediction": "LongMethod", "accuracy": 80.74}}},
+    "long_methods": [],
+    "large_classes": [],
+    "rule_based": [{"category": "No issues found", "type": "Clean Code", "details": "", "line": "-"}],
+    "summary": {"status": "Smells Detected"},
+}
+
+
+def _store(tmp_path):
+    results, uploads = tmp_path / "results", tmp_path / "uploads"
+    results.mkdir()
+    uploads.mkdir()
+    store = ResultStore(str(tmp_path / "results.db"), legacy_dir=str(results), legacy_upload_dir=str(uploads))
+    return store, results, uploads
+
+
+def test_reads_baseline_results_keyed_by_upload_name(tmp_path):
+    store, results, uploads = _store(tmp_path)
+    (results / "py_test.py.json").write_text(json.dumps(BASELINE_RESULT))
+    (uploads / "py_test.py").write_text("x = 1\n")
+
+    stored = store.get("py_test.py")
+    assert stored["filename"] == "py_test.py"
+    assert stored["result"] == BASELINE_RESULT
+    assert stored["source"] == "x = 1\n"
+
+
+def test_reads_results_recording_their_upload_path(tmp_path):
+    store, results, uploads = _store(tmp_path)
+    upload = uploads / "abc123-x.py"
+    upload.write_text("y = 2\n")
+    (results / "abc123.json").write_text(
+        json.dumps({"filename": "x.py", "upload_path": str(upload), **BASELINE_RESULT}))
+
+    stored = store.get("abc123")
+    assert (stored["filename"], stored["source"]) == ("x.py", "y = 2\n")
+    assert stored["result"] == BASELINE_RESULT
+
+
+def test_skips_training_metrics_and_other_json(tmp_path):
+    store, results, _ = _store(tmp_path)
+    (results / "training_metrics.json").write_text(json.dumps({"long_methods": [], "rule_based": []}))
+    (results / "notes.json").write_text(json.dumps({"accuracy": 0.9}))
+    assert store.get("training_metrics") is None
+    assert store.get("notes") is None
+    assert store.get("missing") is None
+
+
+def test_store_takes_precedence_over_legacy_files(tmp_path):
+    store, results, _ = _store(tmp_path)
+    (results / "job1.json").write_text(json.dumps(BASELINE_RESULT))
+    store.put("job1", "a.py", {"summary": {"status": "Clean Code"}}, source="z = 3\n")
+    assert store.get("job1")["result"] == {"summary": {"status": "Clean Code"}}
@@ -0,0 +1,33 @@
+import threading
+
+from analyzer.metrics import STAGE_TIMEOUTS
+from analyzer.stage_scheduler import Stage, run_stages
+
+
+def test_timed_out_stage_returns_its_fallback():
+    release = threading.Event()
+    cancelled = []
+    before = STAGE_TIMEOUTS.value(stage="slow")
+    try:
+        results, timed_out = run_stages([
+            Stage("slow", lambda: release.wait(5) and "late", lambda e: {"error": str(e)},
+                  timeout=0.1, cancel=lambda: cancelled.append(True)),
+            Stage("fast", lambda: "done", lambda e: None),
+        ])
+    finally:
+        release.set()
+
+    assert timed_out == ["slow"]
+    assert results["fast"] == "done"
+    assert results["slow"] == {"error": "slow exceeded 0.1s"}
+    assert cancelled == [True]
+    assert STAGE_TIMEOUTS.value(stage="slow") == before + 1
+
+
+def test_failing_stage_returns_its_fallback():
+    def fail():
+        raise ValueError("boom")
+
+    results, timed_out = run_stages([Stage("broken", fail, lambda e: f"fallback: {e}")])
+    assert timed_out == []
+    assert results == {"broken": "fallback: boom"}
@@ -0,0 +1,59 @@
+import io
+import time
+
+import pytest
+
+from app import app
+from job_queue import get_job_queue
+
+SHARED = '''
+def normalize_records(records, defaults):
+    cleaned = []
+    for record in records:
+        item = dict(defaults)
+        for key, value in record.items():
+            if value is None:
+                continue
+            if isinstance(value, str):
+                value = value.strip().lower()
+            item[key] = value
+        if item.get("id") and item.get("name"):
+            cleaned.append(item)
+    cleaned.sort(key=lambda r: (r["name"], r["id"]))
+    return cleaned
+'''
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def _upload(client, filename: str, text: str) -> dict:
+    response = client.post("/analyze?async=1&rules=fast",
+                           data={"file": (io.BytesIO(text.encode()), filename)},
+                           content_type="multipart/form-data")
+    assert response.status_code == 202
+    job = get_job_queue().get(response.get_json()["job_id"])
+    deadline = time.monotonic() + 60
+    while not job.finished and time.monotonic() < deadline:
+        job.events_after(len(job.events) - 1, timeout=1)
+    assert job.status == "done", job.error
+    return job.result
+
+
+def test_same_named_uploads_from_different_services_are_matched(client):
+    _upload(client, "utils.py", "import os\n\nSERVICE = 'billing'\n" + SHARED)
+    second = _upload(client, "utils.py", "import sys\n\nSERVICE = 'shipping'\n" + SHARED)
+
+    [duplicate] = second["duplicates"]
+    assert duplicate["function"] == "normalize_records"
+    assert [m["similarity"] for m in duplicate["matches"]] == [1.0]
+    assert duplicate["matches"][0]["document"].startswith("utils.py@")
+
+
+def test_reupload_does_not_match_itself(client):
+    text = "SERVICE = 'orders'\n" + SHARED.replace("normalize_records", "clean_orders")
+    _upload(client, "orders.py", text)
+    matches = [m for d in _upload(client, "orders.py", text)["duplicates"] for m in d["matches"]]
+    assert not [m for m in matches if m["document"].startswith("orders.py@")]
@@ -0,0 +1,11 @@
+def compute_values():
+    """
+    Example for rule-based detection.
+    Contains unused variables and redundant assignments.
+    """
+    x = 10
+    y = 20
+    z = x + y   # Used
+    temp = 100  # Unused variable
+    another = 50  # Unused
+    return z
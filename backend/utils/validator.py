@@ -0,0 +1,48 @@
+import codecs
+
+
+class UploadRejected(Exception):
+    """An upload that must not be stored; `status_code` is the HTTP answer."""
+    status_code = 400
+
+
+class UploadTooLarge(UploadRejected):
+    status_code = 413
+
+
+class BinaryUpload(UploadRejected):
+    status_code = 415
+
+
+# --------------------------------------------------------------------
+# 🔹 Incremental checks on an upload as it streams in
+# --------------------------------------------------------------------
+class SourceValidator:
+    """
+    Fed every chunk of an upload before it is written anywhere. Rejects the
+    upload as soon as it passes `max_bytes`, contains a NUL byte or stops
+    being valid UTF-8, so a large or binary payload never fully lands on disk.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def feed(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.max_bytes and self.size > self.max_bytes:
+            raise UploadTooLarge(f"File is larger than {self.max_bytes // 1024} KiB")
+        if b"\x00" in chunk:
+            raise BinaryUpload("File looks binary; upload Python source")
+        try:
+            self._decoder.decode(chunk)
+        except UnicodeDecodeError:
+            raise BinaryUpload("File is not valid UTF-8 text")
+
+    def finish(self):
+        """Fails if the upload ended in the middle of a multi-byte character."""
+        try:
+            self._decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            raise BinaryUpload("File is not valid UTF-8 text")
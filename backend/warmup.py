@@ -0,0 +1,71 @@
+"""
+Optional pre-fork warm-up.
+
+Importing app.py only loads Flask and the analyzer's own modules; joblib,
+scikit-learn and the Gemini SDK are imported on first use. A pre-forking
+server can instead pay those costs once in the master, so every worker
+shares the loaded modules and model copy-on-write:
+
+    APP_WARMUP=1 gunicorn --preload -w 4 app:app
+"""
+import gc
+import importlib
+import logging
+import os
+import time
+
+from analyzer.model_registry import get_model_registry
+
+logger = logging.getLogger(__name__)
+
+# Run warm_up() when app.py is imported (i.e. in the master under --preload)
+APP_WARMUP = os.getenv("APP_WARMUP", "0") == "1"
+# Whether warm-up also imports and configures the Gemini SDK
+WARMUP_AI = os.getenv("WARMUP_AI", "1") == "1"
+
+# Modules that are otherwise imported lazily by the first request that needs them
+WARMUP_MODULES = [
+    "numpy",
+    "joblib",
+    "analyzer.code_metrics",
+    "sklearn.tree",
+    "sklearn.ensemble",
+]
+
+
+def warm_up(include_ai: bool = WARMUP_AI) -> dict:
+    """
+    Imports the lazily loaded dependencies, loads the model bundle and then
+    freezes the GC generations, so objects created so far are never touched
+    by the collector and their pages stay shared after fork(). Returns the
+    seconds spent per step. The pylint pool is not started here: worker
+    processes must not be inherited across a fork.
+    """
+    timings = {}
+    for name in WARMUP_MODULES:
+        started = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            logger.warning("Warm-up: skipping %s (%s)", name, e)
+            continue
+        timings[name] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    get_model_registry().preload()
+    timings["model_registry"] = time.perf_counter() - started
+
+    if include_ai:
+        from ai_routes import get_genai
+
+        started = time.perf_counter()
+        try:
+            get_genai()
+            timings["google.generativeai"] = time.perf_counter() - started
+        except ImportError as e:
+            logger.warning("Warm-up: skipping google.generativeai (%s)", e)
+
+    gc.collect()
+    gc.freeze()
+    logger.info("Warm-up finished in %.2fs", sum(timings.values()))
+    return timings
@@ -1,5 +1,169 @@
 // Results page animations and interactions
 document.addEventListener('DOMContentLoaded', () => {
+    // Follow a running analysis job, rendering each stage's result as it arrives
+    const jobProgress = document.getElementById('job-progress');
+    if (jobProgress) {
+        const jobId = jobProgress.dataset.jobId;
+        const jobError = document.getElementById('job-error');
+
+        const markStage = (stage) => {
+            const item = jobProgress.querySelector(`[data-stage="${stage}"] .stage-state`);
+            if (item) {
+                item.textContent = 'done';
+                item.classList.add('done');
+            }
+        };
+
+        const showFailure = (message) => {
+            jobError.textContent = `Analysis failed: ${message}`;
+            jobError.style.display = 'block';
+        };
+
+        const element = (tag, className, text) => {
+            const node = document.createElement(tag);
+            if (className) node.className = className;
+            if (text !== undefined) node.textContent = text;
+            return node;
+        };
+
+        // Same markup as the server-rendered issue cards; rows are [label, value] pairs
+        const issueCard = (type, line, rows) => {
+            const card = element('div', 'issue-card');
+            const header = element('div', 'issue-header');
+            header.append(element('span', 'issue-type', type), element('span', 'issue-location', `Line: ${line}`));
+            const body = element('div', 'issue-body');
+            rows.forEach(([label, value]) => {
+                const row = element('p');
+                row.append(element('strong', null, `${label}:`), ` ${value}`);
+                body.appendChild(row);
+            });
+            card.append(header, body);
+            return card;
+        };
+
+        // Fills one live section with cards, hiding it when there is nothing to show
+        const fillSection = (name, cards) => {
+            const section = document.querySelector(`[data-live-section="${name}"]`);
+            if (!section) return;
+            const grid = section.querySelector('.ml-grid, .issues-grid');
+            grid.replaceChildren(...cards);
+            section.style.display = cards.length ? 'block' : 'none';
+        };
+
+        const mlLabel = (ml) => ml ? ` · ML (${ml.model}): ${ml.label}` +
+            (ml.confidence !== null && ml.confidence !== undefined ? ` (${Math.round(ml.confidence * 100)}%)` : '') : '';
+
+        const renderers = {
+            ml: (ml) => {
+                if (ml.Error) {
+                    const card = element('div', 'ml-card error-card');
+                    card.append(element('div', 'model-name', ml.explanation.title),
+                        element('div', 'prediction-error-message',
+                            `Reason: ${ml.explanation.reason} Fix: ${ml.explanation.fix}`));
+                    fillSection('ml', [card]);
+                    return;
+                }
+                const predictions = ml.predictions || {};
+                if (predictions.status === 'Clean Code') {
+                    const card = element('div', 'ml-card clean-code-card');
+                    card.append(element('div', 'model-name', 'Overall ML Status'),
+                        element('div', 'prediction clean', 'No Issues Found'));
+                    fillSection('ml', [card]);
+                    return;
+                }
+                fillSection('ml', Object.entries(predictions).map(([model, data]) => {
+                    const smell = data.prediction !== 'No Smell';
+                    const card = element('div', 'ml-card');
+                    card.append(
+                        element('div', 'model-name', model),
+                        element('div', `prediction ${smell ? 'smell' : 'clean'}`,
+                            smell ? 'Code Smell Detected' : 'No Issues Found'),
+                        element('div', 'accuracy-info', `${Number(data.accuracy).toFixed(2)}% Acc.`));
+                    return card;
+                }));
+            },
+            ast: (data) => {
+                fillSection('long_methods', (data.long_methods || []).filter(m => !m.error).map(m => issueCard(
+                    'Long Method', m.start, [
+                        ['Method', m.function + mlLabel(m.ml_prediction)],
+                        ['Length', `${m.length} lines`],
+                        ['Reason', m.reason ? m.reason.reason : ''],
+                        ['Fix', m.reason ? m.reason.fix : ''],
+                    ])));
+                fillSection('large_classes', (data.large_classes || []).filter(c => !c.error).map(c => issueCard(
+                    'Large Class', c.start, [
+                        ['Class', c.class + mlLabel(c.ml_prediction)],
+                        ['Lines', c.lines],
+                        ['Methods', c.num_methods],
+                        ['Reason', c.reason ? c.reason.reason : ''],
+                        ['Fix', c.reason ? c.reason.fix : ''],
+                    ])));
+            },
+            pylint: (issues) => {
+                fillSection('rule_based', (issues || []).map(issue => issueCard(
+                    issue.category, issue.line, [['Symbol', issue.type], ['Details', issue.details]])));
+            },
+            duplicates: (duplicates) => {
+                fillSection('duplicates', (duplicates || []).map(dup => issueCard(
+                    'Duplicate Code', dup.start, [
+                        ['Function', `${dup.function} (lines ${dup.start}-${dup.end})`],
+                        ...dup.matches.map(match => ['Similar to',
+                            `${match.document} → ${match.function} (lines ${match.start}-${match.end}, ` +
+                            `${Math.round(match.similarity * 100)}%)`]),
+                    ])));
+            },
+        };
+
+        const showStage = (stage, data) => {
+            markStage(stage);
+            if (renderers[stage]) renderers[stage](data);
+        };
+
+        // The final result can differ from the stage results (e.g. a clean file), so render it once more
+        const showResult = (result) => {
+            showStage('ml', result.ml_result || {});
+            showStage('ast', result);
+            showStage('pylint', result.rule_based);
+            showStage('duplicates', result.duplicates);
+            const summary = result.summary || {};
+            jobProgress.querySelector('.section-title').textContent = summary.status === 'Clean Code'
+                ? '✅ Analysis complete: no code smells detected'
+                : `✅ Analysis complete: ${summary.smell_count || 0} code smells detected`;
+        };
+
+        const fetchJob = async () => (await fetch(`/api/jobs/${jobId}`)).json();
+
+        if (window.EventSource) {
+            const events = new EventSource(`/api/jobs/${jobId}/events`);
+            events.addEventListener('stage', (e) => {
+                const data = JSON.parse(e.data);
+                showStage(data.stage, data.result);
+            });
+            events.addEventListener('done', async () => {
+                events.close();
+                showResult((await fetchJob()).result || {});
+            });
+            events.addEventListener('failed', (e) => {
+                events.close();
+                showFailure(JSON.parse(e.data).error);
+            });
+        } else {
+            const poll = async () => {
+                const job = await fetchJob();
+                Object.entries(job.stages || {}).forEach(([stage, data]) => showStage(stage, data));
+                if (job.status === 'done') {
+                    showResult(job.result || {});
+                } else if (job.status === 'failed') {
+                    showFailure(job.error);
+                } else {
+                    setTimeout(poll, 1000);
+                }
+            };
+            poll();
+        }
+        return;
+    }
+
     // Add smooth scroll animations for cards
     const cards = document.querySelectorAll('.issue-card, .ml-card, .results-section');
 
@@ -130,6 +294,46 @@ document.addEventListener('DOMContentLoaded', () => {
     const codeContentDiv = document.getElementById('code-content');
     const code = codeContentDiv ? codeContentDiv.textContent.trim() : '';
 
+    // POSTs a JSON payload and calls onEvent(event, data) for each server-sent event
+    const streamEvents = async (url, payload, onEvent) => {
+        const response = await fetch(url, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(payload),
+        });
+
+        if (!response.ok) {
+            let message = `HTTP error! status: ${response.status}`;
+            try {
+                message = (await response.json()).error || message;
+            } catch (e) { /* not JSON */ }
+            throw new Error(message);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                let event = 'message';
+                let data = '';
+                block.split('\n').forEach(line => {
+                    if (line.startsWith('event: ')) event = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                });
+                if (data) onEvent(event, JSON.parse(data));
+            }
+        }
+    };
+
     const getAISuggestion = async (endpoint, code, smellType = null) => {
         aiOutputTitle.textContent = 'Loading...';
         aiOutputContent.textContent = 'Please wait while the AI is thinking...';
@@ -141,30 +345,59 @@ document.addEventListener('DOMContentLoaded', () => {
                 payload.smell_type = smellType;
             }
 
-            const response = await fetch(`/api/${endpoint}`, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify(payload),
+            let started = false;
+            await streamEvents(`/api/${endpoint}/stream`, payload, (event, data) => {
+                if (event === 'chunk') {
+                    if (!started) {
+                        aiOutputTitle.textContent = 'Receiving...';
+                        aiOutputContent.textContent = '';
+                        started = true;
+                    }
+                    aiOutputContent.textContent += data.text;
+                } else if (event === 'done') {
+                    const type = { explain: 'explanation', optimize: 'optimization' }[data.type] || data.type;
+                    aiOutputTitle.textContent = `${type.charAt(0).toUpperCase() + type.slice(1)} Result`;
+                    aiOutputContent.textContent = data.result;
+                } else if (event === 'error') {
+                    aiOutputTitle.textContent = 'Error';
+                    aiOutputContent.textContent = data.error || 'An unknown error occurred.';
+                }
             });
+        } catch (error) {
+            aiOutputTitle.textContent = 'Error';
+            aiOutputContent.textContent = `Failed to fetch AI suggestion: ${error.message}`;
+        }
+    };
 
-            if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`);
-            }
+    // Refactors every long method / large class of this result in one batched request
+    const refactorAllSmells = async (resultId) => {
+        aiOutputTitle.textContent = 'Loading...';
+        aiOutputContent.textContent = 'Please wait while the AI is thinking...';
+        aiOutputContainer.style.display = 'block';
 
-            const data = await response.json();
+        const fixes = [];
+        let total = 0;
+        const render = () => {
+            aiOutputTitle.textContent = `Refactor Results (${fixes.filter(Boolean).length}/${total})`;
+            aiOutputContent.textContent = fixes
+                .filter(Boolean)
+                .map(fix => `# ${fix.smell_type}: ${fix.name} (line ${fix.start})\n${fix.result}`)
+                .join('\n\n');
+        };
 
-            if (data.success) {
-                aiOutputTitle.textContent = `${data.type.charAt(0).toUpperCase() + data.type.slice(1)} Result`;
-                aiOutputContent.textContent = data.result;
-            } else {
-                aiOutputTitle.textContent = 'Error';
-                aiOutputContent.textContent = data.error || 'An unknown error occurred.';
-            }
+        try {
+            await streamEvents('/api/refactor-batch', { result_id: resultId }, (event, data) => {
+                if (event === 'start') {
+                    total = data.count;
+                    render();
+                } else if (event === 'fix') {
+                    fixes[data.index] = data;
+                    render();
+                }
+            });
         } catch (error) {
             aiOutputTitle.textContent = 'Error';
-            aiOutputContent.textContent = `Failed to fetch AI suggestion: ${error.message}`;
+            aiOutputContent.textContent = `Failed to fetch AI suggestions: ${error.message}`;
         }
     };
 
@@ -180,6 +413,11 @@ document.addEventListener('DOMContentLoaded', () => {
         aiRefactorBtn.addEventListener('click', () => getAISuggestion('refactor', code));
     }
 
+    const aiRefactorAllBtn = document.getElementById('ai-refactor-all-btn');
+    if (aiRefactorAllBtn) {
+        aiRefactorAllBtn.addEventListener('click', () => refactorAllSmells(aiRefactorAllBtn.dataset.resultId));
+    }
+
     if (aiCloseBtn) {
         aiCloseBtn.addEventListener('click', () => {
             aiOutputContainer.style.display = 'none';